@@ -1,15 +1,22 @@
 # api/advanced_endpoints.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import psycopg2
+from database.connection import db
 # from rtree.spatial_joins import SpatialJoinEngine as RTreeSpatialJoinEngine
 # from rtree.polygon_queries import PolygonQueryEngine as RTreePolygonQueryEngine
 import logging
-from .main import spatial_engine
+from .main import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, PROPERTY_ARROW_SCHEMA, LngLat, PageRequest,
+    arrow_response, cached_response, decode_cursor, encode_cursor, encode_response, fetch_page,
+    properties_from_rows, properties_table, spatial_engine, stream_records, wants_arrow, wants_ndjson
+)
 
 router = APIRouter(prefix="/api/v1/advanced", tags=["Advanced Spatial Queries"])
 
-class PolygonQueryRequest(BaseModel):
+class PolygonQueryRequest(PageRequest):
     polygon_coordinates: List[List[float]]  # [[lng, lat], [lng, lat], ...]
     max_price: Optional[float] = None
     min_bedrooms: Optional[int] = None
@@ -18,6 +25,9 @@ class ProximityQueryRequest(BaseModel):
     amenity_type: str
     distance_km: float = 1.0
     max_price: Optional[float] = None
+    # Results are ordered by distance; these page through them
+    limit: Optional[int] = Field(None, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
 
 def verify_token():
     # Dummy implementation for now
@@ -26,22 +36,42 @@ def verify_token():
 @router.post("/search/polygon")
 async def polygon_search(
     query: PolygonQueryRequest,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(verify_token)
 ):
     """Search properties within a custom polygon"""
     try:
-        polygon_engine = PolygonQueryEngine(spatial_engine.rtree_engine)
-        results = polygon_engine.properties_in_custom_polygon(query.polygon_coordinates)
-        
-        # Apply additional filters
-        if query.max_price:
-            results = [r for r in results if r['price'] <= query.max_price]
-        
-        if query.min_bedrooms:
-            results = [r for r in results if r['bedrooms'] >= query.min_bedrooms]
-        
-        return results
+        polygon_engine = PolygonQueryEngine(spatial_engine)
+        if not query.is_paged() and (wants_arrow(request) or wants_ndjson(request)):
+            rows = await run_in_threadpool(
+                polygon_engine.rows_in_custom_polygon,
+                query.polygon_coordinates, query.max_price, query.min_bedrooms
+            )
+            if wants_arrow(request):
+                return await run_in_threadpool(lambda: arrow_response(properties_table(rows)))
+            return stream_records(rows, properties_from_rows)
+
+        def compute(page_response: Response):
+            # Filters are evaluated inside the engine's R-tree traversal
+            if not query.is_paged():
+                return polygon_engine.properties_in_custom_polygon(
+                    query.polygon_coordinates,
+                    max_price=query.max_price,
+                    min_bedrooms=query.min_bedrooms
+                )
+            return polygon_engine.page_in_custom_polygon(query, page_response)
+
+        lngs = [lng for lng, _ in query.polygon_coordinates] or [0.0]
+        lats = [lat for _, lat in query.polygon_coordinates] or [0.0]
+        results = await cached_response(
+            'polygon', query.model_dump(), (min(lngs), min(lats), max(lngs), max(lats)),
+            response, compute
+        )
+        return encode_response(results, response, request, PROPERTY_ARROW_SCHEMA)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Polygon search failed: {e}")
         raise HTTPException(status_code=500, detail="Polygon search failed")
@@ -49,52 +79,76 @@ async def polygon_search(
 @router.post("/search/proximity")
 async def proximity_search(
     query: ProximityQueryRequest,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(verify_token)
 ):
-    """Find properties near specific amenities"""
+    """Find properties near specific amenities, nearest first"""
     try:
-        join_engine = SpatialJoinEngine(spatial_engine.rtree_engine)
-        results = join_engine.properties_near_amenities(
-            query.amenity_type, 
-            query.distance_km
-        )
-        
-        if query.max_price:
-            results = [r for r in results if r['price'] <= query.max_price]
-        
-        return results
+        join_engine = SpatialJoinEngine(spatial_engine)
+        paged = query.limit is not None or query.cursor is not None
+        if wants_ndjson(request) and not paged:
+            matches = await run_in_threadpool(
+                join_engine.proximity_matches, query.amenity_type, query.distance_km, query.max_price
+            )
+            return stream_records(matches, join_engine.records_for_matches)
+
+        def compute(page_response: Response):
+            limit = (query.limit or DEFAULT_PAGE_SIZE) if paged else 0
+            scope = {'order_by': 'proximity', 'amenity_type': query.amenity_type}
+            results = join_engine.properties_near_amenities(
+                query.amenity_type, 
+                query.distance_km,
+                max_price=query.max_price,
+                limit=limit,
+                after=decode_cursor(query.cursor, scope)
+            )
+            if paged and len(results) == limit:
+                last = results[-1]
+                page_response.headers[NEXT_CURSOR_HEADER] = encode_cursor(scope, last['distance_km'], last['id'])
+            return results
+
+        # Amenities can be anywhere, so the result depends on the whole map
+        results = await cached_response('proximity', query.model_dump(), None, response, compute)
+        return encode_response(results, response, request)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Proximity search failed: {e}")
         raise HTTPException(status_code=500, detail="Proximity search failed")
 
 @router.get("/search/districts")
-async def district_analysis(current_user: dict = Depends(verify_token)):
-    """Get property distribution by districts"""
+async def district_analysis(
+    request: Request,
+    response: Response,
+    boundary_type: str = 'district',
+    current_user: dict = Depends(verify_token)
+):
+    """Property count and prices per district.
+
+    Districts are read from the aggregates the ETL keeps in
+    analytics.district_property_stats; other boundary types, or a database
+    without the view, are joined inside the engine.
+    """
     try:
-        join_engine = SpatialJoinEngine(spatial_engine.rtree_engine)
-        results = join_engine.properties_within_districts()
-        
-        # Group by district for analysis
-        district_stats = {}
-        for prop in results:
-            district = prop['district_name']
-            if district not in district_stats:
-                district_stats[district] = {
-                    'count': 0,
-                    'avg_price': 0,
-                    'properties': []
-                }
-            
-            district_stats[district]['count'] += 1
-            district_stats[district]['properties'].append(prop)
-        
-        # Calculate averages
-        for district in district_stats:
-            prices = [p['price'] for p in district_stats[district]['properties']]
-            district_stats[district]['avg_price'] = sum(prices) / len(prices)
-        
-        return district_stats
+        def compute(page_response: Response):
+            join_engine = SpatialJoinEngine(spatial_engine)
+            if boundary_type == 'district':
+                stored = join_engine.stored_district_stats()
+                if stored is not None:
+                    return stored
+            return join_engine.properties_within_districts(boundary_type)
+
+        district_stats = await cached_response(
+            'districts', {'boundary_type': boundary_type}, None, response, compute
+        )
+        if wants_ndjson(request):
+            # One line per district
+            return encode_response(
+                [{'district_name': name, **stats} for name, stats in district_stats.items()], response, request
+            )
+        return encode_response(district_stats, response)
         
     except Exception as e:
         logging.error(f"District analysis failed: {e}")
@@ -104,16 +158,105 @@ async def district_analysis(current_user: dict = Depends(verify_token)):
 class SpatialJoinEngine:
     def __init__(self, rtree_engine):
         self.rtree_engine = rtree_engine
-    def properties_near_amenities(self, amenity_type, distance_km):
-        # Dummy implementation
-        return []
-    def properties_within_districts(self):
-        # Dummy implementation
-        return []
+    def properties_near_amenities(self, amenity_type, distance_km, max_price=None, limit=0, after=None):
+        """Join properties to their nearest amenity of a type, in memory"""
+        return self.records_for_matches(
+            self.proximity_matches(amenity_type, distance_km, max_price, limit=limit, after=after)
+        )
+    def proximity_matches(self, amenity_type, distance_km, max_price=None, limit=0, after=None):
+        """Engine (property, nearest amenity, distance) matches, nearest first"""
+        return self.rtree_engine.properties_near_amenities(
+            amenity_type, distance_km, price_max=max_price, limit=limit, after=after
+        )
+    def records_for_matches(self, matches):
+        results = []
+        for match in matches:
+            prop = self.rtree_engine.get_property_by_id(match.property_id)
+            amenity = self.rtree_engine.get_amenity_by_id(match.amenity_id)
+            results.append({
+                'id': prop.id,
+                'address': prop.address,
+                'price': prop.price,
+                'bedrooms': prop.bedrooms,
+                'bathrooms': prop.bathrooms,
+                'property_type': prop.property_type,
+                'lng': prop.location.x,
+                'lat': prop.location.y,
+                'amenity_id': amenity.id,
+                'amenity_name': amenity.name,
+                'distance_km': match.distance_km
+            })
+        return results
+    def properties_within_districts(self, boundary_type='district'):
+        """Per-district property count and prices, keyed by district name"""
+        districts = {}
+        for stats in self.rtree_engine.boundary_stats(boundary_type):
+            priced = stats.count > 0
+            districts[stats.name] = {
+                'district_id': stats.boundary_id,
+                'count': stats.count,
+                'avg_price': stats.price_mean if priced else None,
+                'min_price': stats.price_min if priced else None,
+                'max_price': stats.price_max if priced else None,
+            }
+        return districts
+    def stored_district_stats(self):
+        """properties_within_districts('district') as precomputed by the ETL,
+        or None if analytics.district_property_stats cannot be read"""
+        try:
+            with db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT district_id, district_name, property_count, avg_price, min_price, max_price
+                    FROM analytics.district_property_stats
+                    ORDER BY district_id
+                """)
+                rows = cursor.fetchall()
+                cursor.close()
+        except psycopg2.errors.UndefinedTable:
+            return None
+        except psycopg2.Error as e:
+            logging.warning(f"Reading analytics.district_property_stats failed, joining in the engine: {e}")
+            return None
+
+        def price(value):
+            return None if value is None else float(value)
+
+        return {
+            row['district_name']: {
+                'district_id': row['district_id'],
+                'count': row['property_count'],
+                'avg_price': price(row['avg_price']),
+                'min_price': price(row['min_price']),
+                'max_price': price(row['max_price']),
+            }
+            for row in rows
+        }
 
 class PolygonQueryEngine:
     def __init__(self, rtree_engine):
         self.rtree_engine = rtree_engine
-    def properties_in_custom_polygon(self, polygon_coordinates):
-        # Dummy implementation
-        return []
+    def properties_in_custom_polygon(self, polygon_coordinates, max_price=None, min_bedrooms=None):
+        """Properties inside a [[lng, lat], ...] ring that match the filters"""
+        return properties_from_rows(self.rows_in_custom_polygon(polygon_coordinates, max_price, min_bedrooms))
+    def rows_in_custom_polygon(self, polygon_coordinates, max_price=None, min_bedrooms=None):
+        return self.rtree_engine.search_polygon(
+            [(lng, lat) for lng, lat in polygon_coordinates],
+            price_max=max_price,
+            bedrooms_min=min_bedrooms
+        )
+    def page_in_custom_polygon(self, query, response):
+        """One ordered page of the properties inside the query's polygon"""
+        ring = [(lng, lat) for lng, lat in query.polygon_coordinates]
+        centre = LngLat(
+            lng=sum(lng for lng, _ in ring) / max(len(ring), 1),
+            lat=sum(lat for _, lat in ring) / max(len(ring), 1)
+        )
+        rows = fetch_page(
+            query, response,
+            lambda **page: self.rtree_engine.top_k_polygon(
+                ring, price_max=query.max_price, bedrooms_min=query.min_bedrooms, **page
+            ),
+            default_origin=centre
+        )
+        return properties_from_rows(rows)
@@ -0,0 +1,38 @@
+"""
+Request coalescing for cached spatial queries
+File: api/cache.py
+
+The result cache itself lives in utils/query_cache.py, where the ETL can
+use it to invalidate entries without importing the API.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Coalesces concurrent identical computations.
+
+    The first caller for a key starts the computation; callers arriving
+    while it runs await the same result instead of starting their own. The
+    computation runs as its own task, so a caller that goes away does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.counters = {'started': 0, 'merged': 0}
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.counters['started'] += 1
+        else:
+            self.counters['merged'] += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
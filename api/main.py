@@ -1,19 +1,44 @@
 import sys
 import os
+import io
+import base64
+import binascii
+import json
 # Add the absolute path to the rtree_engine module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../rtree_engine')))
 import rtree_engine
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from fastapi.security import OAuth2PasswordBearer
 import psycopg2
-from pydantic import BaseModel
+import pyarrow as pa
+import pyarrow.csv
+import shapely
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Tuple
 from database.connection import db
+from utils.helpers import normalize_query_params
+from api import mvt
+from api.cache import SingleFlight
+from utils.query_cache import Bounds as CacheBounds, SpatialQueryCache
 
 app = FastAPI()
 
 # Initialize the C++ R-tree engine
 spatial_engine = rtree_engine.SpatialSearchEngine()
-rtree_index = rtree_engine.RTree()
+# Result cache for spatial queries; local-only when REDIS_URL is unset
+query_cache = SpatialQueryCache.from_url(os.getenv('REDIS_URL'))
+# Identical queries that miss the cache at the same time share one computation
+query_flights = SingleFlight()
+# Optional snapping of range query bounds to a grid (degrees) or to geohash
+# cells (precision) before the engine runs them; unset disables snapping
+QUERY_SNAP_GRID_DEGREES = float(os.getenv('QUERY_SNAP_GRID_DEGREES', '0')) or None
+QUERY_SNAP_GEOHASH_PRECISION = int(os.getenv('QUERY_SNAP_GEOHASH_PRECISION', '0')) or None
+# Results with more records than this are served but not cached, so one
+# huge unpaged search cannot fill Redis or the local tier
+QUERY_CACHE_MAX_RECORDS = int(os.getenv('QUERY_CACHE_MAX_RECORDS', '10000'))
 # Define RangeQuery and Bounds models
 class Bounds(BaseModel):
     min_lng: float
@@ -21,7 +46,45 @@ class Bounds(BaseModel):
     max_lng: float
     max_lat: float
 
-class RangeQuery(BaseModel):
+class Cluster(BaseModel):
+    lng: float
+    lat: float
+    count: int
+    price_min: float
+    price_max: float
+    price_avg: float
+    property_id: Optional[int] = None  # Set when the cluster is a single property
+
+class LngLat(BaseModel):
+    lng: float
+    lat: float
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+# Response header carrying the cursor of the next page, if there may be one
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Clients sending this Accept type get one JSON record per line; unpaged
+# searches are then streamed STREAM_CHUNK_ROWS records at a time
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_CHUNK_ROWS = 5000
+# Clients sending this Accept type get the result as one Arrow IPC stream
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+class PageRequest(BaseModel):
+    """Optional ordering and keyset pagination for search endpoints.
+
+    Without any of these fields a search returns every match, unordered.
+    """
+    order_by: Optional[Literal['price', 'price_per_sqft', 'distance']] = None
+    descending: bool = False
+    origin: Optional[LngLat] = None  # For distance order; defaults to the centre of the search area
+    limit: Optional[int] = Field(None, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+
+    def is_paged(self) -> bool:
+        return self.order_by is not None or self.limit is not None or self.cursor is not None
+
+class RangeQuery(PageRequest):
     bounds: Bounds
 
 class Property(BaseModel):
@@ -34,70 +97,399 @@ class Property(BaseModel):
     address: str
     bathrooms: float = 0.0
 
+# Column types of Property results in Arrow responses
+PROPERTY_ARROW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('property_type', pa.dictionary(pa.int32(), pa.string())),
+    ('price', pa.float64()),
+    ('bedrooms', pa.int32()),
+    ('lng', pa.float64()),
+    ('lat', pa.float64()),
+    ('address', pa.string()),
+    ('bathrooms', pa.float64()),
+])
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 @app.on_event("startup")
 async def startup_event():
     """Load existing spatial data into the R-tree engine"""
     await load_spatial_data()
-    await load_spatial_data()
+    await load_amenity_data()
+    await load_boundary_data()
+    # Drop local cache entries that an ETL run invalidates in Redis
+    query_cache.listen_for_invalidations()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    query_cache.stop_listening()
 
 async def load_spatial_data():
     """Load property data from database into R-tree"""
-    conn = psycopg2.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        database=os.getenv("DB_NAME", "postgres"),
-        user=os.getenv("DB_USER", "spatial_user"),
-        password=os.getenv("DB_PASSWORD", "spatial_password")
-    )
-    
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, ST_X(geom) as lng, ST_Y(geom) as lat 
-        FROM core.properties
-    """)
-    
-    count = 0
-    for row in cursor.fetchall():
-        property_id, lng, lat = row
-        point = rtree_engine.create_point(lng, lat)
-        rtree_index.insert(point, property_id)
-        count += 1
+    # COPY the columns out as CSV and parse them with Arrow so the engine
+    # reads whole column buffers instead of one Python call per property
+    buffer = io.BytesIO()
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.copy_expert("""
+            COPY (
+                SELECT id, address, price, bedrooms, bathrooms, square_feet, property_type,
+                       ST_X(geom) as lng, ST_Y(geom) as lat
+                FROM core.properties
+                WHERE geom IS NOT NULL
+            ) TO STDOUT WITH (FORMAT csv, HEADER)
+        """, buffer)
+        cursor.close()
     
-    cursor.close()
-    conn.close()
+    buffer.seek(0)
+    table = pyarrow.csv.read_csv(buffer)
+    count = spatial_engine.load_arrow(table)
     print(f"✅ Loaded {count} properties into C++ R-tree engine")
 
+async def load_amenity_data():
+    """Load amenities from database into the per-type amenity R-trees"""
+    spatial_engine.clear_amenities()
+    try:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, name, amenity_type, ST_X(geom) as lng, ST_Y(geom) as lat
+                FROM core.amenities
+            """)
+            # Pool connections use RealDictCursor, so rows are keyed by column
+            for row in cursor:
+                spatial_engine.add_amenity(row['id'], row['name'], row['amenity_type'], row['lng'], row['lat'])
+            cursor.close()
+    except psycopg2.errors.UndefinedTable:
+        print("⚠️ core.amenities does not exist yet; amenity index is empty")
+        return
+    
+    print(f"✅ Loaded {spatial_engine.amenity_count()} amenities into C++ R-tree engine")
+
+async def load_boundary_data():
+    """Load administrative boundaries into the engine's boundary index, using
+    their subdivided parts where the boundary ETL made them"""
+    spatial_engine.clear_boundaries()
+    try:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT b.id, b.boundary_name, b.boundary_type, ST_AsBinary(COALESCE(p.geom, b.geom)) AS wkb
+                FROM core.administrative_boundaries b
+                LEFT JOIN core.administrative_boundary_parts p ON p.boundary_id = b.id
+            """)
+            for row in cursor:
+                for polygon in shapely.from_wkb(bytes(row['wkb'])).geoms:
+                    rings = [polygon.exterior, *polygon.interiors]
+                    spatial_engine.add_boundary_part(
+                        row['id'], row['boundary_name'], row['boundary_type'], [list(ring.coords) for ring in rings]
+                    )
+            cursor.close()
+    except psycopg2.errors.UndefinedTable:
+        print("⚠️ core.administrative_boundaries does not exist yet; boundary index is empty")
+        return
+
+    print(f"✅ Loaded {spatial_engine.boundary_count()} boundaries into C++ R-tree engine")
+
+def properties_from_rows(rows) -> List[dict]:
+    """Property records (the `Property` schema, as plain dicts) read straight
+    from the engine's property columns.
+
+    Skipping per-row model validation and FastAPI's generic encoder keeps
+    large responses cheap; encode_response encodes the records with orjson.
+    """
+    if len(rows) == 0:
+        return []
+    property_types = spatial_engine.property_types()
+    columns = zip(
+        spatial_engine.column('id', rows).tolist(),
+        [property_types[code] for code in spatial_engine.column('property_type_code', rows).tolist()],
+        spatial_engine.column('price', rows).tolist(),
+        spatial_engine.column('bedrooms', rows).tolist(),
+        spatial_engine.column('lng', rows).tolist(),
+        spatial_engine.column('lat', rows).tolist(),
+        spatial_engine.addresses(rows),
+        spatial_engine.column('bathrooms', rows).tolist(),
+    )
+    fields = tuple(Property.model_fields)
+    return [dict(zip(fields, values)) for values in columns]
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get('accept', '')
+
+def wants_arrow(request: Request) -> bool:
+    return ARROW_STREAM_MEDIA_TYPE in request.headers.get('accept', '')
+
+def properties_table(rows) -> pa.Table:
+    """Arrow table of engine rows in PROPERTY_ARROW_SCHEMA, built from whole
+    column arrays; property types stay dictionary encoded"""
+    schema = PROPERTY_ARROW_SCHEMA
+    property_type = pa.DictionaryArray.from_arrays(
+        pa.array(spatial_engine.column('property_type_code', rows), type=pa.int32()),
+        pa.array(spatial_engine.property_types(), type=pa.string())
+    )
+    return pa.Table.from_arrays([
+        pa.array(spatial_engine.column('id', rows), type=schema.field('id').type),
+        property_type,
+        pa.array(spatial_engine.column('price', rows), type=schema.field('price').type),
+        pa.array(spatial_engine.column('bedrooms', rows), type=schema.field('bedrooms').type),
+        pa.array(spatial_engine.column('lng', rows), type=schema.field('lng').type),
+        pa.array(spatial_engine.column('lat', rows), type=schema.field('lat').type),
+        pa.array(spatial_engine.addresses(rows), type=schema.field('address').type),
+        pa.array(spatial_engine.column('bathrooms', rows), type=schema.field('bathrooms').type),
+    ], schema=schema)
+
+def arrow_response(table: pa.Table, headers: Optional[dict] = None) -> Response:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+def ndjson_lines(records) -> bytes:
+    return b''.join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records)
+
+def encode_response(body, response: Response, request: Optional[Request] = None,
+                    arrow_schema: Optional[pa.Schema] = None) -> Response:
+    """orjson-encoded response carrying the next-page cursor set on `response`.
+
+    A list body is sent as Arrow IPC or NDJSON when the request accepts it;
+    Arrow columns follow `arrow_schema`, or are inferred without one.
+    """
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    headers = {NEXT_CURSOR_HEADER: cursor} if cursor else None
+    if request is not None and isinstance(body, list):
+        if wants_arrow(request):
+            return arrow_response(pa.Table.from_pylist(body, schema=arrow_schema), headers)
+        if wants_ndjson(request):
+            return Response(ndjson_lines(body), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return ORJSONResponse(body, headers=headers)
+
+def stream_records(items, to_records) -> StreamingResponse:
+    """Stream NDJSON records built by `to_records` from STREAM_CHUNK_ROWS-long
+    slices of `items` (engine rows or matches).
+
+    Only the compact engine result is held in full; records exist one chunk
+    at a time, so peak memory and time to first byte do not grow with the
+    result.
+    """
+    def chunks():
+        for start in range(0, len(items), STREAM_CHUNK_ROWS):
+            yield ndjson_lines(to_records(items[start:start + STREAM_CHUNK_ROWS]))
+
+    return StreamingResponse(chunks(), media_type=NDJSON_MEDIA_TYPE)
+
+def encode_cursor(scope: dict, key: float, property_id: int) -> str:
+    """Opaque keyset cursor for the row after (key, property_id) in `scope`'s order"""
+    payload = json.dumps({**scope, 'key': key, 'id': property_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: Optional[str], scope: dict) -> Optional[Tuple[float, int]]:
+    """(key, property_id) of a cursor issued for the same ordering, or None"""
+    if cursor is None:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        key, property_id = float(payload.pop('key')), int(payload.pop('id'))
+    except (ValueError, KeyError, TypeError, AttributeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if payload != scope:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Cursor was issued for a different ordering")
+    return key, property_id
+
+def fetch_page(page: PageRequest, response: Response, top_k, default_origin: LngLat):
+    """Run an engine top-k search for one page and set the next-page cursor header.
+
+    `top_k` is an engine top-k method bound to the search area.
+    """
+    order_by = page.order_by or 'price'
+    limit = page.limit or DEFAULT_PAGE_SIZE
+    origin = page.origin or default_origin
+    scope = {'order_by': order_by, 'descending': page.descending}
+    if order_by == 'distance':
+        scope['origin'] = [origin.lng, origin.lat]
+
+    rows, keys = top_k(
+        order_by=order_by, limit=limit, descending=page.descending,
+        origin=(origin.lng, origin.lat), after=decode_cursor(page.cursor, scope)
+    )
+    if len(rows) == limit:
+        last_id = int(spatial_engine.column('id', rows[-1:])[0])
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(scope, float(keys[-1]), last_id)
+    return rows
+
+async def cached_response(kind: str, params: dict, bounds: CacheBounds, response: Response, compute):
+    """Serve a query from query_cache, computing and caching it on a miss.
+
+    `compute(response)` returns the response body as plain JSON data; a
+    next-page cursor it sets is cached with the body. `bounds` is the area the result depends on.
+    Concurrent misses for the same query share a single call of `compute`,
+    which runs on the thread pool. Results longer than QUERY_CACHE_MAX_RECORDS
+    are not cached.
+    """
+    key = query_cache.key_for(kind, params)
+    # A local miss goes to Redis, which must not block the event loop
+    entry = await run_in_threadpool(query_cache.get, key)
+    if entry is None:
+        def compute_entry():
+            scratch = Response()
+            body = compute(scratch)
+            result = {'body': body, 'next_cursor': scratch.headers.get(NEXT_CURSOR_HEADER)}
+            if not isinstance(body, list) or len(body) <= QUERY_CACHE_MAX_RECORDS:
+                query_cache.set(key, result, bounds)
+            return result
+
+        entry = await query_flights.run(key, lambda: run_in_threadpool(compute_entry))
+    if entry['next_cursor']:
+        response.headers[NEXT_CURSOR_HEADER] = entry['next_cursor']
+    return entry['body']
+
 @app.post("/search/range")
-async def range_search(query: RangeQuery, token: str = Depends(oauth2_scheme)):
-    """Range search using the C++ R-tree engine and new DB connection logic"""
-    bounds = query.bounds
+async def range_search(query: RangeQuery, request: Request, response: Response,
+                       token: str = Depends(oauth2_scheme)):
+    """Range search served entirely from the C++ engine's property columns"""
+    if not query.is_paged() and (wants_arrow(request) or wants_ndjson(request)):
+        # Exports: encode the whole result straight from the engine instead of caching it
+        exact = query.bounds
+        rows = await run_in_threadpool(spatial_engine.search_rows, rtree_engine.create_rectangle(
+            exact.min_lng, exact.min_lat, exact.max_lng, exact.max_lat
+        ))
+        if wants_arrow(request):
+            return await run_in_threadpool(lambda: arrow_response(properties_table(rows)))
+        return stream_records(rows, properties_from_rows)
+
+    params = query.model_dump()
+    snapping = QUERY_SNAP_GRID_DEGREES or QUERY_SNAP_GEOHASH_PRECISION
+    if snapping and not query.is_paged():
+        # Nearby viewports snap to the same cells and share one cached
+        # result, which is trimmed to the exact box below. Pages are not
+        # snapped: trimming would leave them short.
+        params = normalize_query_params(params, QUERY_SNAP_GRID_DEGREES, QUERY_SNAP_GEOHASH_PRECISION)
+    bounds = Bounds(**params['bounds'])
     search_rect = rtree_engine.create_rectangle(
         bounds.min_lng, bounds.min_lat,
         bounds.max_lng, bounds.max_lat
     )
-    property_ids = rtree_index.search(search_rect)
-    if not property_ids:
-        return []
-    with db.get_connection() as db_conn:
-        cursor = db_conn.cursor()
-        placeholders = ','.join(['%s'] * len(property_ids))
-        cursor.execute(f"""
-            SELECT id, property_type, price, bedrooms, 
-                   ST_X(geom) as lng, ST_Y(geom) as lat, address
-            FROM core.properties 
-            WHERE id IN ({placeholders})
-        """, property_ids)
-        results = cursor.fetchall()
-        cursor.close()
-    properties = [
-        Property(
-            id=row[0], property_type=row[1], price=row[2], 
-            bedrooms=row[3], lng=row[4], lat=row[5],
-            address=row[6], bathrooms=0.0
-        ) for row in results
+
+    def compute(page_response: Response):
+        if not query.is_paged():
+            return properties_from_rows(spatial_engine.search_rows(search_rect))
+
+        centre = LngLat(lng=(bounds.min_lng + bounds.max_lng) / 2, lat=(bounds.min_lat + bounds.max_lat) / 2)
+        rows = fetch_page(
+            query, page_response,
+            lambda **page: spatial_engine.top_k(search_rect, **page),
+            default_origin=centre
+        )
+        return properties_from_rows(rows)
+
+    results = await cached_response(
+        'range', params,
+        (bounds.min_lng, bounds.min_lat, bounds.max_lng, bounds.max_lat),
+        response, compute
+    )
+    if bounds != query.bounds:
+        exact = query.bounds
+        results = [
+            prop for prop in results
+            if exact.min_lng <= prop['lng'] <= exact.max_lng and exact.min_lat <= prop['lat'] <= exact.max_lat
+        ]
+    return encode_response(results, response, request, PROPERTY_ARROW_SCHEMA)
+
+# Grid cells per map tile width when clustering: 4 cells of a 256px tile
+# gives clusters about 64px apart at every zoom
+CLUSTER_CELLS_PER_TILE = 4
+
+@app.get("/search/clusters", response_model=List[Cluster])
+async def cluster_search(
+    zoom: int = Query(..., ge=0, le=22),
+    min_lng: float = Query(...),
+    min_lat: float = Query(...),
+    max_lng: float = Query(...),
+    max_lat: float = Query(...),
+    token: str = Depends(oauth2_scheme)
+):
+    """Properties in the box grouped into grid cells sized for the map zoom"""
+    cell_size = 360.0 / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+    search_rect = rtree_engine.create_rectangle(min_lng, min_lat, max_lng, max_lat)
+    # Clustering a large box takes a while; keep it off the event loop
+    clusters = await run_in_threadpool(spatial_engine.clusters, search_rect, cell_size)
+    return [
+        Cluster(
+            lng=cluster.centroid.x, lat=cluster.centroid.y, count=cluster.count,
+            price_min=cluster.price_min, price_max=cluster.price_max, price_avg=cluster.price_mean,
+            property_id=cluster.property_id if cluster.count == 1 else None
+        ) for cluster in clusters
     ]
-    return properties
+
+# Points within this many tile units outside a tile are included so
+# symbols near the edge are not clipped
+TILE_BUFFER = 64
+# Up to this zoom, tiles keep one property per THINNING_PIXELS square of
+# screen pixels (on a 256px tile)
+THINNING_MAX_ZOOM = 13
+THINNING_PIXELS = 2
+# Tiles need a bearer token, so only the client may cache them, not shared caches
+TILE_CACHE_CONTROL = "private, max-age=300"
+
+def build_property_tile(z: int, x: int, y: int, thin: bool) -> bytes:
+    """Encode the properties in an XYZ tile as a Mapbox Vector Tile 'properties' layer"""
+    min_lng, min_lat, max_lng, max_lat = mvt.tile_bounds(z, x, y)
+    pad_lng = (max_lng - min_lng) * TILE_BUFFER / mvt.EXTENT
+    pad_lat = (max_lat - min_lat) * TILE_BUFFER / mvt.EXTENT
+    search_rect = rtree_engine.create_rectangle(
+        min_lng - pad_lng, min_lat - pad_lat,
+        max_lng + pad_lng, max_lat + pad_lat
+    )
+    rows = spatial_engine.search_rows(search_rect)
+    px, py = mvt.project_to_tile(
+        z, x, y, spatial_engine.column('lng', rows), spatial_engine.column('lat', rows)
+    )
+    if thin and z <= THINNING_MAX_ZOOM:
+        keep = mvt.thin(px, py, THINNING_PIXELS * mvt.EXTENT // 256)
+        rows, px, py = rows[keep], px[keep], py[keep]
+
+    property_types = spatial_engine.property_types()
+    return mvt.encode_point_layer(
+        'properties',
+        spatial_engine.column('id', rows).tolist(),
+        px.tolist(), py.tolist(),
+        {
+            'price': spatial_engine.column('price', rows).tolist(),
+            'bedrooms': spatial_engine.column('bedrooms', rows).tolist(),
+            'property_type': [
+                property_types[code] for code in spatial_engine.column('property_type_code', rows).tolist()
+            ],
+        }
+    )
+
+@app.get("/tiles/{z}/{x}/{y}.mvt")
+async def property_tile(
+    z: int = Path(..., ge=0, le=22),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    thin: bool = True,
+    token: str = Depends(oauth2_scheme)
+):
+    """Properties in an XYZ tile as a Mapbox Vector Tile 'properties' layer"""
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile out of range")
+
+    # Searching, thinning and encoding a dense low-zoom tile is CPU-bound
+    tile = await run_in_threadpool(build_property_tile, z, x, y, thin)
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"Cache-Control": TILE_CACHE_CONTROL}
+    )
+
+@app.get("/cache/stats")
+async def cache_stats(token: str = Depends(oauth2_scheme)):
+    """Result cache hit counts and single-flight coalescing counts"""
+    return {
+        'cache': dict(query_cache.counters),
+        'single_flight': {**query_flights.counters, 'in_flight': query_flights.in_flight()},
+    }
 
 @app.get("/health")
 async def health_check():
@@ -106,3 +498,7 @@ async def health_check():
         "engine": "C++ R-tree",
         "indexed_properties": "Ready for queries"
     }
+
+# Registered last: the advanced endpoints share this module's spatial_engine
+from api.advanced_endpoints import router as advanced_router
+app.include_router(advanced_router)
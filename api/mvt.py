@@ -0,0 +1,135 @@
+"""
+Mapbox Vector Tile encoding for property points
+File: api/mvt.py
+
+A small hand-written protobuf encoder for the parts of the MVT 2.1 spec
+the API needs: one layer of point features with scalar attributes.
+"""
+
+import math
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+EXTENT = 4096
+MAX_LATITUDE = 85.0511287798066  # Web Mercator cuts off here
+
+# Protobuf wire types
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+
+_POINT = 1
+_MOVE_TO_ONE = (1 & 0x7) | (1 << 3)  # MoveTo command with a count of 1
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) of an XYZ Web Mercator tile"""
+    n = 2 ** z
+
+    def latitude(tile_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360.0 - 180.0, latitude(y + 1), (x + 1) / n * 360.0 - 180.0, latitude(y)
+
+
+def project_to_tile(z: int, x: int, y: int, lngs: np.ndarray, lats: np.ndarray,
+                    extent: int = EXTENT) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer tile coordinates of points; y grows downwards as MVT expects"""
+    n = 2 ** z
+    world_x = (np.asarray(lngs, dtype=np.float64) + 180.0) / 360.0 * n
+    lat_rad = np.radians(np.clip(np.asarray(lats, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    world_y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / math.pi) / 2.0 * n
+    return (np.floor((world_x - x) * extent).astype(np.int64),
+            np.floor((world_y - y) * extent).astype(np.int64))
+
+
+def thin(px: np.ndarray, py: np.ndarray, cell: int) -> np.ndarray:
+    """Sorted indexes keeping the first point in each cell x cell block of tile units"""
+    if len(px) == 0:
+        return np.arange(0)
+    # Shift by the buffer so keys stay non-negative
+    cx = (px - px.min()) // cell
+    cy = (py - py.min()) // cell
+    _, first = np.unique(cx * (int(cy.max()) + 1) + cy, return_index=True)
+    return np.sort(first)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _uint_field(field: int, value: int) -> bytes:
+    return _key(field, _VARINT) + _varint(value)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, _LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _packed_field(field: int, values: Sequence[int]) -> bytes:
+    return _bytes_field(field, b''.join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    """Tile Value message for a string, bool, int or float"""
+    if isinstance(value, str):
+        return _bytes_field(1, value.encode())
+    if isinstance(value, bool):
+        return _uint_field(7, int(value))
+    if isinstance(value, int):
+        return _uint_field(5, value) if value >= 0 else _uint_field(6, _zigzag(value))
+    return _key(3, _FIXED64) + struct.pack('<d', float(value))
+
+
+def encode_point_layer(name: str, ids: Sequence[int], px: Sequence[int], py: Sequence[int],
+                       attributes: Dict[str, Sequence[Any]], extent: int = EXTENT) -> bytes:
+    """Encode a tile holding one layer of point features.
+
+    `attributes` maps each attribute name to one value per feature (None to
+    omit it). Repeated values are stored once in the layer's value table.
+    """
+    keys = list(attributes)
+    columns = [list(attributes[key]) for key in keys]
+    values: Dict[Tuple[type, Any], int] = {}
+    features: List[bytes] = []
+
+    for i, (feature_id, x, y) in enumerate(zip(ids, px, py)):
+        tags = []
+        for key_index, column in enumerate(columns):
+            value = column[i]
+            if value is None:
+                continue
+            tags.append(key_index)
+            tags.append(values.setdefault((type(value), value), len(values)))
+        feature = (
+            (_uint_field(1, int(feature_id)) if feature_id >= 0 else b'')
+            + _packed_field(2, tags)
+            + _uint_field(3, _POINT)
+            + _packed_field(4, [_MOVE_TO_ONE, _zigzag(int(x)), _zigzag(int(y))])
+        )
+        features.append(_bytes_field(2, feature))
+
+    layer = (
+        _uint_field(15, 2)
+        + _bytes_field(1, name.encode())
+        + b''.join(features)
+        + b''.join(_bytes_field(3, key.encode()) for key in keys)
+        + b''.join(_bytes_field(4, _encode_value(value)) for _, value in values)
+        + _uint_field(5, extent)
+    )
+    return _bytes_field(3, layer)
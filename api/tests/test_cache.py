@@ -0,0 +1,157 @@
+"""
+Spatial query cache tests, against an in-memory fake Redis
+"""
+
+import asyncio
+
+import pytest
+
+from api.cache import SingleFlight
+from utils.query_cache import LRUCache, SpatialQueryCache
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+def test_lru_evicts_least_recently_used_and_expired():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # Evicts b, the least recently used
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    clock.now = 11
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_key_is_independent_of_param_order():
+    cache = SpatialQueryCache()
+    assert cache.key_for('range', {'a': 1, 'b': 2}) == cache.key_for('range', {'b': 2, 'a': 1})
+    assert cache.key_for('range', {'a': 1}) != cache.key_for('polygon', {'a': 1})
+
+
+def test_results_are_shared_through_redis(redis_client):
+    writer = SpatialQueryCache(redis_client)
+    reader = SpatialQueryCache(redis_client)
+    key = writer.key_for('range', {'bounds': [0, 0, 1, 1]})
+    writer.set(key, {'body': [{'id': 1}]}, bounds=(0, 0, 1, 1))
+
+    assert reader.get(key) == {'body': [{'id': 1}]}
+    assert redis_client.ttl(key) > 0
+
+
+def test_invalidation_only_evicts_queries_covering_the_point(redis_client):
+    cache = SpatialQueryCache(redis_client)
+    cache.set('near', 'near', bounds=(-74.1, 40.6, -73.9, 40.8))
+    cache.set('far', 'far', bounds=(-122.5, 37.7, -122.3, 37.8))
+    cache.set('everywhere', 'everywhere', bounds=None)
+
+    assert cache.invalidate_point(-74.0, 40.7) == 2
+
+    # A second process sharing the Redis sees the same evictions
+    other = SpatialQueryCache(redis_client)
+    assert other.get('near') is None
+    assert other.get('everywhere') is None
+    assert other.get('far') == 'far'
+    assert cache.get('far') == 'far'
+
+
+def test_invalidation_reaches_local_tiers_of_listening_processes(redis_client):
+    import time
+
+    api_cache = SpatialQueryCache(redis_client)
+    api_cache.listen_for_invalidations()
+    try:
+        api_cache.set('near', [1], bounds=(0, 0, 1, 1))
+        api_cache.set('far', [2], bounds=(10, 10, 11, 11))
+
+        # The ETL uses its own cache instance; only Redis is shared
+        assert SpatialQueryCache(redis_client).invalidate_point(0.5, 0.5) == 1
+
+        deadline = time.monotonic() + 5
+        while api_cache._local.get('near') is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert api_cache._local.get('near') is None
+        assert api_cache.get('far') == [2]
+    finally:
+        api_cache.stop_listening()
+
+
+def test_unreachable_redis_falls_back_to_local_tier():
+    class BrokenRedis:
+        def __getattr__(self, name):
+            raise ConnectionError('redis is down')
+
+    cache = SpatialQueryCache(BrokenRedis())
+    cache.set('key', [1, 2], bounds=(0, 0, 1, 1))
+    assert cache.get('key') == [1, 2]
+    assert cache.invalidate_point(0.5, 0.5) == 1
+    assert cache.get('key') is None
+
+
+def test_snapped_bounds_share_a_query_hash():
+    from utils.helpers import generate_query_hash, snap_bounds
+
+    a = {'min_lng': -122.41937, 'min_lat': 37.7749, 'max_lng': -122.3901, 'max_lat': 37.79}
+    b = {'min_lng': -122.4151, 'min_lat': 37.7712, 'max_lng': -122.3933, 'max_lat': 37.7898}
+    assert generate_query_hash({'bounds': a}) != generate_query_hash({'bounds': b})
+    assert generate_query_hash({'bounds': a}, grid_size=0.01) == generate_query_hash({'bounds': b}, grid_size=0.01)
+
+    # Snapping only ever grows the box
+    snapped = snap_bounds(a, geohash_precision=5)
+    assert snapped['min_lng'] <= a['min_lng'] and snapped['max_lng'] >= a['max_lng']
+    assert snapped['min_lat'] <= a['min_lat'] and snapped['max_lat'] >= a['max_lat']
+    assert snapped['min_lng'] == -122.431640625  # Edge of geohash cell 9q8yy
+
+
+def test_concurrent_identical_queries_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'body': [1, 2]}
+
+    async def main():
+        same = await asyncio.gather(*(flights.run('range:a', compute) for _ in range(5)))
+        other = await flights.run('range:b', compute)
+        return same, other
+
+    same, other = asyncio.run(main())
+    assert same == [{'body': [1, 2]}] * 5
+    assert other == {'body': [1, 2]}
+    assert len(calls) == 2
+    assert flights.counters == {'started': 2, 'merged': 4}
+    assert flights.in_flight() == 0
+
+
+def test_single_flight_failure_reaches_every_waiter():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError('bad query')
+
+    async def main():
+        return await asyncio.gather(*(flights.run('k', compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.counters['started'] == 1
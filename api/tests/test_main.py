@@ -29,6 +29,15 @@ def test_authentication_required(client):
     # Should return 401 or 403 without authentication
     assert response.status_code in [401, 403]
 
+def test_advanced_router_is_mounted(client):
+    """Test that the advanced spatial endpoints are served by the app"""
+    response = client.post("/api/v1/advanced/search/proximity", json={
+        "amenity_type": "school",
+        "distance_km": 1.0
+    })
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
 def test_range_search_with_auth(client, test_database, sample_properties):
     """Test range search with authentication"""
     # First, get authentication token
@@ -67,3 +76,187 @@ def test_range_search_with_auth(client, test_database, sample_properties):
         assert response.status_code == 200
         results = response.json()
         assert isinstance(results, list)
+
+def test_property_records_match_schema():
+    """Records read straight from the engine columns keep the Property schema"""
+    import rtree_engine
+    from api.main import Property, properties_from_rows, spatial_engine
+
+    spatial_engine.add_property(990001, "1 Test St", 300000.0, 2, 1.5, 900.0, -100.0, 10.0, "condo")
+    rows = spatial_engine.search_rows(rtree_engine.create_rectangle(-100.1, 9.9, -99.9, 10.1))
+    record, = properties_from_rows(rows)
+    assert list(record) == list(Property.model_fields)
+    assert Property(**record).model_dump() == record
+
+def test_range_search_streams_ndjson(client):
+    """Unpaged searches accepting NDJSON stream one record per line"""
+    import json
+    from api.main import spatial_engine
+
+    for i in range(3):
+        spatial_engine.add_property(990100 + i, f"{i} Stream St", 100000.0, 2, 1.0, 800.0, 120.0 + i * 0.001, -30.0, "house")
+    response = client.post(
+        "/search/range",
+        json={"bounds": {"min_lng": 119.9, "min_lat": -30.1, "max_lng": 120.1, "max_lat": -29.9}},
+        headers={"Authorization": "Bearer test", "Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(json.loads(line)["id"] for line in response.text.splitlines()) == [990100, 990101, 990102]
+
+def test_range_search_returns_arrow(client):
+    """Arrow IPC responses decode to the same columns as the JSON ones"""
+    from api.client import ARROW_STREAM_MEDIA_TYPE, read_arrow_frame
+    from api.main import Property, spatial_engine
+
+    for i in range(3):
+        spatial_engine.add_property(990200 + i, f"{i} Arrow St", 200000.0 + i, 3, 2.0, 1200.0, 130.0 + i * 0.001, -35.0, "condo")
+    body = {"bounds": {"min_lng": 129.9, "min_lat": -35.1, "max_lng": 130.1, "max_lat": -34.9}}
+    headers = {"Authorization": "Bearer test", "Accept": ARROW_STREAM_MEDIA_TYPE}
+
+    response = client.post("/search/range", json=body, headers=headers)
+    assert response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+    frame = read_arrow_frame(response.content).sort_values("id")
+    assert list(frame.columns) == list(Property.model_fields)
+    assert frame["id"].tolist() == [990200, 990201, 990202]
+    assert frame["property_type"].astype(str).tolist() == ["condo"] * 3
+
+    paged = client.post("/search/range", json={**body, "order_by": "price", "limit": 2}, headers=headers)
+    assert read_arrow_frame(paged.content)["price"].tolist() == [200000.0, 200001.0]
+    assert "X-Next-Cursor" in paged.headers
+
+def test_tiles_are_not_stored_by_shared_caches(client):
+    """Authenticated tiles may only be cached by the requesting client"""
+    response = client.get("/tiles/0/0/0.mvt", headers={"Authorization": "Bearer test"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("private")
+
+def test_clusters_are_computed_off_the_event_loop(client, monkeypatch):
+    """Clustering runs on the thread pool, not on the event loop's thread"""
+    import asyncio
+    import api.main as main
+
+    main.spatial_engine.add_property(990500, "1 Cluster St", 250000.0, 3, 2.0, 1500.0, 160.5, -20.5, "house")
+    engine, on_loop = main.spatial_engine, []
+
+    class RecordingEngine:
+        def clusters(self, *args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return engine.clusters(*args)
+
+    monkeypatch.setattr(main, 'spatial_engine', RecordingEngine())
+    response = client.get("/search/clusters", params={
+        "zoom": 10, "min_lng": 160.0, "min_lat": -21.0, "max_lng": 161.0, "max_lat": -20.0
+    }, headers={"Authorization": "Bearer test"})
+
+    assert response.status_code == 200
+    assert [(c["count"], c["property_id"]) for c in response.json()] == [(1, 990500)]
+    assert on_loop == [False]
+
+def test_large_unpaged_results_are_not_cached(client, monkeypatch):
+    """Unpaged results over QUERY_CACHE_MAX_RECORDS are served but not cached"""
+    import api.main as main
+
+    for i in range(3):
+        main.spatial_engine.add_property(990400 + i, f"{i} Cache St", 100000.0, 3, 2.0, 1500.0,
+                                         150.5 + i * 0.01, -30.5, "house")
+    body = {"bounds": {"min_lng": 150.0, "min_lat": -31.0, "max_lng": 151.0, "max_lat": -30.0}}
+    headers = {"Authorization": "Bearer test"}
+
+    main.query_cache.clear()
+    monkeypatch.setattr(main, 'QUERY_CACHE_MAX_RECORDS', 2)
+    misses = main.query_cache.counters['misses']
+    for _ in range(2):
+        response = client.post("/search/range", json=body, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+    assert main.query_cache.counters['misses'] == misses + 2
+
+    monkeypatch.setattr(main, 'QUERY_CACHE_MAX_RECORDS', 3)
+    client.post("/search/range", json=body, headers=headers)
+    hits = main.query_cache.counters['local_hits']
+    assert len(client.post("/search/range", json=body, headers=headers).json()) == 3
+    assert main.query_cache.counters['local_hits'] == hits + 1
+
+def test_tiles_are_built_off_the_event_loop(client, monkeypatch):
+    """Tile search and encoding run on the thread pool, not on the event loop's thread"""
+    import asyncio
+    import api.main as main
+
+    build, on_loop = main.build_property_tile, []
+
+    def recording_build(*args):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return build(*args)
+
+    monkeypatch.setattr(main, 'build_property_tile', recording_build)
+    response = client.get("/tiles/1/1/1.mvt", headers={"Authorization": "Bearer test"})
+
+    assert response.status_code == 200
+    assert on_loop == [False]
+
+def test_district_stats_read_from_view_or_engine(client, monkeypatch):
+    """District stats come from the ETL's view, or from the engine join when
+    the view cannot be read"""
+    import contextlib
+    from decimal import Decimal
+    import psycopg2
+    import api.advanced_endpoints as advanced
+    from api.main import query_cache, spatial_engine
+
+    spatial_engine.add_property(990300, "1 District St", 400000.0, 3, 2.0, 1500.0, 140.5, -40.5, "house")
+    spatial_engine.add_boundary_part(
+        990300, "Engine District", "district", [[(140, -41), (141, -41), (141, -40), (140, -40), (140, -41)]]
+    )
+
+    view = {'error': psycopg2.errors.UndefinedTable('relation does not exist'), 'rows': []}
+
+    class ViewCursor:
+        def execute(self, statement):
+            if view['error'] is not None:
+                raise view['error']
+        def fetchall(self):
+            return view['rows']
+        def close(self):
+            pass
+
+    class ViewDatabase:
+        @contextlib.contextmanager
+        def get_connection(self):
+            yield type('ViewConnection', (), {'cursor': lambda self: ViewCursor()})()
+
+    monkeypatch.setattr(advanced, 'db', ViewDatabase())
+    headers = {"Authorization": "Bearer test"}
+
+    def districts():
+        query_cache.clear()
+        response = client.get("/api/v1/advanced/search/districts", headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    assert districts()["Engine District"]["count"] == 1
+
+    view['error'] = psycopg2.OperationalError('server closed the connection')
+    assert districts()["Engine District"]["min_price"] == 400000.0
+
+    view['error'] = None
+    view['rows'] = [
+        {'district_id': 7, 'district_name': 'Stored District', 'property_count': 2,
+         'avg_price': Decimal('150000'), 'min_price': Decimal('100000'), 'max_price': Decimal('200000')},
+        {'district_id': 8, 'district_name': 'Empty District', 'property_count': 0,
+         'avg_price': None, 'min_price': None, 'max_price': None},
+    ]
+    assert districts() == {
+        'Stored District': {'district_id': 7, 'count': 2, 'avg_price': 150000.0,
+                            'min_price': 100000.0, 'max_price': 200000.0},
+        'Empty District': {'district_id': 8, 'count': 0, 'avg_price': None,
+                           'min_price': None, 'max_price': None},
+    }
@@ -0,0 +1,123 @@
+"""
+Mapbox Vector Tile encoder tests
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from api import mvt
+
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def read_fields(data):
+    """(field, value) pairs of a protobuf message; length-delimited values stay bytes"""
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = struct.unpack('<d', data[pos:pos + 8])[0], pos + 8
+        else:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        yield field, value
+
+
+def unpack(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_layer(tile):
+    """Decode a single-layer point tile into (name, extent, features)"""
+    (field, layer), = read_fields(tile)
+    assert field == 3
+    name, extent, keys, values, raw_features = None, None, [], [], []
+    for field, value in read_fields(layer):
+        if field == 1:
+            name = value.decode()
+        elif field == 2:
+            raw_features.append(value)
+        elif field == 3:
+            keys.append(value.decode())
+        elif field == 4:
+            (kind, v), = read_fields(value)
+            values.append(v.decode() if kind == 1 else unzigzag(v) if kind == 6 else v)
+        elif field == 5:
+            extent = value
+
+    features = []
+    for raw in raw_features:
+        feature = dict(read_fields(raw))
+        tags = unpack(feature[2])
+        command, x, y = unpack(feature[4])
+        assert feature[3] == 1 and command == 9
+        features.append({
+            'id': feature.get(1),
+            'point': (unzigzag(x), unzigzag(y)),
+            'properties': {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])},
+        })
+    return name, extent, features
+
+
+def test_point_layer_round_trip():
+    tile = mvt.encode_point_layer(
+        'properties', [7, 8], [10, -3], [4095, 200],
+        {'price': [250000.0, 250000.0], 'bedrooms': [3, None], 'property_type': ['house', 'condo']}
+    )
+    name, extent, features = decode_layer(tile)
+
+    assert name == 'properties'
+    assert extent == mvt.EXTENT
+    assert features[0] == {
+        'id': 7, 'point': (10, 4095),
+        'properties': {'price': 250000.0, 'bedrooms': 3, 'property_type': 'house'},
+    }
+    assert features[1]['point'] == (-3, 200)
+    assert features[1]['properties'] == {'price': 250000.0, 'property_type': 'condo'}
+
+
+def test_repeated_values_are_stored_once():
+    tile = mvt.encode_point_layer('properties', [1, 2, 3], [0, 1, 2], [0, 1, 2],
+                                  {'property_type': ['house'] * 3})
+    (_, layer), = read_fields(tile)
+    assert sum(1 for field, _ in read_fields(layer) if field == 4) == 1
+
+
+def test_tile_projection_matches_bounds():
+    min_lng, min_lat, max_lng, max_lat = mvt.tile_bounds(12, 1205, 1539)
+    px, py = mvt.project_to_tile(
+        12, 1205, 1539,
+        np.array([min_lng + 1e-9, max_lng - 1e-9]), np.array([max_lat - 1e-9, min_lat + 1e-9])
+    )
+    assert px.tolist() == [0, mvt.EXTENT - 1]
+    assert py.tolist() == [0, mvt.EXTENT - 1]
+    assert mvt.tile_bounds(1, 0, 0) == pytest.approx((-180.0, 0.0, 0.0, mvt.MAX_LATITUDE))
+
+
+def test_thin_keeps_one_point_per_cell():
+    px = np.array([0, 3, 40, 41, 100])
+    py = np.array([0, 2, 0, 63, 100])
+    assert mvt.thin(px, py, 32).tolist() == [0, 2, 3, 4]
+    assert mvt.thin(px, py, 64).tolist() == [0, 4]
@@ -4,13 +4,16 @@ File: database/connection.py
 Purpose: Manage PostgreSQL connections with proper schema awareness
 """
 
+import io
 import os
+import re
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
 from psycopg2.pool import ThreadedConnectionPool
 from contextlib import contextmanager
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
 from dataclasses import dataclass
 import threading
 from pathlib import Path
@@ -28,6 +31,115 @@ class DatabaseConfig:
     pool_max: int = 20
     schema_search_path: str = 'core,analytics,admin,public'
 
+# Escapes required by the COPY text format
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+COPY_NULL = '\\N'
+
+
+def encode_copy_value(value: Any) -> str:
+    """Encode a single Python value for the COPY text format"""
+    if value is None or (isinstance(value, float) and value != value):
+        return COPY_NULL
+    return str(value).translate(COPY_ESCAPES)
+
+
+def encode_copy_rows(records: Iterable[Sequence[Any]], rows_per_chunk: int = 1000) -> Iterator[str]:
+    """Encode row tuples as COPY text, yielding one chunk of lines at a time"""
+    lines = []
+    for record in records:
+        lines.append('\t'.join(encode_copy_value(value) for value in record))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+class CopyStream(io.TextIOBase):
+    """Read-only file object over an iterator of COPY text chunks.
+
+    Lets ``copy_expert`` pull data lazily so a load never has to hold the
+    whole payload in memory.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        available = len(self._buffer)
+        while size < 0 or available < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            available += len(chunk)
+
+        data = ''.join(parts)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+    def readline(self, size: int = -1) -> str:
+        while '\n' not in self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        end = self._buffer.find('\n') + 1 or len(self._buffer)
+        if 0 <= size < end:
+            end = size
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        return line
+
+
+# Tokens that can contain a ';' that does not end a statement
+_SQL_TOKEN = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$|;", re.DOTALL)
+_SQL_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def split_sql_statements(script: str) -> List[str]:
+    """Split a SQL script on the semicolons that end statements, keeping
+    those inside quotes, comments and dollar-quoted function bodies.
+
+    Statements made only of comments are dropped.
+    """
+    statements = []
+    start = pos = 0
+    while True:
+        match = _SQL_TOKEN.search(script, pos)
+        if match is None:
+            break
+        token = match.group(0)
+        if token == ';':
+            statements.append(script[start:match.start()])
+            start = match.end()
+            pos = match.end()
+        elif token.startswith('$'):
+            # Skip to the matching closing tag of a $tag$ ... $tag$ body
+            end = script.find(token, match.end())
+            pos = len(script) if end < 0 else end + len(token)
+        else:
+            pos = match.end()
+    statements.append(script[start:])
+    return [stmt.strip() for stmt in statements if _SQL_COMMENT.sub('', stmt).strip()]
+
+
+def _table_identifier(table: str) -> sql.Identifier:
+    """Build a (possibly schema-qualified) identifier from 'schema.table'"""
+    return sql.Identifier(*table.split('.'))
+
+
+def _column_list(columns: Sequence[str]) -> sql.Composed:
+    return sql.SQL(', ').join(sql.Identifier(col) for col in columns)
+
+
 class DatabaseManager:
     """Centralized database connection manager with schema awareness"""
     
@@ -102,12 +214,110 @@ class DatabaseManager:
             if conn:
                 self.connection_pool.putconn(conn)
     
+    @contextmanager
+    def get_transaction(self):
+        """Get a pooled connection wrapped in a single transaction.
+
+        Commits when the block exits cleanly; any exception rolls the whole
+        transaction back (see ``get_connection``).
+        """
+        with self.get_connection() as conn:
+            yield conn
+            conn.commit()
+
+    @contextmanager
+    def _transaction_scope(self, conn=None):
+        """Reuse the caller's transaction if given, otherwise open a new one"""
+        if conn is not None:
+            yield conn
+        else:
+            with self.get_transaction() as conn:
+                yield conn
+
+    def copy_text(self, table: str, columns: Sequence[str], chunks: Iterable[str], conn=None) -> int:
+        """Stream pre-encoded COPY text chunks into a table via COPY FROM STDIN"""
+        copy_sql = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            _table_identifier(table), _column_list(columns)
+        )
+        with self._transaction_scope(conn) as conn:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(copy_sql, CopyStream(chunks))
+                return cursor.rowcount
+
+    def copy_records(self, table: str, columns: Sequence[str], records: Iterable[Sequence[Any]], conn=None) -> int:
+        """Bulk insert row tuples into a table using COPY FROM STDIN"""
+        return self.copy_text(table, columns, encode_copy_rows(records), conn=conn)
+
+    def create_staging_table(self, table: str, columns: Sequence[str], conn) -> str:
+        """Create a temporary, column-compatible staging table for ``table``.
+
+        The staging table is dropped automatically when the transaction commits.
+        """
+        staging = f"_staging_{table.replace('.', '_')}"
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(staging)))
+            cursor.execute(
+                sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                    sql.Identifier(staging), _column_list(columns), _table_identifier(table)
+                )
+            )
+        return staging
+
+    def merge_staging(self, staging: str, table: str, columns: Sequence[str],
+                      conflict_columns: Sequence[str],
+                      update_columns: Optional[Sequence[str]] = None, conn=None) -> int:
+        """Merge a staging table into ``table`` with INSERT ... ON CONFLICT.
+
+        When the staging table holds several rows with the same conflict
+        key, the last one copied in wins.
+        """
+        if update_columns:
+            on_conflict = sql.SQL("DO UPDATE SET {}").format(
+                sql.SQL(', ').join(
+                    sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(col)) for col in update_columns
+                )
+            )
+        else:
+            on_conflict = sql.SQL("DO NOTHING")
+
+        merge_sql = sql.SQL("""
+            INSERT INTO {table} ({columns})
+            SELECT DISTINCT ON ({conflict}) {columns} FROM {staging}
+            ORDER BY {conflict}, ctid DESC
+            ON CONFLICT ({conflict}) {on_conflict}
+        """).format(
+            table=_table_identifier(table),
+            columns=_column_list(columns),
+            conflict=_column_list(conflict_columns),
+            staging=sql.Identifier(staging),
+            on_conflict=on_conflict,
+        )
+        with self._transaction_scope(conn) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(merge_sql)
+                return cursor.rowcount
+
+    def upsert_many(self, table: str, columns: Sequence[str], records: Iterable[Sequence[Any]],
+                    conflict_columns: Sequence[str],
+                    update_columns: Optional[Sequence[str]] = None, conn=None) -> int:
+        """COPY records into a staging table and merge them with ON CONFLICT.
+
+        Without ``update_columns`` conflicting rows are left untouched.
+        Returns the number of rows inserted or updated.
+        """
+        with self._transaction_scope(conn) as conn:
+            staging = self.create_staging_table(table, columns, conn)
+            self.copy_records(staging, columns, records, conn=conn)
+            return self.merge_staging(
+                staging, table, columns, conflict_columns, update_columns, conn=conn
+            )
+
     def initialize_database(self, sql_file_path):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             with open(sql_file_path, 'r') as f:
                 sql_script = f.read()
-                statements = [stmt.strip() for stmt in sql_script.split(';') if stmt.strip()]
+                statements = split_sql_statements(sql_script)
                 for stmt in statements:
                     try:
                         cursor.execute(stmt)
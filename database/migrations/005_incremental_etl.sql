@@ -0,0 +1,15 @@
+-- Migration: Incremental ETL support
+-- Adds per-row content hashes and per-source watermarks so property loads
+-- can skip unchanged rows and resume from the last processed position.
+
+ALTER TABLE core.properties ADD COLUMN IF NOT EXISTS content_hash BIGINT;
+
+-- How far each pipeline got through a given source (rows consumed)
+CREATE TABLE IF NOT EXISTS core.etl_watermarks (
+    pipeline VARCHAR(100) NOT NULL,
+    source_path TEXT NOT NULL,
+    source_position BIGINT NOT NULL DEFAULT 0 CHECK (source_position >= 0),
+    source_size BIGINT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (pipeline, source_path)
+);
@@ -0,0 +1,27 @@
+-- Migration: Subdivided administrative boundaries
+-- Boundaries are split with ST_Subdivide into parts with a bounded vertex
+-- count so point-in-boundary joins stay fast on large county/district polygons.
+
+CREATE TABLE IF NOT EXISTS core.administrative_boundaries (
+    id BIGSERIAL PRIMARY KEY,
+    boundary_name VARCHAR(255) NOT NULL,
+    boundary_type VARCHAR(100) NOT NULL,
+    geom GEOMETRY(MULTIPOLYGON, 4326) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(boundary_name, boundary_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_boundaries_geom
+ON core.administrative_boundaries USING GIST (geom);
+
+CREATE TABLE IF NOT EXISTS core.administrative_boundary_parts (
+    id BIGSERIAL PRIMARY KEY,
+    boundary_id BIGINT NOT NULL REFERENCES core.administrative_boundaries(id) ON DELETE CASCADE,
+    geom GEOMETRY(MULTIPOLYGON, 4326) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_boundary_parts_geom
+ON core.administrative_boundary_parts USING GIST (geom);
+
+CREATE INDEX IF NOT EXISTS idx_boundary_parts_boundary
+ON core.administrative_boundary_parts (boundary_id);
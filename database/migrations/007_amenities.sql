@@ -0,0 +1,18 @@
+-- Migration: Amenities
+-- Points of interest (schools, hospitals, parks, ...) loaded by AmenityETL
+-- and indexed per amenity_type by the in-memory engine at API startup.
+
+CREATE TABLE IF NOT EXISTS core.amenities (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    amenity_type VARCHAR(100) NOT NULL,
+    geom GEOMETRY(POINT, 4326) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(name, amenity_type, geom)
+);
+
+CREATE INDEX IF NOT EXISTS idx_amenities_geom
+ON core.amenities USING GIST (geom);
+
+CREATE INDEX IF NOT EXISTS idx_amenities_type
+ON core.amenities (amenity_type);
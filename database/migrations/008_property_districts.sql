@@ -0,0 +1,130 @@
+-- Migration: Precomputed property districts
+-- Each property stores the id of the district (administrative boundary of
+-- type 'district') it falls in, and analytics.district_property_stats
+-- keeps per-district aggregates, so district statistics no longer repeat
+-- the point-in-polygon join on every request.
+--
+-- Bulk loads leave district_id NULL and flag the rows district_pending;
+-- the assign_property_districts post-load task resolves only the flagged
+-- rows with one set-based join, so properties outside every district are
+-- not rescanned on each run. A trigger keeps district_id current when a
+-- single property's geometry changes.
+
+ALTER TABLE core.properties ADD COLUMN IF NOT EXISTS district_id BIGINT
+    REFERENCES core.administrative_boundaries(id) ON DELETE SET NULL;
+
+-- Rows that exist when the migration runs start out pending
+ALTER TABLE core.properties ADD COLUMN IF NOT EXISTS district_pending BOOLEAN NOT NULL DEFAULT TRUE;
+ALTER TABLE core.properties ALTER COLUMN district_pending SET DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_properties_district
+ON core.properties (district_id);
+
+-- Properties waiting for assign_property_districts
+CREATE INDEX IF NOT EXISTS idx_properties_pending_district
+ON core.properties (id) WHERE district_pending;
+
+-- District containing a point, tested against the subdivided boundary
+-- parts where the boundary ETL made them; the lowest id wins on overlaps
+CREATE OR REPLACE FUNCTION core.district_at(point GEOMETRY)
+RETURNS BIGINT AS $$
+    SELECT min(district_id) FROM (
+        SELECT p.boundary_id AS district_id
+        FROM core.administrative_boundary_parts p
+        JOIN core.administrative_boundaries b ON b.id = p.boundary_id
+        WHERE b.boundary_type = 'district' AND ST_Intersects(p.geom, point)
+        UNION ALL
+        SELECT b.id
+        FROM core.administrative_boundaries b
+        WHERE b.boundary_type = 'district' AND ST_Intersects(b.geom, point)
+          AND NOT EXISTS (SELECT 1 FROM core.administrative_boundary_parts p WHERE p.boundary_id = b.id)
+    ) candidates;
+$$ LANGUAGE sql STABLE;
+
+-- Assign every property flagged district_pending, clearing the flag also
+-- for properties outside every district; returns the number of properties
+-- assigned a district. Set district_pending to force reassignment.
+CREATE OR REPLACE FUNCTION core.assign_property_districts()
+RETURNS BIGINT AS $$
+DECLARE
+    assigned BIGINT;
+BEGIN
+    WITH pending AS (
+        SELECT id, geom FROM core.properties WHERE district_pending
+    ), matched AS (
+        SELECT id, min(district_id) AS district_id
+        FROM (
+            SELECT pr.id, p.boundary_id AS district_id
+            FROM pending pr
+            JOIN core.administrative_boundary_parts p ON ST_Intersects(p.geom, pr.geom)
+            JOIN core.administrative_boundaries b ON b.id = p.boundary_id
+            WHERE b.boundary_type = 'district'
+            UNION ALL
+            SELECT pr.id, b.id
+            FROM pending pr
+            JOIN core.administrative_boundaries b ON ST_Intersects(b.geom, pr.geom)
+            WHERE b.boundary_type = 'district'
+              AND NOT EXISTS (SELECT 1 FROM core.administrative_boundary_parts p WHERE p.boundary_id = b.id)
+        ) candidates
+        GROUP BY id
+    ), resolved AS (
+        UPDATE core.properties pr
+        SET district_id = m.district_id, district_pending = FALSE
+        FROM pending
+        LEFT JOIN matched m USING (id)
+        WHERE pr.id = pending.id
+        RETURNING pr.district_id
+    )
+    SELECT count(district_id) INTO assigned FROM resolved;
+    RETURN assigned;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keeps district_id current when a property is added or moved. Values set
+-- explicitly are kept; with spatial.defer_district_assignment = 'on' (set
+-- by bulk loads) the district is cleared and left pending for the
+-- post-load task instead.
+CREATE OR REPLACE FUNCTION core.assign_property_district()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' AND NEW.district_id IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+    IF TG_OP = 'UPDATE' AND (NEW.district_id IS DISTINCT FROM OLD.district_id OR ST_Equals(NEW.geom, OLD.geom)) THEN
+        RETURN NEW;
+    END IF;
+
+    IF current_setting('spatial.defer_district_assignment', true) = 'on' THEN
+        NEW.district_id := NULL;
+        NEW.district_pending := TRUE;
+    ELSE
+        NEW.district_id := core.district_at(NEW.geom);
+        NEW.district_pending := FALSE;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_property_district ON core.properties;
+CREATE TRIGGER trg_property_district
+    BEFORE INSERT OR UPDATE OF geom ON core.properties
+    FOR EACH ROW
+    EXECUTE FUNCTION core.assign_property_district();
+
+-- Per-district aggregates read by /api/v1/advanced/search/districts;
+-- refreshed by the refresh_district_property_stats post-load task
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics.district_property_stats AS
+SELECT b.id AS district_id,
+       b.boundary_name AS district_name,
+       COUNT(p.id) AS property_count,
+       AVG(p.price) AS avg_price,
+       MIN(p.price) AS min_price,
+       MAX(p.price) AS max_price
+FROM core.administrative_boundaries b
+LEFT JOIN core.properties p ON p.district_id = b.id
+WHERE b.boundary_type = 'district'
+GROUP BY b.id, b.boundary_name;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_district_property_stats_id
+ON analytics.district_property_stats (district_id);
@@ -38,6 +38,7 @@ CREATE TABLE core.properties (
     data_source VARCHAR(50) NOT NULL,
     data_quality_score DECIMAL(3,2) DEFAULT 1.0,
     last_verified TIMESTAMP,
+    content_hash BIGINT, -- Hash of loaded attributes for incremental ETL
     
     -- Audit fields
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
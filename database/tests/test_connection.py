@@ -36,3 +36,66 @@ def test_spatial_query(test_database):
         result = cursor.fetchone()
         assert list(result.values())[0] >= 1
         conn.commit()
+
+
+def test_upsert_many_copies_and_merges(test_database):
+    """Test COPY-based upsert inserts new rows and updates conflicting ones"""
+    db_manager = test_database
+    columns = ['external_id', 'address', 'city', 'state', 'price', 'geom', 'property_type', 'data_source']
+    rows = [
+        ('TEST_UPSERT_1', '1 Copy St', 'Test City', 'TS', 100000, 'SRID=4326;POINT(-74.0 40.7)', 'residential', 'test'),
+        ('TEST_UPSERT_2', '2 Copy\tSt', 'Test City', 'TS', 200000, 'SRID=4326;POINT(-74.1 40.8)', 'residential', 'test'),
+    ]
+
+    with db_manager.get_transaction() as conn:
+        assert db_manager.upsert_many('core.properties', columns, rows, ['external_id'], ['price'], conn=conn) == 2
+
+    updated = [rows[0][:4] + (150000,) + rows[0][5:]]
+    db_manager.upsert_many('core.properties', columns, updated, ['external_id'], ['price'])
+
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT external_id, address, price FROM core.properties "
+            "WHERE external_id LIKE 'TEST_UPSERT_%%' ORDER BY external_id"
+        )
+        result = cursor.fetchall()
+        assert [r['price'] for r in result] == [150000, 200000]
+        assert result[1]['address'] == '2 Copy\tSt'
+
+
+def test_upsert_many_keeps_last_duplicate(test_database):
+    """Test the last of several rows with the same conflict key wins"""
+    db_manager = test_database
+    columns = ['external_id', 'address', 'city', 'state', 'price', 'geom', 'property_type', 'data_source']
+    rows = [
+        ('TEST_DUP_1', '1 Dup St', 'Test City', 'TS', price, 'SRID=4326;POINT(-74.0 40.7)', 'residential', 'test')
+        for price in (100000, 300000, 200000)
+    ]
+
+    assert db_manager.upsert_many('core.properties', columns, rows, ['external_id'], ['price']) == 1
+
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT price FROM core.properties WHERE external_id = 'TEST_DUP_1'")
+        assert cursor.fetchone()['price'] == 200000
+
+
+def test_split_sql_statements_keeps_function_bodies():
+    """Test semicolons inside quotes, comments and $$ bodies do not split"""
+    from database.connection import split_sql_statements
+
+    script = """
+        -- Header comment; not a statement
+        CREATE FUNCTION f() RETURNS INT AS $$
+        BEGIN
+            RETURN 1;
+        END;
+        $$ LANGUAGE plpgsql;
+        SELECT 'a;b' /* c; */;
+        -- Trailing comment
+    """
+    statements = split_sql_statements(script)
+    assert len(statements) == 2
+    assert statements[0].endswith('$$ LANGUAGE plpgsql')
+    assert statements[1] == "SELECT 'a;b' /* c; */"
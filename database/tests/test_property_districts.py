@@ -0,0 +1,107 @@
+"""
+Precomputed property district tests (migration 008_property_districts.sql)
+"""
+
+import pytest
+
+
+def insert_district(cursor, name, min_lng, min_lat, max_lng, max_lat):
+    cursor.execute(
+        "INSERT INTO core.administrative_boundaries (boundary_name, boundary_type, geom) "
+        "VALUES (%s, 'district', ST_Multi(ST_MakeEnvelope(%s, %s, %s, %s, 4326))) RETURNING id",
+        (name, min_lng, min_lat, max_lng, max_lat)
+    )
+    return cursor.fetchone()['id']
+
+
+def insert_property(cursor, external_id, lng, lat, price=100000, district_id=None):
+    cursor.execute(
+        "INSERT INTO core.properties (external_id, address, city, state, price, geom, property_type, data_source, district_id) "
+        "VALUES (%s, '1 District St', 'Test City', 'TS', %s, ST_SetSRID(ST_Point(%s, %s), 4326), 'residential', 'test', %s) "
+        "RETURNING id, district_id",
+        (external_id, price, lng, lat, district_id)
+    )
+    return cursor.fetchone()
+
+
+def test_trigger_assigns_district_on_insert_and_move(test_database):
+    """Test the trigger assigns new and moved properties and keeps explicit values"""
+    with test_database.get_transaction() as conn:
+        cursor = conn.cursor()
+        west = insert_district(cursor, 'Trigger West', 10.0, 50.0, 11.0, 51.0)
+        east = insert_district(cursor, 'Trigger East', 11.0, 50.0, 12.0, 51.0)
+
+        row = insert_property(cursor, 'DISTRICT_TRIGGER_1', 10.5, 50.5)
+        assert row['district_id'] == west
+        assert insert_property(cursor, 'DISTRICT_TRIGGER_2', 20.0, 50.5)['district_id'] is None
+        assert insert_property(cursor, 'DISTRICT_TRIGGER_3', 10.5, 50.5, district_id=east)['district_id'] == east
+
+        cursor.execute(
+            "UPDATE core.properties SET geom = ST_SetSRID(ST_Point(11.5, 50.5), 4326) WHERE id = %s RETURNING district_id",
+            (row['id'],)
+        )
+        assert cursor.fetchone()['district_id'] == east
+
+        # Updates that leave the location alone keep the stored district
+        cursor.execute("UPDATE core.properties SET price = 1 WHERE id = %s RETURNING district_id", (row['id'],))
+        assert cursor.fetchone()['district_id'] == east
+
+
+def test_deferred_loads_are_assigned_in_bulk(test_database):
+    """Test deferred inserts stay unassigned until assign_property_districts runs"""
+    with test_database.get_transaction() as conn:
+        cursor = conn.cursor()
+        district = insert_district(cursor, 'Deferred', 30.0, 50.0, 31.0, 51.0)
+
+        cursor.execute("SET LOCAL spatial.defer_district_assignment = 'on'")
+        ids = [insert_property(cursor, f'DISTRICT_DEFERRED_{i}', 30.1 + i * 0.2, 50.5)['id'] for i in range(3)]
+        cursor.execute("SELECT count(*) AS unassigned FROM core.properties WHERE id = ANY(%s) AND district_id IS NULL", (ids,))
+        assert cursor.fetchone()['unassigned'] == 3
+
+        outside = insert_property(cursor, 'DISTRICT_DEFERRED_OUTSIDE', 35.0, 50.5)['id']
+
+        cursor.execute("SELECT core.assign_property_districts() AS assigned")
+        assert cursor.fetchone()['assigned'] >= 3
+        cursor.execute("SELECT DISTINCT district_id FROM core.properties WHERE id = ANY(%s)", (ids,))
+        assert [r['district_id'] for r in cursor.fetchall()] == [district]
+
+        # Properties outside every district are resolved too, and not rescanned
+        cursor.execute(
+            "SELECT count(*) AS pending FROM core.properties WHERE id = ANY(%s) AND district_pending",
+            (ids + [outside],)
+        )
+        assert cursor.fetchone()['pending'] == 0
+        cursor.execute("SELECT core.assign_property_districts() AS assigned")
+        assert cursor.fetchone()['assigned'] == 0
+
+
+def test_district_stats_view_refreshes_concurrently(test_database):
+    """Test REFRESH ... CONCURRENTLY picks up newly assigned properties"""
+    with test_database.get_transaction() as conn:
+        cursor = conn.cursor()
+        district = insert_district(cursor, 'Refreshed', 40.0, 50.0, 41.0, 51.0)
+        insert_property(cursor, 'DISTRICT_REFRESH_1', 40.2, 50.5, price=100000)
+        insert_property(cursor, 'DISTRICT_REFRESH_2', 40.8, 50.5, price=300000)
+
+    with test_database.get_connection() as conn:
+        # CONCURRENTLY cannot run inside a transaction block; end the one
+        # get_connection's SET search_path opened before switching modes
+        conn.commit()
+        conn.autocommit = True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY analytics.district_property_stats")
+            cursor.execute(
+                "SELECT district_name, property_count, avg_price, min_price, max_price "
+                "FROM analytics.district_property_stats WHERE district_id = %s",
+                (district,)
+            )
+            stats = cursor.fetchone()
+        finally:
+            conn.autocommit = False
+
+    assert stats['district_name'] == 'Refreshed'
+    assert stats['property_count'] == 2
+    assert float(stats['avg_price']) == pytest.approx(200000)
+    assert float(stats['min_price']) == 100000
+    assert float(stats['max_price']) == 300000
@@ -3,13 +3,19 @@ Amenity Data ETL Pipeline
 File: src/spatial_search_engine/etl/amenity_etl.py
 """
 
+import numpy as np
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point
+import shapely
 from typing import Dict, Any, List
 from .base_etl import BaseETL
-from ..database.connection import db
-import psycopg2.extras
+from .bulk_load import encode_copy_frame, ewkb_hex
+from database.connection import db
+
+# Column order used when streaming amenity rows into core.amenities
+AMENITY_COLUMNS = ['name', 'amenity_type', 'geom', 'created_at']
+
+POINT_TYPE_ID = 0
 
 class AmenityETL(BaseETL):
     """ETL pipeline for amenity data (schools, hospitals, parks, etc.)"""
@@ -17,6 +23,7 @@ class AmenityETL(BaseETL):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.amenity_types = config.get('amenity_types', ['school', 'hospital', 'park'])
+        self.batch_size = config.get('batch_size', 500)
     
     def extract(self) -> gpd.GeoDataFrame:
         """Extract amenity data from shapefile or other sources"""
@@ -60,59 +67,45 @@ class AmenityETL(BaseETL):
     def load(self, gdf: gpd.GeoDataFrame) -> bool:
         """Load amenities into database"""
         try:
-            # Create amenities table if not exists
-            self._create_amenities_table()
+            frame = self._prepare_load_frame(gdf)
             
+            # Stream hex EWKB points through COPY into a staging table and
+            # merge into core.amenities (see migration 007) in one transaction
             with db.get_transaction() as conn:
-                cursor = conn.cursor()
-                
-                insert_query = """
-                    INSERT INTO core.amenities (
-                        name, amenity_type, geom, created_at
-                    ) VALUES %s
-                    ON CONFLICT (name, amenity_type, geom) DO NOTHING
-                """
-                
-                batch_data = []
-                for _, row in gdf.iterrows():
-                    batch_data.append((
-                        row.get('name', 'Unknown'),
-                        row.get('amenity_type', 'unknown'),
-                        f"POINT({row.geometry.x} {row.geometry.y})",
-                        row.get('created_at')
-                    ))
-                
-                psycopg2.extras.execute_values(
-                    cursor, insert_query, batch_data, page_size=100
+                staging = db.create_staging_table('core.amenities', AMENITY_COLUMNS, conn)
+                db.copy_text(
+                    staging, AMENITY_COLUMNS,
+                    encode_copy_frame(frame, rows_per_chunk=self.batch_size),
+                    conn=conn
                 )
-                
-                self.logger.info(f"Loaded {len(batch_data)} amenity records")
-                return True
+                loaded = db.merge_staging(
+                    staging, 'core.amenities', AMENITY_COLUMNS,
+                    conflict_columns=['name', 'amenity_type', 'geom'],
+                    conn=conn
+                )
+            
+            self.logger.info(f"Loaded {loaded} amenity records")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Failed to load amenities: {e}")
             return False
     
-    def _create_amenities_table(self):
-        """Create amenities table if it doesn't exist"""
-        create_table_sql = """
-            CREATE TABLE IF NOT EXISTS core.amenities (
-                id BIGSERIAL PRIMARY KEY,
-                name VARCHAR(255) NOT NULL,
-                amenity_type VARCHAR(100) NOT NULL,
-                geom GEOMETRY(POINT, 4326) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(name, amenity_type, geom)
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_amenities_geom 
-            ON core.amenities USING GIST (geom);
-            
-            CREATE INDEX IF NOT EXISTS idx_amenities_type 
-            ON core.amenities (amenity_type);
-        """
+    def _prepare_load_frame(self, gdf: gpd.GeoDataFrame) -> pd.DataFrame:
+        """Build the load columns in AMENITY_COLUMNS order with vectorised ops"""
+        geometries = gdf.geometry.values
+        keep = ~(shapely.is_missing(geometries) | shapely.is_empty(geometries))
+        if not keep.all():
+            self.logger.warning(f"Skipping {int((~keep).sum())} amenities without geometry")
+        
+        # Areal amenities (parks, campuses) are indexed by a point inside them
+        geometries = np.asarray(geometries[keep], dtype=object)
+        points = shapely.get_type_id(geometries) == POINT_TYPE_ID
+        geometries[~points] = shapely.point_on_surface(geometries[~points])
         
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
+        return pd.DataFrame({
+            'name': gdf['name'].to_numpy()[keep],
+            'amenity_type': gdf['amenity_type'].to_numpy()[keep],
+            'geom': ewkb_hex(geometries),
+            'created_at': gdf['created_at'].to_numpy()[keep],
+        })
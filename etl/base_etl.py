@@ -4,8 +4,12 @@ File: etl/base_etl.py
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Union
 import logging
+import queue
+import threading
 import pandas as pd
 import geopandas as gpd
 from datetime import datetime
@@ -25,6 +29,19 @@ class BaseETL(ABC):
             'records_loaded': 0,
             'errors': []
         }
+        # Source rows already consumed (set when a streaming run resumes) and
+        # the position reached once the chunk currently being loaded commits
+        self.start_position = 0
+        self.load_position = None
+        self.checkpoint = None
+        self.checkpoint_name = None
+    
+    def __getstate__(self):
+        # Transform workers receive a pickled copy of the pipeline; the
+        # checkpoint store holds a lock and is only used by the loader
+        state = self.__dict__.copy()
+        state['checkpoint'] = None
+        return state
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging for ETL operations"""
@@ -56,32 +73,47 @@ class BaseETL(ABC):
         """Load transformed data to destination"""
         pass
     
+    def extract_chunks(self) -> Iterator[Any]:
+        """Extract data as an iterator of chunks for streaming runs.
+        
+        The default yields the whole extract as one chunk; pipelines that can
+        read their source incrementally should override this.
+        """
+        yield self.extract()
+    
+    def attach_checkpoint(self, store, name: str):
+        """Record committed chunks in ``store`` under pipeline ``name``"""
+        self.checkpoint = store
+        self.checkpoint_name = name
+    
+    def resume_position(self) -> int:
+        """Source position a streaming run should resume from.
+        
+        ``extract_chunks`` implementations skip this many source rows.
+        """
+        if self.checkpoint is None:
+            return 0
+        return self.checkpoint.get_pipeline(self.checkpoint_name).get('source_position', 0)
+    
     def run(self) -> Dict[str, Any]:
         """Execute complete ETL pipeline"""
         self.metadata['start_time'] = datetime.now()
         self.logger.info(f"Starting ETL process: {self.__class__.__name__}")
         
         try:
-            # Extract
-            self.logger.info("Starting extraction phase")
-            raw_data = self.extract()
+            transform_workers = self.config.get('transform_workers', 1)
             
-            # Transform
-            self.logger.info("Starting transformation phase")
-            transformed_data = self.transform(raw_data)
-            self.metadata['records_processed'] = len(transformed_data) if hasattr(transformed_data, '__len__') else 0
+            if self.config.get('streaming', False):
+                self.start_position = self.resume_position()
+                if self.start_position:
+                    self.logger.info(f"Resuming from source position {self.start_position}")
             
-            # Load
-            self.logger.info("Starting load phase")
-            success = self.load(transformed_data)
-            
-            if success:
-                self.metadata['records_loaded'] = self.metadata['records_processed']
-                self.metadata['success'] = True
-                self.logger.info("ETL process completed successfully")
+            if self.config.get('streaming', False) and transform_workers > 1:
+                self._run_pipelined(transform_workers)
+            elif self.config.get('streaming', False):
+                self._run_streaming()
             else:
-                self.metadata['success'] = False
-                self.logger.error("ETL process failed during load phase")
+                self._run_batch()
                 
         except Exception as e:
             self.logger.error(f"ETL process failed: {str(e)}")
@@ -95,3 +127,118 @@ class BaseETL(ABC):
             ).total_seconds()
         
         return self.metadata
+    
+    def _run_batch(self):
+        """Extract, transform and load the whole source in one pass"""
+        # Extract
+        self.logger.info("Starting extraction phase")
+        raw_data = self.extract()
+        
+        # Transform
+        self.logger.info("Starting transformation phase")
+        transformed_data = self.transform(raw_data)
+        self.metadata['records_processed'] = len(transformed_data) if hasattr(transformed_data, '__len__') else 0
+        
+        # Load
+        self.logger.info("Starting load phase")
+        success = self.load(transformed_data)
+        
+        if success:
+            self.metadata['records_loaded'] = self.metadata['records_processed']
+            self.metadata['success'] = True
+            self.logger.info("ETL process completed successfully")
+        else:
+            self.metadata['success'] = False
+            self.logger.error("ETL process failed during load phase")
+    
+    def _run_streaming(self):
+        """Extract, transform and load chunk by chunk so memory stays bounded"""
+        self.metadata['chunks_loaded'] = 0
+        position = self.start_position
+        
+        for chunk_number, raw_chunk in enumerate(self.extract_chunks(), start=1):
+            position += len(raw_chunk)
+            transformed = self.transform(raw_chunk)
+            del raw_chunk
+            self._load_chunk(chunk_number, transformed, position)
+        
+        self.metadata['success'] = True
+        self.logger.info("Streaming ETL process completed successfully")
+    
+    def _run_pipelined(self, workers: int):
+        """Transform chunks on a process pool while one loader thread loads them.
+        
+        Results are loaded in source order. Both the in-flight transforms and
+        the load queue are bounded by ``max_pending_chunks``, so a slow
+        database stalls extraction instead of piling chunks up in memory.
+        """
+        max_pending = self.config.get('max_pending_chunks', workers * 2)
+        load_queue = queue.Queue(maxsize=max_pending)
+        load_errors = []
+        self.metadata['chunks_loaded'] = 0
+        
+        def loader():
+            while True:
+                item = load_queue.get()
+                if item is None:
+                    return
+                if load_errors:
+                    continue  # Keep draining so the producer never blocks
+                try:
+                    self._load_chunk(*item)
+                except Exception as e:
+                    load_errors.append(e)
+        
+        loader_thread = threading.Thread(target=loader, name=f"{self.__class__.__name__}-loader")
+        loader_thread.start()
+        self.logger.info(f"Starting pipelined ETL with {workers} transform workers")
+        
+        pool = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+        position = self.start_position
+        try:
+            for chunk_number, raw_chunk in enumerate(self.extract_chunks(), start=1):
+                if load_errors:
+                    break
+                position += len(raw_chunk)
+                pending.append((chunk_number, pool.submit(self.transform, raw_chunk), position))
+                del raw_chunk
+                
+                if len(pending) >= max_pending:
+                    chunk_number, future, end_position = pending.popleft()
+                    load_queue.put((chunk_number, future.result(), end_position))
+            
+            while pending and not load_errors:
+                chunk_number, future, end_position = pending.popleft()
+                load_queue.put((chunk_number, future.result(), end_position))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            load_queue.put(None)
+            loader_thread.join()
+        
+        if load_errors:
+            raise load_errors[0]
+        
+        self.metadata['success'] = True
+        self.logger.info("Pipelined ETL process completed successfully")
+    
+    def _load_chunk(self, chunk_number: int, transformed: Any, end_position: int):
+        """Load one transformed chunk and record per-chunk progress"""
+        chunk_records = len(transformed) if hasattr(transformed, '__len__') else 0
+        self.metadata['records_processed'] += chunk_records
+        
+        # Loads always run so position bookkeeping commits even for empty chunks
+        self.load_position = end_position
+        if not self.load(transformed):
+            raise RuntimeError(f"Load failed for chunk {chunk_number}")
+        
+        self.metadata['records_loaded'] += chunk_records
+        self.metadata['chunks_loaded'] = chunk_number
+        self.metadata['source_position'] = end_position
+        
+        if self.checkpoint is not None:
+            self.checkpoint.record_chunk(self.checkpoint_name, chunk_number, end_position, chunk_records)
+        self.logger.info(
+            f"Chunk {chunk_number}: loaded {chunk_records} records "
+            f"({self.metadata['records_loaded']} total)"
+        )
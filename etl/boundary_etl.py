@@ -3,15 +3,34 @@ Administrative Boundary ETL Pipeline
 File: src/spatial_search_engine/etl/boundary_etl.py
 """
 
+import numpy as np
+import pandas as pd
 import geopandas as gpd
+import shapely
+from psycopg2 import sql
 from typing import Dict, Any
 from .base_etl import BaseETL
-from ..database.connection import db
-import psycopg2.extras
+from .bulk_load import encode_copy_frame, ewkb_hex
+from database.connection import db
+
+# Column order used when streaming boundary rows into core.administrative_boundaries
+BOUNDARY_COLUMNS = ['boundary_name', 'boundary_type', 'geom']
+
+POLYGON_TYPE_ID = 3
+MULTIPOLYGON_TYPE_ID = 6
 
 class BoundaryETL(BaseETL):
     """ETL pipeline for administrative boundaries"""
     
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.batch_size = config.get('batch_size', 100)
+        # Split boundaries into parts of at most this many vertices (None disables)
+        self.subdivide_max_vertices = config.get('subdivide_max_vertices')
+        # Clear the stored district of properties affected by new or changed
+        # districts so the assign_property_districts post-load task redoes them
+        self.reassign_property_districts = config.get('reassign_property_districts', False)
+    
     def extract(self) -> gpd.GeoDataFrame:
         """Extract boundary data"""
         source_path = self.config.get('source_path')
@@ -42,48 +61,96 @@ class BoundaryETL(BaseETL):
     def load(self, gdf: gpd.GeoDataFrame) -> bool:
         """Load boundaries into database"""
         try:
-            self._create_boundaries_table()
+            frame = self._prepare_load_frame(gdf)
             
+            # Geometries travel as hex EWKB through COPY into a staging table,
+            # then merge into core.administrative_boundaries (see migration 006)
+            # in one transaction
             with db.get_transaction() as conn:
-                cursor = conn.cursor()
-                
-                for _, row in gdf.iterrows():
-                    insert_query = """
-                        INSERT INTO core.administrative_boundaries 
-                        (boundary_name, boundary_type, geom)
-                        VALUES (%s, %s, ST_GeomFromText(%s, 4326))
-                        ON CONFLICT (boundary_name, boundary_type) DO NOTHING
-                    """
-                    
-                    cursor.execute(insert_query, [
-                        row.get('boundary_name'),
-                        row.get('boundary_type'),
-                        row.geometry.wkt
-                    ])
+                staging = db.create_staging_table('core.administrative_boundaries', BOUNDARY_COLUMNS, conn)
+                db.copy_text(
+                    staging, BOUNDARY_COLUMNS,
+                    encode_copy_frame(frame, rows_per_chunk=self.batch_size),
+                    conn=conn
+                )
+                if self.reassign_property_districts:
+                    # Compares against the stored geometries, so before the merge
+                    cleared = self._clear_changed_districts(conn, staging)
+                    self.logger.info(f"Cleared the district of {cleared} properties for reassignment")
+                loaded = db.merge_staging(
+                    staging, 'core.administrative_boundaries', BOUNDARY_COLUMNS,
+                    conflict_columns=['boundary_name', 'boundary_type'],
+                    update_columns=['geom'],
+                    conn=conn
+                )
                 
-                return True
+                if self.subdivide_max_vertices:
+                    parts = self._subdivide_boundaries(conn, staging)
+                    self.logger.info(f"Subdivided boundaries into {parts} parts")
+            
+            self.logger.info(f"Loaded {loaded} boundary records")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Failed to load boundaries: {e}")
             return False
     
-    def _create_boundaries_table(self):
-        """Create boundaries table"""
-        create_table_sql = """
-            CREATE TABLE IF NOT EXISTS core.administrative_boundaries (
-                id BIGSERIAL PRIMARY KEY,
-                boundary_name VARCHAR(255) NOT NULL,
-                boundary_type VARCHAR(100) NOT NULL,
-                geom GEOMETRY(MULTIPOLYGON, 4326) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(boundary_name, boundary_type)
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_boundaries_geom 
-            ON core.administrative_boundaries USING GIST (geom);
-        """
+    def _prepare_load_frame(self, gdf: gpd.GeoDataFrame) -> pd.DataFrame:
+        """Build the load columns in BOUNDARY_COLUMNS order with vectorised ops"""
+        geometries = gdf.geometry.values
+        type_ids = shapely.get_type_id(geometries)
         
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
+        # Only polygonal geometries fit the MULTIPOLYGON column
+        keep = np.isin(type_ids, [POLYGON_TYPE_ID, MULTIPOLYGON_TYPE_ID]) & ~shapely.is_empty(geometries)
+        if not keep.all():
+            self.logger.warning(f"Skipping {int((~keep).sum())} boundaries without polygon geometry")
+        
+        geometries = np.asarray(geometries[keep], dtype=object)
+        polygons = type_ids[keep] == POLYGON_TYPE_ID
+        geometries[polygons] = shapely.multipolygons(
+            geometries[polygons], indices=np.arange(int(polygons.sum()))
+        )
+        
+        return pd.DataFrame({
+            'boundary_name': gdf['boundary_name'].to_numpy()[keep],
+            'boundary_type': gdf['boundary_type'].to_numpy()[keep],
+            'geom': ewkb_hex(geometries),
+        })
+    
+    def _subdivide_boundaries(self, conn, staging: str) -> int:
+        """Rebuild the subdivided parts of the boundaries in ``staging``.
+        
+        Point-in-boundary joins against the small parts touch far fewer
+        vertices than joins against whole county or district polygons.
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("""
+                DELETE FROM core.administrative_boundary_parts p
+                USING core.administrative_boundaries b
+                JOIN {staging} s USING (boundary_name, boundary_type)
+                WHERE p.boundary_id = b.id
+            """).format(staging=sql.Identifier(staging)))
+            
+            cursor.execute(sql.SQL("""
+                INSERT INTO core.administrative_boundary_parts (boundary_id, geom)
+                SELECT b.id, ST_Multi(ST_Subdivide(b.geom, %s))
+                FROM core.administrative_boundaries b
+                JOIN {staging} s USING (boundary_name, boundary_type)
+            """).format(staging=sql.Identifier(staging)), (self.subdivide_max_vertices,))
+            return cursor.rowcount
+    
+    def _clear_changed_districts(self, conn, staging: str) -> int:
+        """Clear district_id and flag district_pending for properties in, or
+        assigned to, a district in ``staging`` that is new or whose geometry
+        changed"""
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("""
+                UPDATE core.properties p
+                SET district_id = NULL, district_pending = TRUE
+                FROM {staging} s
+                LEFT JOIN core.administrative_boundaries b USING (boundary_name, boundary_type)
+                WHERE s.boundary_type = 'district'
+                  AND (b.id IS NULL OR NOT ST_Equals(b.geom, s.geom))
+                  AND (p.district_id = b.id OR ST_Intersects(s.geom, p.geom))
+            """).format(staging=sql.Identifier(staging)))
+            return cursor.rowcount
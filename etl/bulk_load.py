@@ -0,0 +1,51 @@
+"""
+Vectorised helpers for bulk loading ETL output
+File: etl/bulk_load.py
+"""
+
+from typing import Iterator
+import numpy as np
+import pandas as pd
+import shapely
+from pandas.api.types import is_datetime64_any_dtype, is_object_dtype, is_string_dtype
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.connection import COPY_ESCAPES, COPY_NULL
+
+
+def ewkb_hex(geometries, srid: int = 4326) -> np.ndarray:
+    """Encode an array of shapely geometries as hex EWKB in one call"""
+    geometries = shapely.set_srid(np.asarray(geometries, dtype=object), srid)
+    return shapely.to_wkb(geometries, hex=True, include_srid=True)
+
+
+def _encode_copy_column(values: pd.Series) -> pd.Series:
+    """Render one column as COPY text, with NULL markers for missing values"""
+    missing = values.isna()
+
+    if is_datetime64_any_dtype(values):
+        text = values.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    elif is_object_dtype(values) or is_string_dtype(values):
+        text = values.astype(str).str.translate(COPY_ESCAPES)
+    else:
+        text = values.astype(str)
+
+    return text.mask(missing, COPY_NULL)
+
+
+def encode_copy_frame(frame: pd.DataFrame, rows_per_chunk: int = 50000) -> Iterator[str]:
+    """Encode a DataFrame as COPY text chunks using vectorised string ops.
+
+    Columns are emitted in frame order; only one chunk of encoded text is
+    alive at a time so the result can be streamed into ``db.copy_text``.
+    """
+    for start in range(0, len(frame), rows_per_chunk):
+        chunk = frame.iloc[start:start + rows_per_chunk]
+        encoded = [_encode_copy_column(chunk[col]) for col in chunk.columns]
+        lines = encoded[0].str.cat(encoded[1:], sep='\t') if len(encoded) > 1 else encoded[0]
+        yield '\n'.join(lines.tolist()) + '\n'
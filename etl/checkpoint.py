@@ -0,0 +1,88 @@
+"""
+ETL Checkpoint Store
+File: etl/checkpoint.py
+"""
+
+from typing import Any, Dict, Optional
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import threading
+
+class CheckpointStore:
+    """Durable per-pipeline and per-chunk progress in a local JSON state file.
+
+    Every update is written to a temporary file and atomically renamed over
+    the state file, so a crash never leaves a half-written checkpoint.
+    """
+
+    def __init__(self, state_path: str):
+        self.state_path = Path(state_path)
+        self._lock = threading.Lock()
+        self.state = {'pipelines': {}}
+
+    def start_run(self, resume: bool = False):
+        """Begin a run, keeping previous progress only when resuming"""
+        with self._lock:
+            if resume and self.state_path.exists():
+                with open(self.state_path, 'r') as f:
+                    self.state = json.load(f)
+            else:
+                self.state = {'pipelines': {}}
+
+            self.state['run_started_at'] = datetime.now().isoformat()
+            self._write()
+
+    def get_pipeline(self, name: str) -> Dict[str, Any]:
+        """Get the recorded state of a pipeline (empty if never started)"""
+        with self._lock:
+            return dict(self.state['pipelines'].get(name, {}))
+
+    def is_completed(self, name: str) -> bool:
+        return self.get_pipeline(name).get('status') == 'completed'
+
+    def mark_started(self, name: str):
+        self._update(name, status='running')
+
+    def record_chunk(self, name: str, chunk_number: int, source_position: int, records_loaded: int):
+        """Record a chunk whose load has been committed"""
+        with self._lock:
+            pipeline = self.state['pipelines'].setdefault(name, {})
+            pipeline['chunks_committed'] = pipeline.get('chunks_committed', 0) + 1
+            pipeline['last_chunk'] = chunk_number
+            pipeline['source_position'] = source_position
+            pipeline['records_loaded'] = pipeline.get('records_loaded', 0) + records_loaded
+            pipeline['updated_at'] = datetime.now().isoformat()
+            self._write()
+
+    def mark_completed(self, name: str, result: Dict[str, Any]):
+        with self._lock:
+            pipeline = self.state['pipelines'].setdefault(name, {})
+            pipeline['status'] = 'completed'
+            pipeline['records_processed'] = result.get('records_processed', 0)
+            # Chunked runs already accumulated loads across resumed attempts
+            if not pipeline.get('chunks_committed'):
+                pipeline['records_loaded'] = result.get('records_loaded', 0)
+            pipeline['updated_at'] = datetime.now().isoformat()
+            self._write()
+
+    def mark_failed(self, name: str, error: Optional[str]):
+        self._update(name, status='failed', error=error)
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            pipeline = self.state['pipelines'].setdefault(name, {})
+            pipeline.update(fields)
+            pipeline['updated_at'] = datetime.now().isoformat()
+            self._write()
+
+    def _write(self):
+        """Atomically replace the state file"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(self.state_path.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
@@ -38,10 +38,25 @@ class ETLConfig:
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default ETL configuration"""
         return {
+            'runner': {
+                'state_path': 'logs/etl_state.json',
+                'max_db_connections': 2
+            },
             'property_etl': {
                 'source_type': 'csv',
                 'source_path': 'data/raw/properties.csv',
+                'data_source': 'properties_csv',
                 'batch_size': 1000,
+                'depends_on': [],
+                'streaming': False,
+                'chunk_size': 100000,
+                'transform_workers': 1,
+                'max_pending_chunks': 4,
+                'incremental': False,
+                'resume_from_watermark': False,
+                'invalidate_query_cache': False,
+                'defer_district_assignment': True,
+                'external_id_columns': ['address', 'city', 'state', 'zip_code'],
                 'latitude_column': 'latitude',
                 'longitude_column': 'longitude',
                 'coordinate_bounds': {
@@ -58,12 +73,37 @@ class ETLConfig:
                 'source_type': 'shapefile',
                 'source_path': 'data/raw/amenities.shp',
                 'batch_size': 500,
+                'depends_on': [],
                 'amenity_types': ['school', 'hospital', 'park', 'shopping']
             },
             'boundary_etl': {
                 'source_type': 'geojson',
                 'source_path': 'data/raw/boundaries.geojson',
-                'batch_size': 100
+                'batch_size': 100,
+                'depends_on': [],
+                'subdivide_max_vertices': 256,
+                'reassign_property_districts': True
+            },
+            'post_load_tasks': {
+                'refresh_city_property_counts': {
+                    'depends_on': ['property_etl'],
+                    'sql': ['REFRESH MATERIALIZED VIEW analytics.city_property_counts']
+                },
+                'rebuild_property_indexes': {
+                    'depends_on': ['property_etl'],
+                    'sql': [
+                        'REINDEX INDEX CONCURRENTLY core.idx_properties_geom_gist',
+                        'ANALYZE core.properties'
+                    ]
+                },
+                'assign_property_districts': {
+                    'depends_on': ['property_etl', 'boundary_etl'],
+                    'sql': ['SELECT core.assign_property_districts()']
+                },
+                'refresh_district_property_stats': {
+                    'depends_on': ['assign_property_districts'],
+                    'sql': ['REFRESH MATERIALIZED VIEW CONCURRENTLY analytics.district_property_stats']
+                }
             }
         }
     
@@ -3,7 +3,8 @@ ETL Execution Manager
 File: etl/etl_runner.py
 """
 
-from typing import Dict, Any, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, List, Tuple
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -16,14 +17,20 @@ sys.path.insert(0, str(project_root))
 
 # Import configuration manager
 from etl.etl_config import ETLConfig
+from etl.checkpoint import CheckpointStore
 
 class ETLRunner:
     """Orchestrate and run multiple ETL processes"""
     
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, resume: bool = False):
         self.config_manager = ETLConfig(config_path)
         self.logger = self._setup_logging()
         self.results = {}
+        self.resume = resume
+        
+        runner_config = self.config_manager.get_config('runner')
+        self.checkpoints = CheckpointStore(runner_config.get('state_path', 'logs/etl_state.json'))
+        self._run_started = False
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging for ETL runner"""
@@ -51,112 +58,238 @@ class ETLRunner:
         
         return logger
     
-    def run_property_etl(self) -> Dict[str, Any]:
-        """Run property data ETL"""
-        self.logger.info("Starting Property ETL")
+    def _start_run(self):
+        """Begin the checkpointed run on first use, not when the runner is built"""
+        if not self._run_started:
+            self.checkpoints.start_run(resume=self.resume)
+            self._run_started = True
+    
+    def _run_etl(self, process_name: str, etl_factory: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+        """Run one ETL pipeline with checkpointing"""
+        self._start_run()
+        if self.resume and self.checkpoints.is_completed(process_name):
+            self.logger.info(f"Skipping {process_name}: completed in a previous attempt")
+            state = self.checkpoints.get_pipeline(process_name)
+            result = {
+                'success': True,
+                'skipped': True,
+                'records_processed': state.get('records_processed', 0),
+                'records_loaded': state.get('records_loaded', 0)
+            }
+            self.results[process_name] = result
+            return result
         
         try:
-            from etl.property_etl import PropertyETL
+            config = self.config_manager.get_config(process_name)
+            etl = etl_factory(config)
+            etl.attach_checkpoint(self.checkpoints, process_name)
             
-            config = self.config_manager.get_config('property_etl')
-            etl = PropertyETL(config)
+            self.checkpoints.mark_started(process_name)
             result = etl.run()
             
-            self.results['property_etl'] = result
+            if not self._succeeded(result):
+                self.checkpoints.mark_failed(process_name, '; '.join(result.get('errors', [])))
+            else:
+                self.checkpoints.mark_completed(process_name, result)
+            
+            self.results[process_name] = result
             return result
             
         except Exception as e:
-            self.logger.error(f"Property ETL failed: {e}")
+            self.logger.error(f"{process_name} failed: {e}")
+            self.checkpoints.mark_failed(process_name, str(e))
             error_result = {
                 'success': False,
                 'error': str(e),
                 'records_processed': 0,
                 'records_loaded': 0
             }
-            self.results['property_etl'] = error_result
+            self.results[process_name] = error_result
             return error_result
     
+    def run_property_etl(self) -> Dict[str, Any]:
+        """Run property data ETL"""
+        self.logger.info("Starting Property ETL")
+        
+        def factory(config):
+            from etl.property_etl import PropertyETL
+            return PropertyETL(config)
+        
+        return self._run_etl('property_etl', factory)
+    
     def run_amenity_etl(self) -> Dict[str, Any]:
         """Run amenity data ETL"""
         self.logger.info("Starting Amenity ETL")
         
-        try:
+        def factory(config):
             from etl.amenity_etl import AmenityETL
-            
-            config = self.config_manager.get_config('amenity_etl')
-            etl = AmenityETL(config)
-            result = etl.run()
-            
-            self.results['amenity_etl'] = result
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"Amenity ETL failed: {e}")
-            error_result = {
-                'success': False,
-                'error': str(e),
-                'records_processed': 0,
-                'records_loaded': 0
-            }
-            self.results['amenity_etl'] = error_result
-            return error_result
+            return AmenityETL(config)
+        
+        return self._run_etl('amenity_etl', factory)
     
     def run_boundary_etl(self) -> Dict[str, Any]:
         """Run boundary data ETL"""
         self.logger.info("Starting Boundary ETL")
         
-        try:
+        def factory(config):
             from etl.boundary_etl import BoundaryETL
+            return BoundaryETL(config)
+        
+        return self._run_etl('boundary_etl', factory)
+    
+    def run_post_load_task(self, task_name: str, task_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a post-load SQL task (view refresh, index rebuild, ...)"""
+        self._start_run()
+        if self.resume and self.checkpoints.is_completed(task_name):
+            self.logger.info(f"Skipping {task_name}: completed in a previous attempt")
+            result = {'success': True, 'skipped': True, 'records_processed': 0, 'records_loaded': 0}
+            self.results[task_name] = result
+            return result
+        
+        statements = task_config.get('sql', [])
+        if isinstance(statements, str):
+            statements = [statements]
+        
+        try:
+            from database.connection import db
             
-            config = self.config_manager.get_config('boundary_etl')
-            etl = BoundaryETL(config)
-            result = etl.run()
+            self.checkpoints.mark_started(task_name)
+            with db.get_connection() as conn:
+                # REINDEX CONCURRENTLY and friends cannot run inside a transaction;
+                # end the one get_connection's SET search_path opened first, as
+                # autocommit cannot be switched on mid-transaction
+                conn.commit()
+                conn.autocommit = True
+                try:
+                    with conn.cursor() as cursor:
+                        for statement in statements:
+                            self.logger.info(f"{task_name}: {statement}")
+                            cursor.execute(statement)
+                finally:
+                    conn.autocommit = False
             
-            self.results['boundary_etl'] = result
-            return result
+            result = {'success': True, 'records_processed': 0, 'records_loaded': 0}
+            self.checkpoints.mark_completed(task_name, result)
             
         except Exception as e:
-            self.logger.error(f"Boundary ETL failed: {e}")
-            error_result = {
-                'success': False,
-                'error': str(e),
-                'records_processed': 0,
-                'records_loaded': 0
-            }
-            self.results['boundary_etl'] = error_result
-            return error_result
+            self.logger.error(f"{task_name} failed: {e}")
+            self.checkpoints.mark_failed(task_name, str(e))
+            result = {'success': False, 'error': str(e), 'records_processed': 0, 'records_loaded': 0}
+        
+        self.results[task_name] = result
+        return result
+    
+    def build_task_graph(self) -> Dict[str, Tuple[List[str], Callable[[], Dict[str, Any]]]]:
+        """Map each task to its dependencies and runner from the configuration"""
+        pipelines = {
+            'property_etl': self.run_property_etl,
+            'amenity_etl': self.run_amenity_etl,
+            'boundary_etl': self.run_boundary_etl,
+        }
+        
+        tasks = {}
+        for process_name, process_func in pipelines.items():
+            depends_on = self.config_manager.get_config(process_name).get('depends_on', [])
+            tasks[process_name] = (list(depends_on), process_func)
+        
+        post_load_tasks = self.config_manager.get_config('post_load_tasks') or {}
+        for task_name, task_config in post_load_tasks.items():
+            tasks[task_name] = (
+                list(task_config.get('depends_on', [])),
+                lambda name=task_name, cfg=task_config: self.run_post_load_task(name, cfg)
+            )
+        
+        return tasks
     
     def run_all_etl(self) -> Dict[str, Any]:
-        """Run all configured ETL processes"""
+        """Run all configured ETL processes and post-load tasks as a DAG"""
         self.logger.info("Starting complete ETL pipeline")
+        return self.run_task_graph(self.build_task_graph())
+    
+    def run_task_graph(self, tasks: Dict[str, Tuple[List[str], Callable[[], Dict[str, Any]]]]) -> Dict[str, Any]:
+        """Run tasks concurrently as soon as all of their dependencies succeed.
+        
+        At most ``runner.max_db_connections`` tasks run at once, since every
+        running task holds a database connection. Tasks whose dependencies
+        failed are not started and are reported as failed.
+        """
+        self._validate_task_graph(tasks)
+        # Started before any task thread runs, so tasks never race to start it
+        self._start_run()
+        max_workers = max(1, self.config_manager.get_config('runner').get('max_db_connections', 2))
         
-        etl_processes = [
-            ('property_etl', self.run_property_etl),
-            ('amenity_etl', self.run_amenity_etl),
-            ('boundary_etl', self.run_boundary_etl),
-        ]
+        remaining = dict(tasks)
+        succeeded, failed = set(), set()
         
-        for process_name, process_func in etl_processes:
-            try:
-                self.logger.info(f"Running {process_name}")
-                result = process_func()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='etl-task') as pool:
+            running = {}
+            
+            while remaining or running:
+                for task_name, (depends_on, task_func) in list(remaining.items()):
+                    failed_deps = [dep for dep in depends_on if dep in failed]
+                    if failed_deps:
+                        self.logger.error(f"Not running {task_name}: dependency {failed_deps[0]} failed")
+                        self.results[task_name] = {
+                            'success': False,
+                            'error': f"Dependency failed: {', '.join(failed_deps)}",
+                            'records_processed': 0,
+                            'records_loaded': 0
+                        }
+                        failed.add(task_name)
+                        del remaining[task_name]
+                    elif all(dep in succeeded for dep in depends_on):
+                        self.logger.info(f"Running {task_name}")
+                        running[pool.submit(task_func)] = task_name
+                        del remaining[task_name]
+                
+                if not running:
+                    continue
                 
-                if result.get('errors') or not result.get('success', True):
-                    self.logger.warning(f"{process_name} completed with errors")
-                else:
-                    self.logger.info(f"{process_name} completed successfully")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.error(f"{task_name} failed: {e}")
+                        result = {
+                            'success': False,
+                            'error': str(e),
+                            'records_processed': 0,
+                            'records_loaded': 0
+                        }
+                        self.results[task_name] = result
                     
-            except Exception as e:
-                self.logger.error(f"{process_name} failed: {e}")
-                self.results[process_name] = {
-                    'success': False,
-                    'error': str(e),
-                    'records_processed': 0,
-                    'records_loaded': 0
-                }
+                    if not self._succeeded(result):
+                        self.logger.warning(f"{task_name} completed with errors")
+                        failed.add(task_name)
+                    else:
+                        self.logger.info(f"{task_name} completed successfully")
+                        succeeded.add(task_name)
         
         return self.results
     
+    def _validate_task_graph(self, tasks: Dict[str, Tuple[List[str], Callable[[], Dict[str, Any]]]]):
+        """Reject unknown dependencies and dependency cycles"""
+        for task_name, (depends_on, _) in tasks.items():
+            unknown = [dep for dep in depends_on if dep not in tasks]
+            if unknown:
+                raise ValueError(f"Task {task_name} depends on unknown task(s): {', '.join(unknown)}")
+        
+        resolved = set()
+        pending = {name: set(deps) for name, (deps, _) in tasks.items()}
+        while pending:
+            ready = [name for name, deps in pending.items() if deps <= resolved]
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks: {', '.join(sorted(pending))}")
+            for name in ready:
+                resolved.add(name)
+                del pending[name]
+    
+    @staticmethod
+    def _succeeded(result: Dict[str, Any]) -> bool:
+        return not result.get('errors') and result.get('success', True)
+    
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of all ETL runs"""
         summary = {
@@ -168,7 +301,7 @@ class ETLRunner:
         }
         
         for process_name, result in self.results.items():
-            if result.get('errors') or not result.get('success', True):
+            if not self._succeeded(result):
                 summary['failed'] += 1
             else:
                 summary['successful'] += 1
@@ -1,4 +1,5 @@
 import os
+from contextlib import contextmanager
 import pytest
 import pandas as pd
 from database.connection import DatabaseManager
@@ -37,3 +38,56 @@ def sample_properties():
     }
     df = pd.DataFrame(data)
     return df
+
+class RecordingDatabase:
+    """Stand-in for the global DatabaseManager that records the SQL run on
+    its connection and the staging merges, in order, in ``log``"""
+
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, params=None):
+        self.log.append(('execute', repr(statement)))
+
+    def fetchall(self):
+        return []
+
+    @property
+    def rowcount(self):
+        return 0
+
+    def commit(self):
+        pass
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    get_transaction = get_connection
+
+    def create_staging_table(self, table, columns, conn):
+        return f"_staging_{table.replace('.', '_')}"
+
+    def copy_text(self, table, columns, chunks, conn=None):
+        return sum(chunk.count('\n') for chunk in chunks)
+
+    def merge_staging(self, staging, table, columns, conflict_columns, update_columns=None, conn=None):
+        self.log.append(('merge', table, list(update_columns or [])))
+        return 0
+
+@pytest.fixture
+def recording_db(monkeypatch):
+    """Route the ETL modules' database calls to a RecordingDatabase"""
+    recording = RecordingDatabase()
+    monkeypatch.setattr('etl.property_etl.db', recording)
+    monkeypatch.setattr('etl.boundary_etl.db', recording)
+    return recording
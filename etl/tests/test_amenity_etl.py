@@ -0,0 +1,26 @@
+"""
+Amenity ETL tests
+"""
+
+import geopandas as gpd
+import shapely
+from shapely.geometry import Point, box
+from etl.amenity_etl import AmenityETL
+
+def test_amenity_load_frame_encodes_points():
+    """Test that amenities are sent as EWKB points, areal ones by an inner point"""
+    gdf = gpd.GeoDataFrame({
+        'name': ['Central School', 'City Park'],
+        'amenity_type': ['School ', 'park'],
+        'geometry': [Point(-74.0, 40.7), box(-74.2, 40.6, -74.1, 40.7)]
+    }, crs='EPSG:4326')
+
+    etl = AmenityETL({'source_path': 'unused.shp', 'amenity_types': ['school', 'park']})
+    frame = etl._prepare_load_frame(etl.transform(gdf))
+
+    assert list(frame['amenity_type']) == ['school', 'park']
+    points = shapely.from_wkb(frame['geom'].to_numpy())
+    assert list(shapely.get_type_id(points)) == [0, 0]
+    assert points[0].equals(Point(-74.0, 40.7))
+    assert box(-74.2, 40.6, -74.1, 40.7).contains(points[1])
+    assert frame['created_at'].notna().all()
@@ -0,0 +1,73 @@
+"""
+Boundary ETL tests
+"""
+
+import geopandas as gpd
+import pytest
+import shapely
+from shapely.geometry import LineString, MultiPolygon, box
+from etl.boundary_etl import BoundaryETL
+
+def test_boundary_load_frame_encodes_multipolygon_ewkb():
+    """Test that polygons are promoted to multipolygons and sent as EWKB"""
+    gdf = gpd.GeoDataFrame({
+        'boundary_name': ['North', 'South', 'Road'],
+        'boundary_type': ['district', 'district', 'district'],
+        'geometry': [
+            box(0, 0, 1, 1),
+            MultiPolygon([box(0, -2, 1, -1), box(2, -2, 3, -1)]),
+            LineString([(0, 0), (1, 1)])
+        ]
+    }, crs='EPSG:4326')
+
+    etl = BoundaryETL({'source_path': 'unused.geojson'})
+    frame = etl._prepare_load_frame(gdf)
+
+    assert list(frame['boundary_name']) == ['North', 'South']
+    geometries = shapely.from_wkb(frame['geom'].to_numpy())
+    assert list(shapely.get_type_id(geometries)) == [6, 6]
+    assert list(shapely.get_srid(geometries)) == [4326, 4326]
+    assert geometries[0].equals(MultiPolygon([box(0, 0, 1, 1)]))
+
+def test_boundary_reload_replaces_geometry_and_parts(test_database):
+    """Test reloading a boundary with a new shape updates it and its parts"""
+    def boundaries(geometry):
+        return gpd.GeoDataFrame({
+            'boundary_name': ['Reloaded'], 'boundary_type': ['district'], 'geometry': [geometry]
+        }, crs='EPSG:4326')
+
+    etl = BoundaryETL({'source_path': 'unused.geojson', 'subdivide_max_vertices': 256})
+    assert etl.load(boundaries(box(0, 0, 1, 1)))
+    assert etl.load(boundaries(box(0, 0, 2, 1)))
+
+    with test_database.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT ST_Area(b.geom) AS area, ST_Area(ST_Union(p.geom)) AS parts_area
+            FROM core.administrative_boundaries b
+            JOIN core.administrative_boundary_parts p ON p.boundary_id = b.id
+            WHERE b.boundary_name = 'Reloaded' AND b.boundary_type = 'district'
+            GROUP BY b.id
+        """)
+        rows = cursor.fetchall()
+    assert len(rows) == 1
+    assert rows[0]['area'] == pytest.approx(2.0)
+    assert rows[0]['parts_area'] == pytest.approx(2.0)
+
+def test_boundary_load_clears_changed_districts_before_merge(recording_db):
+    """Test reassignment clears property districts against the stored
+    geometries, then upserts the new ones"""
+    gdf = gpd.GeoDataFrame({
+        'boundary_name': ['North'], 'boundary_type': ['district'], 'geometry': [box(0, 0, 1, 1)]
+    }, crs='EPSG:4326')
+
+    assert BoundaryETL({'source_path': 'unused.geojson'}).load(gdf)
+    assert not any('district_id = NULL' in entry[1] for entry in recording_db.log if entry[0] == 'execute')
+
+    recording_db.log.clear()
+    assert BoundaryETL({'source_path': 'unused.geojson', 'reassign_property_districts': True}).load(gdf)
+    kinds = [entry[0] for entry in recording_db.log]
+    cleared = [i for i, entry in enumerate(recording_db.log) if 'district_id = NULL' in entry[1]]
+    assert len(cleared) == 1
+    assert cleared[0] < kinds.index('merge')
+    assert recording_db.log[kinds.index('merge')] == ('merge', 'core.administrative_boundaries', ['geom'])
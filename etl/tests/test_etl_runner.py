@@ -0,0 +1,110 @@
+"""
+ETL runner tests
+"""
+
+import pytest
+import threading
+import time
+import yaml
+from etl.etl_runner import ETLRunner
+
+def make_runner(tmp_path, max_db_connections=2, resume=False):
+    config_path = tmp_path / 'etl_config.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'runner': {
+            'state_path': str(tmp_path / 'etl_state.json'),
+            'max_db_connections': max_db_connections
+        }
+    }))
+    return ETLRunner(str(config_path), resume=resume)
+
+def recording_task(runner, name, log, delay=0.0, success=True):
+    def task():
+        log.append(('start', name))
+        time.sleep(delay)
+        log.append(('end', name))
+        result = {'success': success, 'records_processed': 1, 'records_loaded': 1}
+        runner.results[name] = result
+        return result
+    return task
+
+def test_task_graph_runs_dependents_after_dependencies(tmp_path):
+    """Test that a task only starts once all of its dependencies finished"""
+    runner = make_runner(tmp_path)
+    log = []
+
+    runner.run_task_graph({
+        'property_etl': ([], recording_task(runner, 'property_etl', log, delay=0.05)),
+        'boundary_etl': ([], recording_task(runner, 'boundary_etl', log)),
+        'refresh_views': (['property_etl', 'boundary_etl'], recording_task(runner, 'refresh_views', log)),
+    })
+
+    assert log.index(('start', 'refresh_views')) > log.index(('end', 'property_etl'))
+    assert log.index(('start', 'refresh_views')) > log.index(('end', 'boundary_etl'))
+    assert runner.get_summary()['successful'] == 3
+
+def test_task_graph_runs_independent_tasks_concurrently(tmp_path):
+    """Test that independent tasks overlap up to the connection limit"""
+    runner = make_runner(tmp_path, max_db_connections=2)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def task():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return {'success': True}
+
+    runner.run_task_graph({name: ([], task) for name in ['a', 'b', 'c', 'd']})
+
+    assert peak[0] == 2
+
+def test_task_graph_skips_dependents_of_failed_tasks(tmp_path):
+    """Test that a failed task fails its dependents without running them"""
+    runner = make_runner(tmp_path)
+    log = []
+
+    def failing_task():
+        raise RuntimeError("load failed")
+
+    results = runner.run_task_graph({
+        'property_etl': ([], failing_task),
+        'refresh_views': (['property_etl'], recording_task(runner, 'refresh_views', log)),
+        'amenity_etl': ([], recording_task(runner, 'amenity_etl', log)),
+    })
+
+    assert results['property_etl']['error'] == "load failed"
+    assert not results['refresh_views']['success']
+    assert ('start', 'refresh_views') not in log
+    assert results['amenity_etl']['success']
+
+def test_task_graph_rejects_cycles_and_unknown_dependencies(tmp_path):
+    """Test validation of the configured dependency graph"""
+    runner = make_runner(tmp_path)
+    noop = lambda: {'success': True}
+
+    with pytest.raises(ValueError, match="cycle"):
+        runner.run_task_graph({'a': (['b'], noop), 'b': (['a'], noop)})
+
+    with pytest.raises(ValueError, match="unknown"):
+        runner.run_task_graph({'a': (['missing'], noop)})
+
+def test_checkpoint_state_is_only_reset_when_a_run_starts(tmp_path):
+    """Test that building a runner leaves an earlier run's checkpoint state alone"""
+    state_path = tmp_path / 'etl_state.json'
+    runner = make_runner(tmp_path)
+    assert not state_path.exists()
+
+    runner.run_task_graph({'property_etl': ([], lambda: {'success': True})})
+    runner.checkpoints.mark_completed('property_etl', {'records_loaded': 3})
+    saved = state_path.read_text()
+
+    make_runner(tmp_path)
+    resumed = make_runner(tmp_path, resume=True)
+    assert state_path.read_text() == saved
+
+    resumed.run_task_graph({'property_etl': ([], lambda: {'success': True})})
+    assert resumed.checkpoints.is_completed('property_etl')
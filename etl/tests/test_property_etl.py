@@ -4,10 +4,20 @@ Property ETL tests
 
 import pytest
 import pandas as pd
+import geopandas as gpd
+import pyarrow as pa
 import tempfile
 import os
 from etl.property_etl import PropertyETL
 from etl.etl_config import ETLConfig
+from etl.checkpoint import CheckpointStore
+
+class RecordingPropertyETL(PropertyETL):
+    """PropertyETL that records loaded chunks instead of writing to the database"""
+    
+    def load(self, gdf) -> bool:
+        self.loaded_addresses = getattr(self, 'loaded_addresses', []) + list(gdf['address'])
+        return True
 
 def test_property_etl_csv_extraction(sample_properties):
     """Test CSV extraction"""
@@ -54,6 +64,40 @@ def test_property_etl_transformation(sample_properties):
     assert hasattr(result, 'geometry')
     assert result.crs.to_string() == 'EPSG:4326'
 
+def test_property_etl_coordinate_filtering(sample_properties):
+    """Test missing and out-of-bounds coordinates are dropped before geometry creation"""
+    config = {
+        'coordinate_bounds': {
+            'min_lat': 25.0, 'max_lat': 50.0,
+            'min_lng': -125.0, 'max_lng': -65.0
+        }
+    }
+    
+    df = sample_properties.drop(columns=['geometry']).astype({'latitude': object})
+    df.loc[0, 'latitude'] = None
+    df.loc[1, 'latitude'] = 'not-a-number'
+    df.loc[2, 'latitude'] = 40.7148
+    df = pd.concat([df, df.iloc[[2]].assign(address='4 Main St', longitude=10.0)])
+    
+    result = PropertyETL(config).transform(df)
+    
+    assert list(result['address']) == ['3 Main St']
+    assert result.geometry.x.tolist() == [-74.0080]
+
+def test_property_etl_stable_external_ids(sample_properties):
+    """Test external ids and content hashes are stable across runs"""
+    etl = PropertyETL({})
+    df = sample_properties.drop(columns=['geometry', 'external_id'])
+    
+    first = etl._prepare_load_frame(etl.transform(df))
+    second = etl._prepare_load_frame(etl.transform(df))
+    changed = etl._prepare_load_frame(etl.transform(df.assign(price=[100000, 250000, 300000])))
+    
+    assert first['external_id'].is_unique
+    assert first['external_id'].tolist() == second['external_id'].tolist() == changed['external_id'].tolist()
+    assert first['content_hash'].tolist() == second['content_hash'].tolist()
+    assert (first['content_hash'] != changed['content_hash']).tolist() == [False, True, False]
+
 def test_property_etl_full_pipeline(test_database, sample_properties):
     """Test complete ETL pipeline"""
     # Create temporary CSV
@@ -86,3 +130,182 @@ def test_property_etl_full_pipeline(test_database, sample_properties):
             
     finally:
         os.unlink(csv_path)
+
+def test_property_etl_incremental_updates_address(test_database, sample_properties):
+    """Test an incremental load writes a changed address, not just its hash"""
+    df = sample_properties.drop(columns=['geometry']).assign(external_id=['INC_1', 'INC_2', 'INC_3'])
+    etl = PropertyETL({'incremental': True})
+    assert etl.load(etl.transform(df))
+    
+    moved = df.assign(address=['1 Main St', '20 Main St', '3 Main St'], city=['CityA', 'CityD', 'CityC'])
+    assert etl.load(etl.transform(moved))
+    
+    with test_database.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT address, city FROM core.properties WHERE external_id LIKE 'INC_%%' ORDER BY external_id"
+        )
+        assert [(r['address'], r['city']) for r in cursor.fetchall()] == [
+            ('1 Main St', 'CityA'), ('20 Main St', 'CityD'), ('3 Main St', 'CityC')
+        ]
+        # The stored row now matches its hash, so a rerun has nothing to load
+        assert len(etl._drop_unchanged(etl._prepare_load_frame(etl.transform(moved)), conn)) == 0
+
+def test_property_etl_defers_district_assignment(recording_db, sample_properties):
+    """Test deferred loads ask the district trigger to leave district_id NULL"""
+    df = sample_properties.drop(columns=['geometry'])
+    for defer in (False, True):
+        recording_db.log.clear()
+        etl = PropertyETL({'defer_district_assignment': defer})
+        assert etl.load(etl.transform(df))
+        
+        kinds = [entry[0] for entry in recording_db.log]
+        flagged = [i for i, entry in enumerate(recording_db.log) if 'spatial.defer_district_assignment' in entry[1]]
+        assert len(flagged) == int(defer)
+        if defer:
+            # Set for the load's own transaction, before the merge fires the trigger
+            assert 'SET LOCAL' in recording_db.log[flagged[0]][1]
+            assert flagged[0] < kinds.index('merge')
+
+def test_property_etl_copy_payload(sample_properties):
+    """Test vectorised load frame preparation and COPY encoding"""
+    from etl.bulk_load import encode_copy_frame
+    from etl.property_etl import PROPERTY_COLUMNS
+    
+    etl = PropertyETL({})
+    gdf = etl.transform(sample_properties.drop(columns=['geometry']))
+    frame = etl._prepare_load_frame(gdf)
+    
+    assert list(frame.columns) == PROPERTY_COLUMNS
+    assert frame['geom'].str.startswith('0101000020E6100000').all()  # EWKB point, SRID 4326
+    assert (frame['data_source'] == 'csv').all()
+    
+    lines = ''.join(encode_copy_frame(frame, rows_per_chunk=2)).splitlines()
+    assert len(lines) == 3
+    assert all(len(line.split('\t')) == len(PROPERTY_COLUMNS) for line in lines)
+
+def test_property_etl_data_source_from_config(sample_properties):
+    """Test loaded rows record the configured data source"""
+    etl = PropertyETL({'data_source': 'county_assessor'})
+    frame = etl._prepare_load_frame(etl.transform(sample_properties.drop(columns=['geometry'])))
+    
+    assert (frame['data_source'] == 'county_assessor').all()
+
+def test_property_etl_streaming_extract(sample_properties):
+    """Test chunked CSV extraction for streaming runs"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+        sample_properties.drop(columns=['geometry']).to_csv(f.name, index=False)
+        csv_path = f.name
+    
+    try:
+        etl = PropertyETL({
+            'source_type': 'csv',
+            'source_path': csv_path,
+            'streaming': True,
+            'chunk_size': 2
+        })
+        chunks = list(etl.extract_chunks())
+        
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert list(chunks[1].index) == [2]
+        
+    finally:
+        os.unlink(csv_path)
+
+def test_property_etl_pipelined_run(sample_properties):
+    """Test process-pool transforms are loaded in source order"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+        sample_properties.drop(columns=['geometry']).to_csv(f.name, index=False)
+        csv_path = f.name
+    
+    try:
+        etl = RecordingPropertyETL({
+            'source_type': 'csv',
+            'source_path': csv_path,
+            'streaming': True,
+            'chunk_size': 1,
+            'transform_workers': 2,
+            'max_pending_chunks': 1
+        })
+        result = etl.run()
+        
+        assert result['success'] == True
+        assert result['chunks_loaded'] == 3
+        assert etl.loaded_addresses == list(sample_properties['address'])
+        
+    finally:
+        os.unlink(csv_path)
+
+def test_property_etl_resumes_from_checkpoint(sample_properties):
+    """Test a resumed streaming run skips chunks committed by an earlier attempt"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'properties.csv')
+        # A quoted field spanning lines must not shift the resume position
+        df = sample_properties.drop(columns=['geometry'])
+        df['address'] = ['1 Main St\nUnit 2', '2 Main St', '3 Main St']
+        df.to_csv(csv_path, index=False)
+        config = {
+            'source_type': 'csv',
+            'source_path': csv_path,
+            'streaming': True,
+            'chunk_size': 2
+        }
+        
+        store = CheckpointStore(os.path.join(tmp_dir, 'state.json'))
+        store.start_run()
+        store.record_chunk('property_etl', 1, source_position=2, records_loaded=2)
+        
+        resumed_store = CheckpointStore(os.path.join(tmp_dir, 'state.json'))
+        resumed_store.start_run(resume=True)
+        etl = RecordingPropertyETL(config)
+        etl.attach_checkpoint(resumed_store, 'property_etl')
+        result = etl.run()
+        
+        assert result['success'] == True
+        assert etl.loaded_addresses == ['3 Main St']
+        assert resumed_store.get_pipeline('property_etl')['source_position'] == 3
+        assert resumed_store.get_pipeline('property_etl')['records_loaded'] == 3
+
+def test_property_etl_geoparquet_extraction(sample_properties):
+    """Test GeoParquet extraction decodes geometry without coordinate columns"""
+    gdf = gpd.GeoDataFrame(
+        sample_properties.drop(columns=['geometry', 'latitude', 'longitude']),
+        geometry=gpd.points_from_xy(sample_properties['longitude'], sample_properties['latitude']),
+        crs='EPSG:4326'
+    )
+    
+    with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as f:
+        parquet_path = f.name
+    gdf.to_parquet(parquet_path)
+    
+    try:
+        etl = PropertyETL({'source_type': 'geoparquet', 'source_path': parquet_path})
+        extracted = etl.extract()
+        
+        assert isinstance(extracted, gpd.GeoDataFrame)
+        assert extracted.crs == 'EPSG:4326'
+        assert extracted.geometry.x.tolist() == sample_properties['longitude'].tolist()
+        assert len(etl.transform(extracted)) == 3
+        
+    finally:
+        os.unlink(parquet_path)
+
+def test_property_etl_arrow_streaming_extract(sample_properties):
+    """Test chunked Arrow IPC extraction resumes at the source position"""
+    table = pa.Table.from_pandas(sample_properties.drop(columns=['geometry']), preserve_index=False)
+    
+    with tempfile.NamedTemporaryFile(suffix='.arrow', delete=False) as f:
+        arrow_path = f.name
+    with pa.ipc.new_file(arrow_path, table.schema) as writer:
+        writer.write_table(table, max_chunksize=2)
+    
+    try:
+        etl = PropertyETL({'source_type': 'arrow', 'source_path': arrow_path, 'streaming': True})
+        etl.start_position = 1
+        chunks = list(etl.extract_chunks())
+        
+        assert [list(chunk.index) for chunk in chunks] == [[1], [2]]
+        assert chunks[0]['address'].tolist() == ['2 Main St']
+        
+    finally:
+        os.unlink(arrow_path)
@@ -1,15 +1,149 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+#include <map>
+#include <optional>
+#include <string>
 #include <vector>
 
 // Include your friend's headers
 #include "geometry.h"
 #include "RTree.h"
 #include "engine.h"
-// #include "property.h"  // Uncomment if this exists
+#include "property.h"
+#include "amenity.h"
 
 namespace py = pybind11;
 
+namespace {
+    // Hand a vector to numpy without copying; the array owns the vector
+    template <typename T>
+    py::array_t<T> to_numpy(std::vector<T>&& values) {
+        auto* owned = new std::vector<T>(std::move(values));
+        py::capsule free_when_done(owned, [](void* p) { delete static_cast<std::vector<T>*>(p); });
+        return py::array_t<T>(owned->size(), owned->data(), free_when_done);
+    }
+
+    // Copy of one column at the given rows (all rows if `rows` is None)
+    template <typename T>
+    py::array_t<T> gather(const std::vector<T>& column, const py::object& rows) {
+        if (rows.is_none()) {
+            return py::array_t<T>(column.size(), column.data());
+        }
+        auto indexes = rows.cast<py::array_t<uint32_t, py::array::c_style | py::array::forcecast>>();
+        auto view = indexes.template unchecked<1>();
+        py::array_t<T> result(view.shape(0));
+        T* out = result.mutable_data();
+        for (py::ssize_t i = 0; i < view.shape(0); ++i) {
+            if (view(i) >= column.size()) {
+                throw py::index_error("row " + std::to_string(view(i)) + " out of range");
+            }
+            out[i] = column[view(i)];
+        }
+        return result;
+    }
+
+    // Engine filter from optional keyword arguments; None leaves a bound open
+    PropertyFilter make_filter(std::optional<double> price_min, std::optional<double> price_max,
+                               std::optional<int> bedrooms_min, std::optional<int> bedrooms_max,
+                               std::optional<std::vector<std::string>> property_types) {
+        PropertyFilter filter;
+        if (price_min) filter.price_min = *price_min;
+        if (price_max) filter.price_max = *price_max;
+        if (bedrooms_min) filter.bedrooms_min = *bedrooms_min;
+        if (bedrooms_max) filter.bedrooms_max = *bedrooms_max;
+        if (property_types) filter.property_types = std::move(*property_types);
+        return filter;
+    }
+
+    // Top-k query from keyword arguments; `after` is a (key, property_id) cursor
+    TopKQuery make_top_k_query(const std::string& order_by, size_t limit, bool descending,
+                               std::optional<std::pair<double, double>> origin,
+                               std::optional<std::pair<double, int>> after) {
+        static const std::map<std::string, SortOrder> orders = {
+            { "price", SortOrder::Price }, { "price_per_sqft", SortOrder::PricePerSqft },
+            { "distance", SortOrder::Distance },
+        };
+        auto order = orders.find(order_by);
+        if (order == orders.end()) {
+            throw py::value_error("Unknown order_by '" + order_by + "'; expected price, price_per_sqft or distance");
+        }
+        if (order->second == SortOrder::Distance && !origin) {
+            throw py::value_error("order_by='distance' requires an origin");
+        }
+
+        TopKQuery query;
+        query.order = order->second;
+        query.descending = descending;
+        query.limit = limit;
+        if (origin) query.origin = { origin->first, origin->second };
+        if (after) query.after = KeysetCursor{ after->first, after->second };
+        return query;
+    }
+
+    // (rows, keys) numpy arrays of a ranked page
+    py::tuple ranked_to_numpy(const std::vector<RankedRow>& ranked) {
+        std::vector<PropertyStore::Row> rows;
+        std::vector<double> keys;
+        rows.reserve(ranked.size());
+        keys.reserve(ranked.size());
+        for (const RankedRow& r : ranked) {
+            rows.push_back(r.row);
+            keys.push_back(r.key);
+        }
+        return py::make_tuple(to_numpy(std::move(rows)), to_numpy(std::move(keys)));
+    }
+
+    // Address of a pyarrow.Buffer (None for an absent validity bitmap)
+    template <typename T>
+    const T* buffer_address(const py::handle& buffer) {
+        if (buffer.is_none()) return nullptr;
+        return reinterpret_cast<const T*>(buffer.attr("address").cast<uintptr_t>());
+    }
+
+    // View a pyarrow numeric array in place; other numeric types are cast to
+    // float64 first. `keep_alive` holds any cast result for the view's lifetime.
+    NumericColumn numeric_view(py::object array, std::vector<py::object>& keep_alive) {
+        static const std::map<std::string, NumericType> types = {
+            { "double", NumericType::Float64 }, { "float", NumericType::Float32 },
+            { "int64", NumericType::Int64 }, { "int32", NumericType::Int32 },
+        };
+        auto type = types.find(py::str(array.attr("type")).cast<std::string>());
+        if (type == types.end()) {
+            array = array.attr("cast")(py::module_::import("pyarrow").attr("float64")());
+            keep_alive.push_back(array);
+            type = types.find("double");
+        }
+
+        py::list buffers = array.attr("buffers")();
+        NumericColumn column;
+        column.type = type->second;
+        column.validity = buffer_address<uint8_t>(buffers[0]);
+        column.data = buffer_address<void>(buffers[1]);
+        column.offset = array.attr("offset").cast<int64_t>();
+        return column;
+    }
+
+    // View a pyarrow string array in place; dictionary or other arrays are cast to string first
+    StringColumn string_view_of(py::object array, std::vector<py::object>& keep_alive) {
+        std::string type = py::str(array.attr("type")).cast<std::string>();
+        if (type != "string" && type != "large_string") {
+            array = array.attr("cast")(py::module_::import("pyarrow").attr("string")());
+            keep_alive.push_back(array);
+            type = "string";
+        }
+
+        py::list buffers = array.attr("buffers")();
+        StringColumn column;
+        column.large_offsets = type == "large_string";
+        column.validity = buffer_address<uint8_t>(buffers[0]);
+        column.offsets = buffer_address<void>(buffers[1]);
+        column.data = buffer_address<char>(buffers[2]);
+        column.offset = array.attr("offset").cast<int64_t>();
+        return column;
+    }
+}
+
 PYBIND11_MODULE(rtree_engine, m) {
     m.doc() = "R-tree spatial indexing engine with Python bindings";
     
@@ -75,6 +209,66 @@ PYBIND11_MODULE(rtree_engine, m) {
             return "RTree()";
         });
     
+    // ========================================
+    // Property, Amenity and ProximityMatch bindings
+    // ========================================
+    py::class_<Property>(m, "Property", "Property record held by the engine")
+        .def_readonly("id", &Property::id)
+        .def_readonly("address", &Property::address)
+        .def_readonly("price", &Property::price)
+        .def_readonly("bedrooms", &Property::bedrooms)
+        .def_readonly("bathrooms", &Property::bathrooms)
+        .def_readonly("square_footage", &Property::square_footage)
+        .def_readonly("location", &Property::location)
+        .def_readonly("property_type", &Property::property_type)
+        .def("__repr__", [](const Property& p) {
+            return "Property(id=" + std::to_string(p.id) + ", address='" + p.address + "')";
+        });
+    
+    py::class_<Amenity>(m, "Amenity", "Amenity (school, hospital, park, ...) held by the engine")
+        .def_readonly("id", &Amenity::id)
+        .def_readonly("name", &Amenity::name)
+        .def_readonly("amenity_type", &Amenity::amenity_type)
+        .def_readonly("location", &Amenity::location)
+        .def("__repr__", [](const Amenity& a) {
+            return "Amenity(id=" + std::to_string(a.id) + ", name='" + a.name + "', type='" + a.amenity_type + "')";
+        });
+    
+    py::class_<ProximityMatch>(m, "ProximityMatch", "A property and its nearest amenity of a type")
+        .def_readonly("property_id", &ProximityMatch::property_id)
+        .def_readonly("amenity_id", &ProximityMatch::amenity_id)
+        .def_readonly("distance_km", &ProximityMatch::distance_km)
+        .def("__repr__", [](const ProximityMatch& match) {
+            return "ProximityMatch(property_id=" + std::to_string(match.property_id) +
+                   ", amenity_id=" + std::to_string(match.amenity_id) +
+                   ", distance_km=" + std::to_string(match.distance_km) + ")";
+        });
+
+    py::class_<Cluster>(m, "Cluster", "Properties sharing one grid cell")
+        .def_readonly("centroid", &Cluster::centroid)
+        .def_readonly("count", &Cluster::count)
+        .def_readonly("price_min", &Cluster::price_min)
+        .def_readonly("price_max", &Cluster::price_max)
+        .def_readonly("price_mean", &Cluster::price_mean)
+        .def_readonly("property_id", &Cluster::property_id)
+        .def("__repr__", [](const Cluster& cluster) {
+            return "Cluster(count=" + std::to_string(cluster.count) +
+                   ", x=" + std::to_string(cluster.centroid.x) +
+                   ", y=" + std::to_string(cluster.centroid.y) + ")";
+        });
+
+    py::class_<BoundaryStats>(m, "BoundaryStats", "Prices of the properties inside one administrative boundary")
+        .def_readonly("boundary_id", &BoundaryStats::boundary_id)
+        .def_readonly("name", &BoundaryStats::name)
+        .def_readonly("count", &BoundaryStats::count)
+        .def_readonly("price_min", &BoundaryStats::price_min)
+        .def_readonly("price_max", &BoundaryStats::price_max)
+        .def_readonly("price_mean", &BoundaryStats::price_mean)
+        .def("__repr__", [](const BoundaryStats& stats) {
+            return "BoundaryStats(boundary_id=" + std::to_string(stats.boundary_id) +
+                   ", name='" + stats.name + "', count=" + std::to_string(stats.count) + ")";
+        });
+    
     // ========================================
     // SpatialSearchEngine class binding
     // ========================================
@@ -82,16 +276,265 @@ PYBIND11_MODULE(rtree_engine, m) {
         .def(py::init<>(), "Create a new spatial search engine")
         .def("load_data", [](SpatialSearchEngine& self, const std::string& filepath) {
             return self.load_data(filepath);
-        }, "Load property data from JSON file",
-           py::arg("filepath"))
+        }, "Load property data from JSON file (streamed, without building a DOM)",
+           py::arg("filepath"), py::call_guard<py::gil_scoped_release>())
+        .def("load_ndjson", [](SpatialSearchEngine& self, const std::string& filepath, unsigned int threads) {
+            return self.load_ndjson(filepath, threads);
+        }, "Load property data from newline-delimited JSON, parsing on several threads (0 = all cores)",
+           py::arg("filepath"), py::arg("threads") = 0, py::call_guard<py::gil_scoped_release>())
+        .def("load_arrow", [](SpatialSearchEngine& self, const py::object& table,
+                              const std::string& id_column, const std::string& x_column,
+                              const std::string& y_column, const std::string& price_column,
+                              const std::string& bedrooms_column, const std::string& bathrooms_column,
+                              const std::string& square_footage_column, const std::string& address_column,
+                              const std::string& property_type_column) {
+            py::list names = table.attr("schema").attr("names");
+            auto has_column = [&](const std::string& name) { return names.contains(py::str(name)); };
+            for (const auto& required : { id_column, x_column, y_column }) {
+                if (!has_column(required)) {
+                    throw py::key_error("Arrow table has no column '" + required + "'");
+                }
+            }
+
+            size_t added = 0;
+            // to_batches() is zero-copy: every view below points into the table's own buffers
+            for (const auto& batch : table.attr("to_batches")()) {
+                std::vector<py::object> keep_alive;
+                auto column = [&](const std::string& name) { return batch.attr("column")(name); };
+                auto numeric = [&](const std::string& name) {
+                    return has_column(name) ? numeric_view(column(name), keep_alive) : NumericColumn();
+                };
+                auto text = [&](const std::string& name) {
+                    return has_column(name) ? string_view_of(column(name), keep_alive) : StringColumn();
+                };
+
+                PropertyColumns columns;
+                columns.length = batch.attr("num_rows").cast<size_t>();
+                columns.id = numeric(id_column);
+                columns.x = numeric(x_column);
+                columns.y = numeric(y_column);
+                columns.price = numeric(price_column);
+                columns.bedrooms = numeric(bedrooms_column);
+                columns.bathrooms = numeric(bathrooms_column);
+                columns.square_footage = numeric(square_footage_column);
+                columns.address = text(address_column);
+                columns.property_type = text(property_type_column);
+
+                py::gil_scoped_release release;
+                added += self.load_columns(columns);
+            }
+            return added;
+        }, "Add properties from a pyarrow Table without copying its column "
+           "buffers; rows with a null id or coordinate, or an already indexed id, are skipped. "
+           "Returns the number of properties added.",
+           py::arg("table"), py::arg("id_column") = "id", py::arg("x_column") = "lng",
+           py::arg("y_column") = "lat", py::arg("price_column") = "price",
+           py::arg("bedrooms_column") = "bedrooms", py::arg("bathrooms_column") = "bathrooms",
+           py::arg("square_footage_column") = "square_feet", py::arg("address_column") = "address",
+           py::arg("property_type_column") = "property_type")
         .def("search_properties", [](const SpatialSearchEngine& self, const Rectangle& query_box) {
             return self.search_properties(query_box);
         }, "Search for properties within the given bounding box",
            py::arg("query_box"))
+        .def("search_rows", [](const SpatialSearchEngine& self, const Rectangle& query_box) {
+            std::vector<PropertyStore::Row> rows;
+            {
+                py::gil_scoped_release release;
+                rows = self.search_rows(query_box);
+            }
+            return to_numpy(std::move(rows));
+        }, "Row indexes (numpy uint32) of the properties within the given bounding box",
+           py::arg("query_box"))
+        .def("search", [](const SpatialSearchEngine& self, const Rectangle& query_box,
+                          std::optional<double> price_min, std::optional<double> price_max,
+                          std::optional<int> bedrooms_min, std::optional<int> bedrooms_max,
+                          std::optional<std::vector<std::string>> property_types) {
+            PropertyFilter filter = make_filter(price_min, price_max, bedrooms_min, bedrooms_max, std::move(property_types));
+            std::vector<PropertyStore::Row> rows;
+            {
+                py::gil_scoped_release release;
+                rows = self.search_rows(query_box, filter);
+            }
+            return to_numpy(std::move(rows));
+        }, "Row indexes (numpy uint32) of the properties within the bounding box that match every "
+           "given filter; price and bedroom bounds are inclusive",
+           py::arg("query_box"), py::arg("price_min") = py::none(), py::arg("price_max") = py::none(),
+           py::arg("bedrooms_min") = py::none(), py::arg("bedrooms_max") = py::none(),
+           py::arg("property_types") = py::none())
+        .def("search_polygon", [](const SpatialSearchEngine& self, const std::vector<std::pair<double, double>>& coordinates,
+                                  std::optional<double> price_min, std::optional<double> price_max,
+                                  std::optional<int> bedrooms_min, std::optional<int> bedrooms_max,
+                                  std::optional<std::vector<std::string>> property_types) {
+            PropertyFilter filter = make_filter(price_min, price_max, bedrooms_min, bedrooms_max, std::move(property_types));
+            std::vector<Point> ring;
+            ring.reserve(coordinates.size());
+            for (const auto& coordinate : coordinates) {
+                ring.push_back({ coordinate.first, coordinate.second });
+            }
+            std::vector<PropertyStore::Row> rows;
+            {
+                py::gil_scoped_release release;
+                rows = self.search_polygon_rows(ring, filter);
+            }
+            return to_numpy(std::move(rows));
+        }, "Row indexes (numpy uint32) of the properties inside a polygon ring of (lng, lat) pairs "
+           "that match every given filter",
+           py::arg("coordinates"), py::arg("price_min") = py::none(), py::arg("price_max") = py::none(),
+           py::arg("bedrooms_min") = py::none(), py::arg("bedrooms_max") = py::none(),
+           py::arg("property_types") = py::none())
+        .def("top_k", [](const SpatialSearchEngine& self, const Rectangle& query_box, const std::string& order_by,
+                         size_t limit, bool descending, std::optional<std::pair<double, double>> origin,
+                         std::optional<std::pair<double, int>> after,
+                         std::optional<double> price_min, std::optional<double> price_max,
+                         std::optional<int> bedrooms_min, std::optional<int> bedrooms_max,
+                         std::optional<std::vector<std::string>> property_types) {
+            TopKQuery query = make_top_k_query(order_by, limit, descending, origin, after);
+            PropertyFilter filter = make_filter(price_min, price_max, bedrooms_min, bedrooms_max, std::move(property_types));
+            std::vector<RankedRow> ranked;
+            {
+                py::gil_scoped_release release;
+                ranked = self.top_k_rows(query_box, filter, query);
+            }
+            return ranked_to_numpy(ranked);
+        }, "The first `limit` matching rows within the bounding box ordered by price, price_per_sqft or "
+           "distance (from `origin`, an (lng, lat) pair), then property ID. Returns (rows, keys) numpy "
+           "arrays; pass after=(keys[-1], id of rows[-1]) to fetch the next page.",
+           py::arg("query_box"), py::arg("order_by") = "price", py::arg("limit") = 50,
+           py::arg("descending") = false, py::arg("origin") = py::none(), py::arg("after") = py::none(),
+           py::arg("price_min") = py::none(), py::arg("price_max") = py::none(),
+           py::arg("bedrooms_min") = py::none(), py::arg("bedrooms_max") = py::none(),
+           py::arg("property_types") = py::none())
+        .def("top_k_polygon", [](const SpatialSearchEngine& self, const std::vector<std::pair<double, double>>& coordinates,
+                                 const std::string& order_by, size_t limit, bool descending,
+                                 std::optional<std::pair<double, double>> origin,
+                                 std::optional<std::pair<double, int>> after,
+                                 std::optional<double> price_min, std::optional<double> price_max,
+                                 std::optional<int> bedrooms_min, std::optional<int> bedrooms_max,
+                                 std::optional<std::vector<std::string>> property_types) {
+            TopKQuery query = make_top_k_query(order_by, limit, descending, origin, after);
+            PropertyFilter filter = make_filter(price_min, price_max, bedrooms_min, bedrooms_max, std::move(property_types));
+            std::vector<Point> ring;
+            ring.reserve(coordinates.size());
+            for (const auto& coordinate : coordinates) {
+                ring.push_back({ coordinate.first, coordinate.second });
+            }
+            std::vector<RankedRow> ranked;
+            {
+                py::gil_scoped_release release;
+                ranked = self.top_k_polygon_rows(ring, filter, query);
+            }
+            return ranked_to_numpy(ranked);
+        }, "As top_k, for the properties inside a polygon ring of (lng, lat) pairs",
+           py::arg("coordinates"), py::arg("order_by") = "price", py::arg("limit") = 50,
+           py::arg("descending") = false, py::arg("origin") = py::none(), py::arg("after") = py::none(),
+           py::arg("price_min") = py::none(), py::arg("price_max") = py::none(),
+           py::arg("bedrooms_min") = py::none(), py::arg("bedrooms_max") = py::none(),
+           py::arg("property_types") = py::none())
+        .def("column", [](const SpatialSearchEngine& self, const std::string& name, const py::object& rows) -> py::object {
+            const PropertyStore& store = self.properties();
+            if (name == "id") return gather(store.ids(), rows);
+            if (name == "x" || name == "lng") return gather(store.xs(), rows);
+            if (name == "y" || name == "lat") return gather(store.ys(), rows);
+            if (name == "price") return gather(store.prices(), rows);
+            if (name == "bedrooms") return gather(store.bedrooms(), rows);
+            if (name == "bathrooms") return gather(store.bathrooms(), rows);
+            if (name == "square_footage") return gather(store.square_footage(), rows);
+            if (name == "property_type_code") return gather(store.type_codes(), rows);
+            throw py::key_error("Unknown property column '" + name + "'");
+        }, "Copy of a numeric property column (id, lng, lat, price, bedrooms, bathrooms, "
+           "square_footage, property_type_code) at the given rows, or for all rows",
+           py::arg("name"), py::arg("rows") = py::none())
+        .def("addresses", [](const SpatialSearchEngine& self, py::array_t<uint32_t, py::array::c_style | py::array::forcecast> rows) {
+            const PropertyStore& store = self.properties();
+            auto view = rows.unchecked<1>();
+            py::list result(view.shape(0));
+            for (py::ssize_t i = 0; i < view.shape(0); ++i) {
+                if (view(i) >= store.size()) {
+                    throw py::index_error("row " + std::to_string(view(i)) + " out of range");
+                }
+                std::string_view address = store.address(view(i));
+                result[i] = py::str(address.data(), address.size());
+            }
+            return result;
+        }, "Addresses of the given rows", py::arg("rows"))
+        .def("property_types", [](const SpatialSearchEngine& self) {
+            return self.properties().type_dictionary();
+        }, "Dictionary of property_type values, indexed by property_type_code")
+        .def("memory_usage", [](const SpatialSearchEngine& self) {
+            return self.properties().memory_usage();
+        }, "Approximate bytes held by the property columns")
+        .def("clusters", &SpatialSearchEngine::clusters,
+             "Properties within the bounding box grouped into grid cells of cell_size degrees, largest first",
+             py::arg("query_box"), py::arg("cell_size"), py::call_guard<py::gil_scoped_release>())
         .def("get_property_by_id", [](const SpatialSearchEngine& self, int id) {
             return self.get_property_by_id(id);
         }, "Retrieve a property by its ID",
            py::arg("id"))
+        .def("add_property", [](SpatialSearchEngine& self, int id, const std::string& address, double price,
+                                int bedrooms, double bathrooms, double square_footage,
+                                double x, double y, const std::string& property_type) {
+            return self.add_property(Property(id, address, price, bedrooms, bathrooms, square_footage, { x, y }, property_type));
+        }, "Add a property to the engine; returns False if the ID is already indexed",
+           py::arg("id"), py::arg("address"), py::arg("price"), py::arg("bedrooms"), py::arg("bathrooms"),
+           py::arg("square_footage"), py::arg("x"), py::arg("y"), py::arg("property_type"))
+        .def("add_amenity", [](SpatialSearchEngine& self, int id, const std::string& name,
+                               const std::string& amenity_type, double x, double y) {
+            return self.add_amenity(Amenity(id, name, amenity_type, { x, y }));
+        }, "Add an amenity to the R-tree of its type; returns False if the ID is already indexed",
+           py::arg("id"), py::arg("name"), py::arg("amenity_type"), py::arg("x"), py::arg("y"))
+        .def("search_amenities", [](const SpatialSearchEngine& self, const std::string& amenity_type, const Rectangle& query_box) {
+            return self.search_amenities(amenity_type, query_box);
+        }, "Search for amenities of one type within the given bounding box",
+           py::arg("amenity_type"), py::arg("query_box"))
+        .def("properties_near_amenities", [](const SpatialSearchEngine& self, const std::string& amenity_type, double distance_km,
+                                             std::optional<double> price_min, std::optional<double> price_max,
+                                             std::optional<int> bedrooms_min, std::optional<int> bedrooms_max,
+                                             std::optional<std::vector<std::string>> property_types,
+                                             size_t limit, std::optional<std::pair<double, int>> after) {
+            PropertyFilter filter = make_filter(price_min, price_max, bedrooms_min, bedrooms_max, std::move(property_types));
+            std::optional<KeysetCursor> cursor;
+            if (after) cursor = KeysetCursor{ after->first, after->second };
+            py::gil_scoped_release release;
+            return self.properties_near_amenities(amenity_type, distance_km, filter, limit, cursor);
+        }, "Properties within distance_km of an amenity of the given type, with their nearest such amenity, "
+           "ordered by distance then property ID; only properties matching every given filter are considered. "
+           "`limit` (0 = no limit) and after=(distance_km, property_id) page through the matches.",
+           py::arg("amenity_type"), py::arg("distance_km"), py::arg("price_min") = py::none(),
+           py::arg("price_max") = py::none(), py::arg("bedrooms_min") = py::none(),
+           py::arg("bedrooms_max") = py::none(), py::arg("property_types") = py::none(),
+           py::arg("limit") = 0, py::arg("after") = py::none())
+        .def("get_amenity_by_id", [](const SpatialSearchEngine& self, int id) {
+            return self.get_amenity_by_id(id);
+        }, "Retrieve an amenity by its ID",
+           py::arg("id"))
+        .def("add_boundary_part", [](SpatialSearchEngine& self, int64_t boundary_id, const std::string& name,
+                                     const std::string& boundary_type,
+                                     const std::vector<std::vector<std::pair<double, double>>>& rings) {
+            std::vector<std::vector<Point>> polygon;
+            polygon.reserve(rings.size());
+            for (const auto& coordinates : rings) {
+                std::vector<Point>& ring = polygon.emplace_back();
+                ring.reserve(coordinates.size());
+                for (const auto& coordinate : coordinates) {
+                    ring.push_back({ coordinate.first, coordinate.second });
+                }
+            }
+            return self.add_boundary_part(boundary_id, name, boundary_type, std::move(polygon));
+        }, "Add one polygon of an administrative boundary as rings of (lng, lat) pairs, holes included; "
+           "parts sharing a boundary_id form one area. Returns False if no ring has three points.",
+           py::arg("boundary_id"), py::arg("name"), py::arg("boundary_type"), py::arg("rings"))
+        .def("boundary_stats", &SpatialSearchEngine::boundary_stats,
+             "Property count and price min/max/mean inside every boundary of a type, ordered by boundary ID",
+             py::arg("boundary_type"), py::call_guard<py::gil_scoped_release>())
+        .def("boundary_at", [](const SpatialSearchEngine& self, const std::string& boundary_type, double x, double y) {
+            return self.boundary_at(boundary_type, { x, y });
+        }, "ID of the boundary of a type containing the point, or -1",
+           py::arg("boundary_type"), py::arg("x"), py::arg("y"))
+        .def("property_count", &SpatialSearchEngine::property_count, "Number of indexed properties")
+        .def("amenity_count", &SpatialSearchEngine::amenity_count, "Number of indexed amenities")
+        .def("boundary_count", &SpatialSearchEngine::boundary_count, "Number of indexed boundaries")
+        .def("clear_amenities", &SpatialSearchEngine::clear_amenities, "Remove all amenities")
+        .def("clear_boundaries", &SpatialSearchEngine::clear_boundaries, "Remove all boundaries")
         .def("__repr__", [](const SpatialSearchEngine& engine) {
             return "SpatialSearchEngine()";
         });
@@ -16,6 +16,8 @@ ext_modules = [
             "src/RTreeNode.cpp", 
             "src/RTree.cpp",
             "src/engine.cpp",
+            "src/json_loader.cpp",
+            "src/property_store.cpp",
         ],
         include_dirs=[
             # pybind11 headers
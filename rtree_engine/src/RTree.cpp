@@ -33,23 +33,80 @@ std::vector<int> RTree::search(const Rectangle& query_box) const {
     return result;
 }
 
+void RTree::search(const Rectangle& query_box, RTreeNode* node,
+                   const std::function<bool(const NodeStats&)>& subtree_may_match,
+                   const std::function<bool(int id)>& accept, std::vector<int>& result) const {
+    for (const auto& entry : node->entries) {
+        if (!entry.mbr.intersects(query_box)) continue;
+        if (node->is_leaf) {
+            if (accept(entry.data_id)) {
+                result.push_back(entry.data_id);
+            }
+        }
+        else if (subtree_may_match(entry.child_ptr->stats)) {
+            search(query_box, entry.child_ptr.get(), subtree_may_match, accept, result);
+        }
+    }
+}
+
+std::vector<int> RTree::search(const Rectangle& query_box,
+                               const std::function<bool(const NodeStats&)>& subtree_may_match,
+                               const std::function<bool(int id)>& accept) const {
+    std::vector<int> result;
+    if (subtree_may_match(m_root->stats)) {
+        search(query_box, m_root.get(), subtree_may_match, accept, result);
+    }
+    return result;
+}
+
+void RTree::aggregate(const Rectangle& query_box, RTreeNode* node,
+                      const std::function<bool(const Rectangle& mbr, const NodeStats&)>& take_subtree,
+                      const std::function<void(int id)>& on_entry) const {
+    for (const auto& entry : node->entries) {
+        if (!entry.mbr.intersects(query_box)) continue;
+        if (node->is_leaf) {
+            on_entry(entry.data_id);
+        }
+        else if (!(query_box.contains(entry.mbr) && take_subtree(entry.mbr, entry.child_ptr->stats))) {
+            aggregate(query_box, entry.child_ptr.get(), take_subtree, on_entry);
+        }
+    }
+}
+
+void RTree::aggregate(const Rectangle& query_box,
+                      const std::function<bool(const Rectangle& mbr, const NodeStats&)>& take_subtree,
+                      const std::function<void(int id)>& on_entry) const {
+    aggregate(query_box, m_root.get(), take_subtree, on_entry);
+}
+
+void RTree::refresh_stats(RTreeNode* node) const {
+    if (!m_stats_provider) {
+        return; // Stays NodeStats::unknown()
+    }
+    NodeStats stats = NodeStats::empty();
+    for (const auto& entry : node->entries) {
+        stats.merge(node->is_leaf ? m_stats_provider(entry.data_id) : entry.child_ptr->stats);
+    }
+    node->stats = stats;
+}
+
 
 // --- Insertion Implementation ---
 
 void RTree::insert(const Point& point, int id) {
-    Rectangle point_mbr = { point, point };
+    insert_mbr({ point, point }, id);
+}
 
+void RTree::insert_mbr(const Rectangle& mbr, int id) {
     // This call now matches the header declaration
-    RTreeNode* leaf = choose_leaf(point_mbr);
+    RTreeNode* leaf = choose_leaf(mbr);
 
-    leaf->entries.push_back({ point_mbr, nullptr, id });
+    leaf->entries.push_back({ mbr, nullptr, id });
 
     if (leaf->entries.size() > m_max_entries) {
         split_node(leaf);
     }
-    else {
-        adjust_tree(leaf);
-    }
+    adjust_tree(leaf);
 }
 
 // This definition now matches the header declaration
@@ -82,12 +139,19 @@ RTreeNode* RTree::choose_leaf(const Rectangle& new_entry_mbr) {
 }
 
 void RTree::adjust_tree(RTreeNode* node) {
-    while (node != nullptr) {
-        // The split_node function will handle adjusting its direct parent.
-        // For non-splitting adjustments, we'd update the parent's MBR here.
-        // For simplicity, we keep this minimal. The MBRs are correctly
-        // reconstructed during splits.
-        node = node->parent;
+    // Refresh the MBR and stats stored for each node on the path up to the
+    // root so that ancestors always cover the entry that was just inserted
+    refresh_stats(node);
+    while (node->parent != nullptr) {
+        RTreeNode* parent = node->parent;
+        for (auto& entry : parent->entries) {
+            if (entry.child_ptr.get() == node) {
+                entry.mbr = node->get_mbr();
+                break;
+            }
+        }
+        node = parent;
+        refresh_stats(node);
     }
 }
 
@@ -166,6 +230,15 @@ void RTree::split_node(RTreeNode* node) {
         }
     }
 
+    // Children that moved to the new sibling must point at their new parent
+    for (auto& entry : new_node_ptr->entries) {
+        if (entry.child_ptr) {
+            entry.child_ptr->parent = new_node_ptr.get();
+        }
+    }
+    refresh_stats(node);
+    refresh_stats(new_node_ptr.get());
+
     RTreeNode* parent = node->parent;
     if (parent == nullptr) {
         auto old_root_node = m_root.release();
@@ -177,6 +250,7 @@ void RTree::split_node(RTreeNode* node) {
         new_root->entries.push_back({ new_node_ptr->get_mbr(), std::move(new_node_ptr), -1 });
 
         m_root = std::move(new_root);
+        refresh_stats(m_root.get());
     }
     else {
         for (auto& entry : parent->entries) {
@@ -1,6 +1,7 @@
 #pragma once
 
 #include "RTreeNode.h"
+#include <functional>
 #include <vector>
 #include <memory>
 
@@ -8,17 +9,46 @@ class RTree {
 public:
     RTree();
 
+    // Supplies the attributes of a stored id so nodes can keep NodeStats;
+    // without a provider every node matches every filter
+    using StatsProvider = std::function<NodeStats(int id)>;
+
     void insert(const Point& point, int id);
+    void insert_mbr(const Rectangle& mbr, int id); // For entries with an extent, e.g. polygons
     std::vector<int> search(const Rectangle& query_box) const;
     void clear(); // New method to reset the tree
 
+    void set_stats_provider(StatsProvider provider) { m_stats_provider = std::move(provider); }
+
+    // Search that skips subtrees whose stats fail `subtree_may_match` and
+    // keeps only ids accepted by `accept`
+    std::vector<int> search(const Rectangle& query_box,
+                            const std::function<bool(const NodeStats&)>& subtree_may_match,
+                            const std::function<bool(int id)>& accept) const;
+
+    // Aggregation walk over query_box. For each subtree that lies inside
+    // query_box, `take_subtree(mbr, stats)` may consume the subtree's stats
+    // whole by returning true; otherwise the walk descends and passes every
+    // intersecting entry's id to `on_entry`.
+    void aggregate(const Rectangle& query_box,
+                   const std::function<bool(const Rectangle& mbr, const NodeStats&)>& take_subtree,
+                   const std::function<void(int id)>& on_entry) const;
+
 private:
     void search(const Rectangle& query_box, RTreeNode* node, std::vector<int>& result) const;
+    void aggregate(const Rectangle& query_box, RTreeNode* node,
+                   const std::function<bool(const Rectangle& mbr, const NodeStats&)>& take_subtree,
+                   const std::function<void(int id)>& on_entry) const;
+    void search(const Rectangle& query_box, RTreeNode* node,
+                const std::function<bool(const NodeStats&)>& subtree_may_match,
+                const std::function<bool(int id)>& accept, std::vector<int>& result) const;
+    void refresh_stats(RTreeNode* node) const;
     RTreeNode* choose_leaf(const Rectangle& new_entry_mbr);
     void split_node(RTreeNode* node);
     void adjust_tree(RTreeNode* node);
 
     std::unique_ptr<RTreeNode> m_root;
+    StatsProvider m_stats_provider;
 
     // --- The Fix ---
     // Removed 'const' so the class can be assignable if needed.
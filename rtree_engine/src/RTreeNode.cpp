@@ -1,6 +1,37 @@
 #include "RTreeNode.h"
+#include <algorithm>
 #include <limits> // For numeric_limits
 using namespace std;
+
+NodeStats NodeStats::unknown() {
+    return { numeric_limits<double>::lowest(), numeric_limits<double>::max(),
+             numeric_limits<int>::min(), numeric_limits<int>::max(), ~uint64_t(0),
+             0, 0.0, 0.0, 0.0 };
+}
+
+NodeStats NodeStats::empty() {
+    return { numeric_limits<double>::max(), numeric_limits<double>::lowest(),
+             numeric_limits<int>::max(), numeric_limits<int>::min(), 0,
+             0, 0.0, 0.0, 0.0 };
+}
+
+NodeStats NodeStats::of(const Point& location, double price, int bedrooms, uint32_t type_code) {
+    return { price, price, bedrooms, bedrooms, uint64_t(1) << min<uint32_t>(type_code, 63),
+             1, location.x, location.y, price };
+}
+
+void NodeStats::merge(const NodeStats& other) {
+    price_min = min(price_min, other.price_min);
+    price_max = max(price_max, other.price_max);
+    bedrooms_min = min(bedrooms_min, other.bedrooms_min);
+    bedrooms_max = max(bedrooms_max, other.bedrooms_max);
+    type_mask |= other.type_mask;
+    count += other.count;
+    sum_x += other.sum_x;
+    sum_y += other.sum_y;
+    price_sum += other.price_sum;
+}
+
 // Calculate the MBR of the entire node by unioning the MBRs of all its entries
 Rectangle RTreeNode::get_mbr() const {
     if (entries.empty()) {
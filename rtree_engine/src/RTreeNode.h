@@ -1,12 +1,38 @@
 #pragma once
 
 #include "geometry.h"
+#include <cstdint>
 #include <vector>
 #include <memory> // For std::unique_ptr
 
 // Forward declaration to break circular dependency with RTree
 class RTree;
 
+// Attribute ranges and totals of everything stored below a node, used to
+// skip subtrees that cannot satisfy a filtered search and to aggregate
+// whole subtrees without visiting their entries
+struct NodeStats {
+    double price_min;
+    double price_max;
+    int bedrooms_min;
+    int bedrooms_max;
+    uint64_t type_mask; // Bit min(type_code, 63) is set for every type present
+    uint32_t count;     // Entries below the node
+    double sum_x;       // Coordinate sums, for centroids
+    double sum_y;
+    double price_sum;
+
+    // Stats that match every filter (used when attributes are unknown); the
+    // totals are zero
+    static NodeStats unknown();
+    // Identity for merge()
+    static NodeStats empty();
+    // Stats of a single entry
+    static NodeStats of(const Point& location, double price, int bedrooms, uint32_t type_code);
+
+    void merge(const NodeStats& other);
+};
+
 struct RTreeNode {
     // An entry in a node can be a pointer to a child node or data ID
     struct Entry {
@@ -19,6 +45,7 @@ struct RTreeNode {
     RTreeNode* parent = nullptr;
     bool is_leaf = false;
     std::vector<Entry> entries;
+    NodeStats stats = NodeStats::unknown(); // Aggregate over this node's subtree
 
     // --- Constructor ---
     RTreeNode(RTreeNode* p, bool leaf) : parent(p), is_leaf(leaf) {}
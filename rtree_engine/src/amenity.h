@@ -0,0 +1,15 @@
+#pragma once
+
+#include <string>
+#include "geometry.h"
+
+struct Amenity {
+    int id;
+    std::string name;
+    std::string amenity_type; // e.g., "school", "hospital", "park"
+    Point location;
+
+    Amenity(int _id, const std::string& _name, const std::string& _type, Point _loc)
+        : id(_id), name(_name), amenity_type(_type), location(_loc) {
+    }
+};
@@ -0,0 +1,22 @@
+#pragma once
+
+#include <cstdint>
+#include <string>
+#include <vector>
+#include "geometry.h"
+
+// An administrative boundary (district, county, ...); its area is the
+// union of its parts
+struct Boundary {
+    int64_t id;
+    std::string name;
+    std::string boundary_type;
+};
+
+// One polygon of a boundary, e.g. a subdivided part. Holes are further
+// rings; all rings are tested together with the even-odd rule.
+struct BoundaryPart {
+    int64_t boundary_id;
+    std::vector<std::vector<Point>> rings;
+    Rectangle bounds;
+};
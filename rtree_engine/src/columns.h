@@ -0,0 +1,88 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <string_view>
+
+// Borrowed, read-only views over Arrow-layout column buffers. The engine
+// reads values straight out of the producer's memory; the views never own
+// or copy the buffers, so they must outlive any call that uses them.
+
+enum class NumericType { Float64, Float32, Int64, Int32 };
+
+// A column view without buffers (e.g. a column missing from the input) reads
+// as all-null.
+
+struct NumericColumn {
+    const void* data = nullptr;
+    NumericType type = NumericType::Float64;
+    const uint8_t* validity = nullptr; // Arrow validity bitmap, null if no nulls
+    int64_t offset = 0;                // Arrow array offset, in elements
+
+    bool valid(size_t i) const {
+        if (data == nullptr) return false;
+        if (validity == nullptr) return true;
+        int64_t bit = offset + static_cast<int64_t>(i);
+        return (validity[bit >> 3] >> (bit & 7)) & 1;
+    }
+
+    double value(size_t i) const {
+        int64_t index = offset + static_cast<int64_t>(i);
+        switch (type) {
+        case NumericType::Float64: return static_cast<const double*>(data)[index];
+        case NumericType::Float32: return static_cast<const float*>(data)[index];
+        case NumericType::Int64: return static_cast<double>(static_cast<const int64_t*>(data)[index]);
+        case NumericType::Int32: return static_cast<const int32_t*>(data)[index];
+        }
+        return 0.0;
+    }
+
+    // Value of a nullable attribute, with nulls read as `fallback`
+    double value_or(size_t i, double fallback) const {
+        return valid(i) ? value(i) : fallback;
+    }
+};
+
+struct StringColumn {
+    const void* offsets = nullptr;     // int32 (string) or int64 (large_string) offsets
+    bool large_offsets = false;
+    const char* data = nullptr;
+    const uint8_t* validity = nullptr;
+    int64_t offset = 0;
+
+    bool valid(size_t i) const {
+        if (offsets == nullptr) return false;
+        if (validity == nullptr) return true;
+        int64_t bit = offset + static_cast<int64_t>(i);
+        return (validity[bit >> 3] >> (bit & 7)) & 1;
+    }
+
+    std::string_view value(size_t i) const {
+        if (!valid(i)) return {};
+        int64_t index = offset + static_cast<int64_t>(i);
+        int64_t start, end;
+        if (large_offsets) {
+            start = static_cast<const int64_t*>(offsets)[index];
+            end = static_cast<const int64_t*>(offsets)[index + 1];
+        }
+        else {
+            start = static_cast<const int32_t*>(offsets)[index];
+            end = static_cast<const int32_t*>(offsets)[index + 1];
+        }
+        return std::string_view(data + start, static_cast<size_t>(end - start));
+    }
+};
+
+// One record batch of property columns
+struct PropertyColumns {
+    size_t length = 0;
+    NumericColumn id;
+    NumericColumn x;
+    NumericColumn y;
+    NumericColumn price;
+    NumericColumn bedrooms;
+    NumericColumn bathrooms;
+    NumericColumn square_footage;
+    StringColumn address;
+    StringColumn property_type;
+};
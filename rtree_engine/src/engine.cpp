@@ -1,6 +1,16 @@
 #include "engine.h"
+#include "json_loader.h"
+#include <algorithm>
+#include <cctype>
+#include <cmath>
 #include <fstream>
 #include <iostream>
+#include <iterator>
+#include <limits>
+#include <map>
+#include <queue>
+#include <thread>
+#include <utility>
 #include "json.hpp" // The JSON library we just added
 
 // For convenience in this file
@@ -8,73 +18,601 @@ using namespace std;
 using json = nlohmann::json;
 
 SpatialSearchEngine::SpatialSearchEngine() {
-    // Constructor is fine
+    // Let R-tree nodes aggregate the attributes of the rows below them
+    m_rtree.set_stats_provider([this](int row) {
+        return NodeStats::of(m_properties.location(row), m_properties.price(row), m_properties.bedrooms(row),
+                             m_properties.type_code(row));
+    });
 }
 
 bool SpatialSearchEngine::load_data(const std::string& filepath) {
-    // --- THIS IS NOW IMPLEMENTED ---
-    ifstream file_stream(filepath);
+    ifstream file_stream(filepath, ios::binary);
     if (!file_stream.is_open()) {
         cerr << "Error: Could not open data file: " << filepath << endl;
         return false;
     }
 
-    json data;
-    try {
-        file_stream >> data; // Parse the entire file into a JSON object
+    // Clear any existing data
+    m_properties.clear();
+    m_rtree.clear(); // Re-initialize the R-Tree
+
+    // Stream the array through a SAX parser: each property goes straight
+    // into the store and the index, so no DOM of the whole file is built
+    PropertySaxHandler handler([this](Property&& prop) { add_property(prop); }, 2);
+    if (!json::sax_parse(file_stream, &handler)) {
+        cerr << "Error: Failed to parse JSON file. " << handler.error() << endl;
+        // Leave the engine empty rather than half loaded
+        m_properties.clear();
+        m_rtree.clear();
+        return false;
     }
-    catch (json::parse_error& e) {
-        cerr << "Error: Failed to parse JSON file. " << e.what() << endl;
+
+    if (handler.records_skipped() > 0) {
+        cerr << "Warning: Skipped " << handler.records_skipped() << " properties without an id or location" << endl;
+    }
+    cout << "Loaded " << m_properties.size() << " properties." << endl;
+    return true;
+}
+
+bool SpatialSearchEngine::load_ndjson(const std::string& filepath, unsigned int threads) {
+    ifstream file_stream(filepath, ios::binary);
+    if (!file_stream.is_open()) {
+        cerr << "Error: Could not open data file: " << filepath << endl;
         return false;
     }
 
-    cout << "Loading " << data.size() << " properties..." << endl;
+    if (threads == 0) {
+        threads = max(1u, thread::hardware_concurrency());
+    }
 
-    // Clear any existing data
     m_properties.clear();
-    m_rtree.clear(); // Re-initialize the R-Tree
+    m_rtree.clear();
 
-    for (const auto& item : data) {
-        Point loc = { item["location"]["x"], item["location"]["y"] };
+    // Read the file one block at a time so memory stays bounded by the block
+    // size plus the properties parsed from it, not by the file size
+    const size_t block_bytes = 64 * 1024 * 1024;
+    string block;
+    string carry;
+    size_t skipped = 0;
+    size_t malformed = 0;
 
-        Property prop(
-            item["id"],
-            item["address"],
-            item["price"],
-            item["bedrooms"],
-            item["bathrooms"],
-            item["square_footage"],
-            loc,
-            item["property_type"]
-        );
+    while (file_stream || !carry.empty()) {
+        block.swap(carry);
+        carry.clear();
+        size_t filled = block.size();
+        block.resize(filled + block_bytes);
+        if (file_stream) {
+            file_stream.read(&block[filled], block.size() - filled);
+            filled += static_cast<size_t>(file_stream.gcount());
+        }
+        block.resize(filled);
 
-        // Store the full property object
-        m_properties.emplace(prop.id, prop);
-        // Insert the location and ID into our spatial index
-        m_rtree.insert(loc, prop.id);
+        // Hold back a trailing partial line for the next block
+        if (file_stream) {
+            size_t last_newline = block.rfind('\n');
+            if (last_newline == string::npos) {
+                carry.swap(block);
+                continue;
+            }
+            carry.assign(block, last_newline + 1, string::npos);
+            block.resize(last_newline + 1);
+        }
+
+        // Split the block into one slice of whole lines per thread
+        vector<pair<size_t, size_t>> slices;
+        size_t slice_bytes = block.size() / threads + 1;
+        for (size_t start = 0; start < block.size();) {
+            size_t end = min(block.size(), start + slice_bytes);
+            size_t newline = block.find('\n', end == 0 ? 0 : end - 1);
+            end = newline == string::npos ? block.size() : newline + 1;
+            slices.emplace_back(start, end);
+            start = end;
+        }
+
+        vector<vector<Property>> parsed(slices.size());
+        vector<size_t> slice_skipped(slices.size(), 0);
+        vector<size_t> slice_malformed(slices.size(), 0);
+        vector<thread> workers;
+        for (size_t t = 0; t < slices.size(); ++t) {
+            workers.emplace_back([&, t]() {
+                // The record is complete before the parser sees what follows
+                // it, so a line's record is kept only once the whole line parsed
+                vector<Property> line_records;
+                PropertySaxHandler handler([&line_records](Property&& prop) { line_records.push_back(std::move(prop)); }, 1);
+                const char* cursor = block.data() + slices[t].first;
+                const char* slice_end = block.data() + slices[t].second;
+                while (cursor < slice_end) {
+                    const char* line_end = find(cursor, slice_end, '\n');
+                    // Skip blank lines (including a lone '\r' from CRLF files)
+                    if (find_if(cursor, line_end, [](char c) { return !isspace(static_cast<unsigned char>(c)); }) != line_end) {
+                        handler.reset();
+                        line_records.clear();
+                        size_t skipped_before = handler.records_skipped();
+                        if (json::sax_parse(cursor, line_end, &handler)) {
+                            move(line_records.begin(), line_records.end(), back_inserter(parsed[t]));
+                            slice_skipped[t] += handler.records_skipped() - skipped_before;
+                        }
+                        else {
+                            ++slice_malformed[t];
+                        }
+                    }
+                    cursor = line_end + 1;
+                }
+            });
+        }
+        for (auto& worker : workers) {
+            worker.join();
+        }
+
+        // The store and R-tree are single-writer: insert in file order
+        for (size_t t = 0; t < parsed.size(); ++t) {
+            for (auto& prop : parsed[t]) {
+                add_property(prop);
+            }
+            skipped += slice_skipped[t];
+            malformed += slice_malformed[t];
+        }
     }
 
-    cout << "Data loading complete." << endl;
+    if (skipped > 0) {
+        cerr << "Warning: Skipped " << skipped << " properties without an id or location" << endl;
+    }
+    if (malformed > 0) {
+        cerr << "Warning: Skipped " << malformed << " malformed lines" << endl;
+    }
+    cout << "Loaded " << m_properties.size() << " properties." << endl;
     return true;
 }
 
-// ... rest of the file is the same ...
+size_t SpatialSearchEngine::load_columns(const PropertyColumns& columns) {
+    size_t added = 0;
+    m_properties.reserve(m_properties.size() + columns.length);
+
+    for (size_t i = 0; i < columns.length; ++i) {
+        if (!columns.id.valid(i) || !columns.x.valid(i) || !columns.y.valid(i)) {
+            continue;
+        }
+
+        Point loc = { columns.x.value(i), columns.y.value(i) };
+        PropertyStore::Row row = static_cast<PropertyStore::Row>(m_properties.size());
+
+        // Strings go from the input buffers straight into the store's arena
+        bool inserted = m_properties.append(
+            static_cast<int>(columns.id.value(i)),
+            columns.address.value(i),
+            columns.price.value_or(i, 0.0),
+            static_cast<int>(columns.bedrooms.value_or(i, 0.0)),
+            columns.bathrooms.value_or(i, 0.0),
+            columns.square_footage.value_or(i, 0.0),
+            loc,
+            columns.property_type.value(i)
+        );
+        if (inserted) {
+            m_rtree.insert(loc, static_cast<int>(row));
+            ++added;
+        }
+    }
+    return added;
+}
+
 vector<Property> SpatialSearchEngine::search_properties(const Rectangle& query_box) const {
-    vector<int> property_ids = m_rtree.search(query_box);
     vector<Property> results;
-    for (int id : property_ids) {
-        auto it = m_properties.find(id);
-        if (it != m_properties.end()) {
-            results.push_back(it->second);
+    for (PropertyStore::Row row : search_rows(query_box)) {
+        results.push_back(m_properties.materialize(row));
+    }
+    return results;
+}
+
+vector<PropertyStore::Row> SpatialSearchEngine::search_rows(const Rectangle& query_box) const {
+    vector<int> hits = m_rtree.search(query_box);
+    return vector<PropertyStore::Row>(hits.begin(), hits.end());
+}
+
+template <typename Accept>
+vector<int> SpatialSearchEngine::filtered_search(const Rectangle& query_box, const PropertyFilter& filter, Accept accept) const {
+    // Resolve type names to store codes; types nobody has can never match
+    vector<bool> type_allowed;
+    uint64_t type_mask = ~uint64_t(0);
+    if (!filter.property_types.empty()) {
+        type_allowed.assign(m_properties.type_dictionary().size(), false);
+        type_mask = 0;
+        for (const auto& name : filter.property_types) {
+            int64_t code = m_properties.find_type_code(name);
+            if (code >= 0) {
+                type_allowed[code] = true;
+                type_mask |= uint64_t(1) << min<int64_t>(code, 63);
+            }
+        }
+        if (type_mask == 0) {
+            return {};
+        }
+    }
+
+    auto subtree_may_match = [&](const NodeStats& stats) {
+        return stats.price_max >= filter.price_min && stats.price_min <= filter.price_max &&
+               stats.bedrooms_max >= filter.bedrooms_min && stats.bedrooms_min <= filter.bedrooms_max &&
+               (stats.type_mask & type_mask) != 0;
+    };
+    auto row_matches = [&](int row) {
+        double price = m_properties.price(row);
+        int bedrooms = m_properties.bedrooms(row);
+        return price >= filter.price_min && price <= filter.price_max &&
+               bedrooms >= filter.bedrooms_min && bedrooms <= filter.bedrooms_max &&
+               (type_allowed.empty() || type_allowed[m_properties.type_code(row)]) &&
+               accept(row);
+    };
+    return m_rtree.search(query_box, subtree_may_match, row_matches);
+}
+
+vector<PropertyStore::Row> SpatialSearchEngine::search_rows(const Rectangle& query_box, const PropertyFilter& filter) const {
+    vector<int> hits = filtered_search(query_box, filter, [](int) { return true; });
+    return vector<PropertyStore::Row>(hits.begin(), hits.end());
+}
+
+vector<PropertyStore::Row> SpatialSearchEngine::search_polygon_rows(const vector<Point>& ring, const PropertyFilter& filter) const {
+    if (ring.size() < 3) {
+        return {};
+    }
+    vector<int> hits = filtered_search(bounds_of(ring), filter, [&](int row) {
+        return point_in_polygon(m_properties.location(row), ring);
+    });
+    return vector<PropertyStore::Row>(hits.begin(), hits.end());
+}
+
+template <typename Accept>
+vector<RankedRow> SpatialSearchEngine::ranked_search(const Rectangle& query_box, const PropertyFilter& filter,
+                                                     const TopKQuery& query, Accept accept) const {
+    if (query.limit == 0) {
+        return {};
+    }
+
+    auto sort_key = [&](PropertyStore::Row row) {
+        switch (query.order) {
+        case SortOrder::Price:
+            return m_properties.price(row);
+        case SortOrder::PricePerSqft: {
+            double sqft = m_properties.square_footage(row);
+            return sqft > 0.0 ? m_properties.price(row) / sqft : numeric_limits<double>::infinity();
+        }
+        case SortOrder::Distance:
+            return haversine_km(query.origin, m_properties.location(row));
+        }
+        return 0.0;
+    };
+    // True if (key_a, id_a) comes before (key_b, id_b) in the requested order
+    auto before = [&](double key_a, int id_a, double key_b, int id_b) {
+        if (key_a != key_b) {
+            return query.descending ? key_a > key_b : key_a < key_b;
+        }
+        return id_a < id_b;
+    };
+    auto heap_less = [&](const RankedRow& a, const RankedRow& b) {
+        return before(a.key, m_properties.id(a.row), b.key, m_properties.id(b.row));
+    };
+    // Max-heap on the requested order: the top is the last row of the page so far
+    priority_queue<RankedRow, vector<RankedRow>, decltype(heap_less)> heap(heap_less);
+
+    // Ordering by price lets the page bounds narrow the price filter, so the
+    // traversal skips subtrees before the cursor or behind the current page
+    PropertyFilter bound = filter;
+    bool prune_by_price = query.order == SortOrder::Price;
+    if (prune_by_price && query.after) {
+        if (query.descending) bound.price_max = min(bound.price_max, query.after->key);
+        else bound.price_min = max(bound.price_min, query.after->key);
+    }
+
+    filtered_search(query_box, bound, [&](int row) {
+        if (!accept(row)) {
+            return false;
         }
+        RankedRow ranked = { static_cast<PropertyStore::Row>(row), sort_key(row) };
+        int id = m_properties.id(row);
+        if (query.after && !before(query.after->key, query.after->id, ranked.key, id)) {
+            return false;
+        }
+        if (heap.size() < query.limit) {
+            heap.push(ranked);
+        }
+        else if (heap_less(ranked, heap.top())) {
+            heap.pop();
+            heap.push(ranked);
+        }
+        else {
+            return false;
+        }
+        if (prune_by_price && heap.size() == query.limit) {
+            if (query.descending) bound.price_min = max(bound.price_min, heap.top().key);
+            else bound.price_max = min(bound.price_max, heap.top().key);
+        }
+        return false; // Rows are collected in the heap, not by the traversal
+    });
+
+    vector<RankedRow> results(heap.size());
+    for (size_t i = results.size(); i-- > 0;) {
+        results[i] = heap.top();
+        heap.pop();
+    }
+    return results;
+}
+
+vector<RankedRow> SpatialSearchEngine::top_k_rows(const Rectangle& query_box, const PropertyFilter& filter,
+                                                  const TopKQuery& query) const {
+    return ranked_search(query_box, filter, query, [](int) { return true; });
+}
+
+vector<RankedRow> SpatialSearchEngine::top_k_polygon_rows(const vector<Point>& ring, const PropertyFilter& filter,
+                                                          const TopKQuery& query) const {
+    if (ring.size() < 3) {
+        return {};
+    }
+    return ranked_search(bounds_of(ring), filter, query, [&](int row) {
+        return point_in_polygon(m_properties.location(row), ring);
+    });
+}
+
+vector<Cluster> SpatialSearchEngine::clusters(const Rectangle& query_box, double cell_size) const {
+    if (!(cell_size > 0.0)) {
+        return {};
+    }
+
+    struct Cell {
+        NodeStats stats = NodeStats::empty();
+        int property_id = -1;
+    };
+    unordered_map<uint64_t, Cell> cells;
+    auto column = [&](double x) { return static_cast<int64_t>(floor((x + 180.0) / cell_size)); };
+    auto row = [&](double y) { return static_cast<int64_t>(floor((y + 90.0) / cell_size)); };
+    auto cell_key = [](int64_t cx, int64_t cy) {
+        return (static_cast<uint64_t>(cx) << 32) ^ static_cast<uint32_t>(cy);
+    };
+
+    m_rtree.aggregate(query_box,
+        [&](const Rectangle& mbr, const NodeStats& stats) {
+            // A single property descends so its ID can be reported
+            int64_t cx = column(mbr.min_point.x), cy = row(mbr.min_point.y);
+            if (stats.count < 2 || cx != column(mbr.max_point.x) || cy != row(mbr.max_point.y)) {
+                return false;
+            }
+            Cell& cell = cells[cell_key(cx, cy)];
+            cell.stats.merge(stats);
+            return true;
+        },
+        [&](int store_row) {
+            Point location = m_properties.location(store_row);
+            Cell& cell = cells[cell_key(column(location.x), row(location.y))];
+            cell.stats.merge(NodeStats::of(location, m_properties.price(store_row), m_properties.bedrooms(store_row),
+                                           m_properties.type_code(store_row)));
+            cell.property_id = cell.stats.count == 1 ? m_properties.id(store_row) : -1;
+        });
+
+    vector<Cluster> results;
+    results.reserve(cells.size());
+    for (const auto& item : cells) {
+        const NodeStats& stats = item.second.stats;
+        results.push_back({ { stats.sum_x / stats.count, stats.sum_y / stats.count }, stats.count,
+                            stats.price_min, stats.price_max, stats.price_sum / stats.count,
+                            stats.count == 1 ? item.second.property_id : -1 });
     }
+    sort(results.begin(), results.end(), [](const Cluster& a, const Cluster& b) {
+        if (a.count != b.count) return a.count > b.count;
+        if (a.centroid.x != b.centroid.x) return a.centroid.x < b.centroid.x;
+        return a.centroid.y < b.centroid.y;
+    });
     return results;
 }
 
 Property SpatialSearchEngine::get_property_by_id(int id) const {
-    auto it = m_properties.find(id);
-    if (it != m_properties.end()) {
-        return it->second;
+    int64_t row = m_properties.find_row(id);
+    if (row >= 0) {
+        return m_properties.materialize(static_cast<PropertyStore::Row>(row));
     }
     return Property(-1, "Not Found", 0.0, 0, 0.0, 0.0, { 0.0, 0.0 }, "Unknown");
 }
+
+bool SpatialSearchEngine::add_property(const Property& property) {
+    PropertyStore::Row row = static_cast<PropertyStore::Row>(m_properties.size());
+    if (!m_properties.append(property.id, property.address, property.price, property.bedrooms,
+                             property.bathrooms, property.square_footage, property.location,
+                             property.property_type)) {
+        return false;
+    }
+    m_rtree.insert(property.location, static_cast<int>(row));
+    return true;
+}
+
+bool SpatialSearchEngine::add_amenity(const Amenity& amenity) {
+    if (!m_amenities.emplace(amenity.id, amenity).second) {
+        return false;
+    }
+    m_amenity_trees[amenity.amenity_type].insert(amenity.location, amenity.id);
+    return true;
+}
+
+vector<Amenity> SpatialSearchEngine::search_amenities(const std::string& amenity_type, const Rectangle& query_box) const {
+    vector<Amenity> results;
+    auto tree = m_amenity_trees.find(amenity_type);
+    if (tree == m_amenity_trees.end()) {
+        return results;
+    }
+    for (int id : tree->second.search(query_box)) {
+        results.push_back(m_amenities.at(id));
+    }
+    return results;
+}
+
+vector<ProximityMatch> SpatialSearchEngine::properties_near_amenities(const std::string& amenity_type, double distance_km,
+                                                                     const PropertyFilter& filter, size_t limit,
+                                                                     std::optional<KeysetCursor> after) const {
+    unordered_map<int, ProximityMatch> nearest;
+    auto amenity_tree = m_amenity_trees.find(amenity_type);
+    if (amenity_tree == m_amenity_trees.end()) {
+        return {};
+    }
+
+    // Probe the property tree with the search radius of each amenity of this
+    // type, then keep the exact great-circle matches
+    const double inf = numeric_limits<double>::infinity();
+    for (int amenity_id : amenity_tree->second.search(Rectangle{ { -inf, -inf }, { inf, inf } })) {
+        const Amenity& amenity = m_amenities.at(amenity_id);
+        for (int row : filtered_search(radius_bounds(amenity.location, distance_km), filter, [](int) { return true; })) {
+            int property_id = m_properties.id(row);
+            double distance = haversine_km(amenity.location, m_properties.location(row));
+            if (distance > distance_km) {
+                continue;
+            }
+            auto it = nearest.find(property_id);
+            if (it == nearest.end()) {
+                nearest.emplace(property_id, ProximityMatch{ property_id, amenity.id, distance });
+            }
+            else if (distance < it->second.distance_km) {
+                it->second = { property_id, amenity.id, distance };
+            }
+        }
+    }
+
+    auto before = [](const ProximityMatch& a, const ProximityMatch& b) {
+        return a.distance_km < b.distance_km || (a.distance_km == b.distance_km && a.property_id < b.property_id);
+    };
+    vector<ProximityMatch> results;
+    results.reserve(nearest.size());
+    for (const auto& entry : nearest) {
+        if (!after || before(ProximityMatch{ after->id, 0, after->key }, entry.second)) {
+            results.push_back(entry.second);
+        }
+    }
+    // Only the requested page needs to be in order
+    if (limit > 0 && limit < results.size()) {
+        partial_sort(results.begin(), results.begin() + limit, results.end(), before);
+        results.resize(limit);
+    }
+    else {
+        sort(results.begin(), results.end(), before);
+    }
+    return results;
+}
+
+Amenity SpatialSearchEngine::get_amenity_by_id(int id) const {
+    auto it = m_amenities.find(id);
+    if (it != m_amenities.end()) {
+        return it->second;
+    }
+    return Amenity(-1, "Not Found", "unknown", { 0.0, 0.0 });
+}
+
+void SpatialSearchEngine::clear_amenities() {
+    m_amenities.clear();
+    m_amenity_trees.clear();
+}
+
+bool SpatialSearchEngine::add_boundary_part(int64_t boundary_id, const std::string& name,
+                                            const std::string& boundary_type, vector<vector<Point>> rings) {
+    rings.erase(remove_if(rings.begin(), rings.end(), [](const vector<Point>& ring) { return ring.size() < 3; }),
+                rings.end());
+    if (rings.empty()) {
+        return false;
+    }
+    const Boundary& boundary = m_boundaries.try_emplace(boundary_id, Boundary{ boundary_id, name, boundary_type })
+                                   .first->second;
+
+    vector<Point> points;
+    for (const auto& ring : rings) {
+        points.insert(points.end(), ring.begin(), ring.end());
+    }
+    int part_index = static_cast<int>(m_boundary_parts.size());
+    m_boundary_parts.push_back({ boundary_id, std::move(rings), bounds_of(points) });
+    m_boundary_trees[boundary.boundary_type].insert_mbr(m_boundary_parts.back().bounds, part_index);
+    return true;
+}
+
+vector<BoundaryStats> SpatialSearchEngine::boundary_stats(const std::string& boundary_type) const {
+    map<int64_t, NodeStats> totals;
+    for (const auto& item : m_boundaries) {
+        if (item.second.boundary_type == boundary_type) {
+            totals.emplace(item.first, NodeStats::empty());
+        }
+    }
+    auto parts_tree = m_boundary_trees.find(boundary_type);
+    if (parts_tree == m_boundary_trees.end()) {
+        return {};
+    }
+
+    // A property counts once, for the first part containing it in (boundary
+    // ID, part) order: the lowest boundary ID wins where boundaries overlap,
+    // as in boundary_at, and a point on an edge shared by two parts of one
+    // boundary is not counted twice
+    vector<int> order;
+    for (int part_index = 0; part_index < static_cast<int>(m_boundary_parts.size()); ++part_index) {
+        if (totals.count(m_boundary_parts[part_index].boundary_id)) {
+            order.push_back(part_index);
+        }
+    }
+    stable_sort(order.begin(), order.end(), [&](int a, int b) {
+        return m_boundary_parts[a].boundary_id < m_boundary_parts[b].boundary_id;
+    });
+    vector<int> rank(m_boundary_parts.size(), -1);
+    for (int position = 0; position < static_cast<int>(order.size()); ++position) {
+        rank[order[position]] = position;
+    }
+
+    for (int position = 0; position < static_cast<int>(order.size()); ++position) {
+        const BoundaryPart& part = m_boundary_parts[order[position]];
+        NodeStats& stats = totals.at(part.boundary_id);
+        auto earlier_part_near = [&](const Rectangle& box, const Point* point) {
+            for (int other : parts_tree->second.search(box)) {
+                if (rank[other] < position &&
+                    (point == nullptr || point_in_polygon(*point, m_boundary_parts[other].rings))) {
+                    return true;
+                }
+            }
+            return false;
+        };
+        m_rtree.aggregate(part.bounds,
+            [&](const Rectangle& mbr, const NodeStats& subtree) {
+                // Subtrees an earlier part may share are split into entries
+                if (!rectangle_in_polygon(mbr, part.rings) || earlier_part_near(mbr, nullptr)) {
+                    return false;
+                }
+                stats.merge(subtree);
+                return true;
+            },
+            [&](int row) {
+                Point location = m_properties.location(row);
+                if (point_in_polygon(location, part.rings) && !earlier_part_near({ location, location }, &location)) {
+                    stats.merge(NodeStats::of(location, m_properties.price(row), m_properties.bedrooms(row),
+                                              m_properties.type_code(row)));
+                }
+            });
+    }
+
+    vector<BoundaryStats> results;
+    results.reserve(totals.size());
+    for (const auto& item : totals) {
+        const NodeStats& stats = item.second;
+        bool any = stats.count > 0;
+        results.push_back({ item.first, m_boundaries.at(item.first).name, stats.count,
+                            any ? stats.price_min : 0.0, any ? stats.price_max : 0.0,
+                            any ? stats.price_sum / stats.count : 0.0 });
+    }
+    return results;
+}
+
+int64_t SpatialSearchEngine::boundary_at(const std::string& boundary_type, const Point& point) const {
+    auto tree = m_boundary_trees.find(boundary_type);
+    if (tree == m_boundary_trees.end()) {
+        return -1;
+    }
+    int64_t found = -1;
+    for (int part_index : tree->second.search({ point, point })) {
+        const BoundaryPart& part = m_boundary_parts[part_index];
+        if ((found < 0 || part.boundary_id < found) && point_in_polygon(point, part.rings)) {
+            found = part.boundary_id;
+        }
+    }
+    return found;
+}
+
+void SpatialSearchEngine::clear_boundaries() {
+    m_boundaries.clear();
+    m_boundary_parts.clear();
+    m_boundary_trees.clear();
+}
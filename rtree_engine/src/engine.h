@@ -2,24 +2,202 @@
 
 #include "RTree.h"
 #include "property.h"
+#include "amenity.h"
+#include "boundary.h"
+#include "columns.h"
+#include "property_store.h"
+#include <limits>
+#include <optional>
 #include <unordered_map>
 #include <string>
 #include <vector>
 
+// A property paired with its nearest amenity of the requested type
+struct ProximityMatch {
+    int property_id;
+    int amenity_id;
+    double distance_km;
+};
+
+// Attribute predicates evaluated during the R-tree traversal. Bounds are
+// inclusive; the defaults match everything.
+struct PropertyFilter {
+    double price_min = std::numeric_limits<double>::lowest();
+    double price_max = std::numeric_limits<double>::max();
+    int bedrooms_min = std::numeric_limits<int>::min();
+    int bedrooms_max = std::numeric_limits<int>::max();
+    std::vector<std::string> property_types; // Empty means any type
+};
+
+enum class SortOrder { Price, PricePerSqft, Distance };
+
+// Position in an ordered result set: the sort key and property ID of the
+// last row a client received. Pages resume strictly after it.
+struct KeysetCursor {
+    double key;
+    int id;
+};
+
+// Ordering and page size for a top-k search. Rows are ordered by key
+// (ascending unless `descending`), then by property ID.
+struct TopKQuery {
+    SortOrder order = SortOrder::Price;
+    bool descending = false;
+    Point origin = { 0.0, 0.0 }; // Reference point for SortOrder::Distance
+    size_t limit = 50;
+    std::optional<KeysetCursor> after;
+};
+
+// A store row with the value it was ordered by (kilometres for distance,
+// infinity for price per square foot without a square footage)
+struct RankedRow {
+    PropertyStore::Row row;
+    double key;
+};
+
+// Properties that share a cell of a square grid anchored at (-180, -90)
+struct Cluster {
+    Point centroid;
+    uint32_t count;
+    double price_min;
+    double price_max;
+    double price_mean;
+    int property_id; // The property of a one-property cluster; -1 otherwise
+};
+
+// Prices of the properties inside one boundary
+struct BoundaryStats {
+    int64_t boundary_id;
+    std::string name;
+    uint32_t count;
+    double price_min; // The price fields are 0 when count is 0
+    double price_max;
+    double price_mean;
+};
+
 class SpatialSearchEngine {
 public:
     SpatialSearchEngine();
 
-    // Load property data from a JSON file
+    // The R-tree reads attributes back through a pointer to this engine
+    SpatialSearchEngine(const SpatialSearchEngine&) = delete;
+    SpatialSearchEngine& operator=(const SpatialSearchEngine&) = delete;
+
+    // Load property data from a JSON array file, streaming it through a SAX
+    // parser. Replaces any loaded properties; on a parse error the engine is
+    // left empty.
     bool load_data(const std::string& filepath);
 
+    // Load property data from newline-delimited JSON (one property object per
+    // line), parsing blocks of lines on `threads` threads (0 = all cores).
+    // Malformed lines are skipped with a warning.
+    bool load_ndjson(const std::string& filepath, unsigned int threads = 0);
+
+    // Add properties from one batch of column buffers; rows with a null id or
+    // coordinate, or an already indexed id, are skipped. Returns rows added.
+    size_t load_columns(const PropertyColumns& columns);
+
     // Search for properties within a given geographical bounding box
     std::vector<Property> search_properties(const Rectangle& query_box) const;
 
+    // Rows (indexes into the property store) of the properties within a
+    // bounding box; nothing is copied
+    std::vector<PropertyStore::Row> search_rows(const Rectangle& query_box) const;
+
+    // Rows within a bounding box that also satisfy `filter`. Subtrees whose
+    // price, bedroom or type ranges cannot match are skipped.
+    std::vector<PropertyStore::Row> search_rows(const Rectangle& query_box, const PropertyFilter& filter) const;
+
+    // Rows inside a polygon ring (x = longitude, y = latitude) that satisfy `filter`
+    std::vector<PropertyStore::Row> search_polygon_rows(const std::vector<Point>& ring,
+                                                        const PropertyFilter& filter = {}) const;
+
+    // Column storage of all loaded properties
+    const PropertyStore& properties() const { return m_properties; }
+
+    // Properties within a bounding box grouped into grid cells of cell_size
+    // degrees, largest clusters first. R-tree subtrees that fall inside one
+    // cell are counted from their node aggregates without visiting their
+    // entries.
+    std::vector<Cluster> clusters(const Rectangle& query_box, double cell_size) const;
+
     // Retrieve a property by its ID
     Property get_property_by_id(int id) const;
 
+    // Add a single property; returns false if the ID is already indexed
+    bool add_property(const Property& property);
+
+    // Add an amenity to the R-tree of its amenity_type; returns false if the ID is already indexed
+    bool add_amenity(const Amenity& amenity);
+
+    // Search for amenities of one type within a bounding box
+    std::vector<Amenity> search_amenities(const std::string& amenity_type, const Rectangle& query_box) const;
+
+    // The first `query.limit` rows within a bounding box that match `filter`,
+    // in query order. Only the current top rows are kept during the traversal;
+    // for price order, subtrees priced out of the page are skipped.
+    std::vector<RankedRow> top_k_rows(const Rectangle& query_box, const PropertyFilter& filter,
+                                      const TopKQuery& query) const;
+
+    // As top_k_rows, for the properties inside a polygon ring
+    std::vector<RankedRow> top_k_polygon_rows(const std::vector<Point>& ring, const PropertyFilter& filter,
+                                              const TopKQuery& query) const;
+
+    // Every property within distance_km of an amenity of the given type, with its
+    // nearest such amenity, ordered by distance then property ID. Only properties
+    // matching `filter` are considered; `limit` (0 = no limit) and `after` page
+    // through the ordered matches.
+    std::vector<ProximityMatch> properties_near_amenities(const std::string& amenity_type, double distance_km,
+                                                          const PropertyFilter& filter = {}, size_t limit = 0,
+                                                          std::optional<KeysetCursor> after = std::nullopt) const;
+
+    // Retrieve an amenity by its ID
+    Amenity get_amenity_by_id(int id) const;
+
+    // Add one part of an administrative boundary, given as rings (holes
+    // included). Parts with the same boundary_id make up one area. Returns
+    // false if no ring has at least three points.
+    bool add_boundary_part(int64_t boundary_id, const std::string& name, const std::string& boundary_type,
+                           std::vector<std::vector<Point>> rings);
+
+    // Property count and prices inside every boundary of a type, ordered by
+    // boundary ID. Each property counts once, for the boundary boundary_at
+    // returns (the lowest ID where boundaries overlap). Each part probes the
+    // property tree with its bounding box; subtrees that lie inside the part
+    // and clear of overlapping parts are taken from their node aggregates,
+    // and only the other entries get point-in-polygon tests.
+    std::vector<BoundaryStats> boundary_stats(const std::string& boundary_type) const;
+
+    // ID of the boundary of a type containing a point (the lowest ID if
+    // boundaries overlap), or -1
+    int64_t boundary_at(const std::string& boundary_type, const Point& point) const;
+
+    size_t property_count() const { return m_properties.size(); }
+    size_t amenity_count() const { return m_amenities.size(); }
+    size_t boundary_count() const { return m_boundaries.size(); }
+
+    // Remove all amenities and their indexes
+    void clear_amenities();
+
+    // Remove all boundaries and their indexes
+    void clear_boundaries();
+
 private:
-    RTree m_rtree;
-    std::unordered_map<int, Property> m_properties; // Stores all property data by ID
+    // Filtered traversal shared by the box, polygon and proximity searches;
+    // `accept` is applied to rows that pass the filter
+    template <typename Accept>
+    std::vector<int> filtered_search(const Rectangle& query_box, const PropertyFilter& filter, Accept accept) const;
+
+    // Bounded-heap top-k over filtered_search
+    template <typename Accept>
+    std::vector<RankedRow> ranked_search(const Rectangle& query_box, const PropertyFilter& filter,
+                                         const TopKQuery& query, Accept accept) const;
+
+    RTree m_rtree; // Indexes property store rows
+    PropertyStore m_properties; // Stores all property data, one dense row per property
+    std::unordered_map<std::string, RTree> m_amenity_trees; // One spatial index per amenity_type
+    std::unordered_map<int, Amenity> m_amenities; // Stores all amenity data by ID
+    std::unordered_map<int64_t, Boundary> m_boundaries;
+    std::vector<BoundaryPart> m_boundary_parts;
+    std::unordered_map<std::string, RTree> m_boundary_trees; // Part bounds by index, one tree per boundary_type
 };
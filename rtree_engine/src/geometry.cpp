@@ -1,6 +1,14 @@
 #include "geometry.h"
 #include <algorithm> // For std::min and std::max
+#include <cmath>
 using namespace std;
+
+namespace {
+    const double PI = 3.14159265358979323846;
+    const double EARTH_RADIUS_KM = 6371.0088;
+    const double DEG_TO_RAD = PI / 180.0;
+}
+
 double Rectangle::area() const {
     return (max_point.x - min_point.x) * (max_point.y - min_point.y);
 }
@@ -17,6 +25,11 @@ bool Rectangle::intersects(const Rectangle& other) const {
     return true;
 }
 
+bool Rectangle::contains(const Rectangle& other) const {
+    return other.min_point.x >= min_point.x && other.max_point.x <= max_point.x &&
+           other.min_point.y >= min_point.y && other.max_point.y <= max_point.y;
+}
+
 double Rectangle::enlargement(const Rectangle& other) const {
     // Calculate the MBR of this rectangle and the other one combined
     double combined_min_x = min(min_point.x, other.min_point.x);
@@ -29,3 +42,96 @@ double Rectangle::enlargement(const Rectangle& other) const {
     // The enlargement is the new area minus the original area
     return combined_area - this->area();
 }
+
+double haversine_km(const Point& a, const Point& b) {
+    double d_lat = (b.y - a.y) * DEG_TO_RAD;
+    double d_lng = (b.x - a.x) * DEG_TO_RAD;
+    double h = sin(d_lat / 2) * sin(d_lat / 2) +
+               cos(a.y * DEG_TO_RAD) * cos(b.y * DEG_TO_RAD) * sin(d_lng / 2) * sin(d_lng / 2);
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(h)));
+}
+
+Rectangle radius_bounds(const Point& center, double radius_km) {
+    double angular_radius = radius_km / EARTH_RADIUS_KM;
+    double d_lat = angular_radius / DEG_TO_RAD;
+
+    // Widest longitude span of the circle on the sphere; it wraps the whole
+    // globe once the circle reaches a pole
+    double ratio = sin(min(angular_radius, PI / 2)) / cos(center.y * DEG_TO_RAD);
+    double d_lng = ratio >= 1.0 ? 180.0 : asin(ratio) / DEG_TO_RAD;
+    return { { center.x - d_lng, center.y - d_lat }, { center.x + d_lng, center.y + d_lat } };
+}
+
+Rectangle bounds_of(const std::vector<Point>& points) {
+    Rectangle box = { { 0.0, 0.0 }, { 0.0, 0.0 } };
+    if (points.empty()) {
+        return box;
+    }
+    box = { points[0], points[0] };
+    for (const Point& p : points) {
+        box.min_point.x = min(box.min_point.x, p.x);
+        box.min_point.y = min(box.min_point.y, p.y);
+        box.max_point.x = max(box.max_point.x, p.x);
+        box.max_point.y = max(box.max_point.y, p.y);
+    }
+    return box;
+}
+
+bool point_in_polygon(const Point& point, const std::vector<Point>& ring) {
+    // Count crossings of a ray cast from the point towards +x
+    bool inside = false;
+    size_t n = ring.size();
+    for (size_t i = 0, j = n - 1; i < n; j = i++) {
+        const Point& a = ring[i];
+        const Point& b = ring[j];
+        if ((a.y > point.y) != (b.y > point.y) &&
+            point.x < (b.x - a.x) * (point.y - a.y) / (b.y - a.y) + a.x) {
+            inside = !inside;
+        }
+    }
+    return inside;
+}
+
+bool point_in_polygon(const Point& point, const std::vector<std::vector<Point>>& rings) {
+    bool inside = false;
+    for (const auto& ring : rings) {
+        inside ^= point_in_polygon(point, ring);
+    }
+    return inside;
+}
+
+// Liang-Barsky clip of segment ab against the box; touching counts
+static bool segment_intersects(const Rectangle& box, const Point& a, const Point& b) {
+    double t_enter = 0.0, t_exit = 1.0;
+    // Keeps the part of the segment where p * t <= q
+    auto clip = [&](double p, double q) {
+        if (p == 0.0) return q >= 0.0;
+        double t = q / p;
+        if (p < 0.0) {
+            if (t > t_exit) return false;
+            t_enter = max(t_enter, t);
+        }
+        else {
+            if (t < t_enter) return false;
+            t_exit = min(t_exit, t);
+        }
+        return true;
+    };
+    double dx = b.x - a.x, dy = b.y - a.y;
+    return clip(-dx, a.x - box.min_point.x) && clip(dx, box.max_point.x - a.x) &&
+           clip(-dy, a.y - box.min_point.y) && clip(dy, box.max_point.y - a.y);
+}
+
+bool rectangle_in_polygon(const Rectangle& box, const std::vector<std::vector<Point>>& rings) {
+    // With no edge crossing or touching it, the whole box is on one side of
+    // the boundary, so testing one corner decides
+    for (const auto& ring : rings) {
+        size_t n = ring.size();
+        for (size_t i = 0, j = n - 1; i < n; j = i++) {
+            if (segment_intersects(box, ring[j], ring[i])) {
+                return false;
+            }
+        }
+    }
+    return point_in_polygon(box.min_point, rings);
+}
@@ -1,5 +1,7 @@
 #pragma once // Prevents the file from being included multiple times
 
+#include <vector>
+
 struct Point {
     double x, y;
 };
@@ -14,6 +16,29 @@ struct Rectangle {
     // Check if this rectangle intersects with another one
     bool intersects(const Rectangle& other) const;
 
+    // Check if another rectangle lies entirely inside this one
+    bool contains(const Rectangle& other) const;
+
     // Calculate how much this rectangle would have to grow to include another one
     double enlargement(const Rectangle& other) const;
 };
+
+// Great-circle distance in kilometres between two (x = longitude, y = latitude) points
+double haversine_km(const Point& a, const Point& b);
+
+// Bounding box of all points within radius_km of center (x = longitude, y = latitude)
+Rectangle radius_bounds(const Point& center, double radius_km);
+
+// Bounding box of a set of points (e.g. a polygon ring)
+Rectangle bounds_of(const std::vector<Point>& points);
+
+// Even-odd test of a point against a polygon ring (closed or not)
+bool point_in_polygon(const Point& point, const std::vector<Point>& ring);
+
+// Even-odd test against several rings at once: a polygon with holes, or
+// every ring of a multipolygon
+bool point_in_polygon(const Point& point, const std::vector<std::vector<Point>>& rings);
+
+// Check that a rectangle lies entirely inside the area enclosed by rings
+// (even-odd); a rectangle touching any edge does not count
+bool rectangle_in_polygon(const Rectangle& box, const std::vector<std::vector<Point>>& rings);
@@ -0,0 +1,116 @@
+#include "json_loader.h"
+#include <utility>
+
+using namespace std;
+
+namespace {
+    Property empty_property() {
+        return Property(-1, "", 0.0, 0, 0.0, 0.0, { 0.0, 0.0 }, "");
+    }
+}
+
+PropertySaxHandler::PropertySaxHandler(PropertyCallback on_property, int record_depth)
+    : m_on_property(std::move(on_property)), m_record_depth(record_depth), m_current(empty_property()) {
+}
+
+void PropertySaxHandler::reset() {
+    m_depth = 0;
+    m_in_location = false;
+    m_key.clear();
+}
+
+// Only scalar values directly inside a record (or its "location" object)
+// are read; anything nested deeper is ignored
+void PropertySaxHandler::number(double val) {
+    if (m_in_location && m_depth == m_record_depth + 1) {
+        if (m_key == "x") { m_current.location.x = val; m_has_x = true; }
+        else if (m_key == "y") { m_current.location.y = val; m_has_y = true; }
+        return;
+    }
+    if (m_depth != m_record_depth) return;
+
+    if (m_key == "id") { m_current.id = static_cast<int>(val); m_has_id = true; }
+    else if (m_key == "price") m_current.price = val;
+    else if (m_key == "bedrooms") m_current.bedrooms = static_cast<int>(val);
+    else if (m_key == "bathrooms") m_current.bathrooms = val;
+    else if (m_key == "square_footage") m_current.square_footage = val;
+}
+
+bool PropertySaxHandler::null() { return true; }
+
+bool PropertySaxHandler::boolean(bool) { return true; }
+
+bool PropertySaxHandler::number_integer(number_integer_t val) {
+    number(static_cast<double>(val));
+    return true;
+}
+
+bool PropertySaxHandler::number_unsigned(number_unsigned_t val) {
+    number(static_cast<double>(val));
+    return true;
+}
+
+bool PropertySaxHandler::number_float(number_float_t val, const string_t&) {
+    number(val);
+    return true;
+}
+
+bool PropertySaxHandler::string(string_t& val) {
+    if (m_depth != m_record_depth) return true;
+
+    // Move the parser's buffer into the record instead of copying it
+    if (m_key == "address") m_current.address = std::move(val);
+    else if (m_key == "property_type") m_current.property_type = std::move(val);
+    return true;
+}
+
+bool PropertySaxHandler::binary(binary_t&) { return true; }
+
+bool PropertySaxHandler::start_object(std::size_t) {
+    ++m_depth;
+    if (m_depth == m_record_depth) {
+        m_current = empty_property();
+        m_has_id = m_has_x = m_has_y = false;
+    }
+    else if (m_depth == m_record_depth + 1 && m_key == "location") {
+        m_in_location = true;
+    }
+    return true;
+}
+
+bool PropertySaxHandler::key(string_t& val) {
+    m_key = std::move(val);
+    return true;
+}
+
+bool PropertySaxHandler::end_object() {
+    if (m_depth == m_record_depth) {
+        if (m_has_id && m_has_x && m_has_y) {
+            m_on_property(std::move(m_current));
+        }
+        else {
+            ++m_skipped;
+        }
+    }
+    else if (m_depth == m_record_depth + 1) {
+        m_in_location = false;
+    }
+    --m_depth;
+    m_key.clear();
+    return true;
+}
+
+bool PropertySaxHandler::start_array(std::size_t) {
+    ++m_depth;
+    return true;
+}
+
+bool PropertySaxHandler::end_array() {
+    --m_depth;
+    return true;
+}
+
+bool PropertySaxHandler::parse_error(std::size_t, const std::string&, const nlohmann::detail::exception& ex) {
+    m_error = ex.what();
+    return false;
+}
@@ -0,0 +1,57 @@
+#pragma once
+
+#include "property.h"
+#include "json.hpp"
+#include <functional>
+#include <string>
+
+// SAX handler that turns a stream of JSON events into Property records
+// without building a DOM. Records are objects found at `record_depth`:
+// 2 for a top-level array of properties, 1 for a single object (one line of
+// newline-delimited JSON). Each complete record is handed to `on_property`;
+// records missing an id or a location are counted and skipped.
+class PropertySaxHandler : public nlohmann::json_sax<nlohmann::json> {
+public:
+    using PropertyCallback = std::function<void(Property&&)>;
+
+    PropertySaxHandler(PropertyCallback on_property, int record_depth);
+
+    bool null() override;
+    bool boolean(bool val) override;
+    bool number_integer(number_integer_t val) override;
+    bool number_unsigned(number_unsigned_t val) override;
+    bool number_float(number_float_t val, const string_t& s) override;
+    bool string(string_t& val) override;
+    bool binary(binary_t& val) override;
+    bool start_object(std::size_t elements) override;
+    bool key(string_t& val) override;
+    bool end_object() override;
+    bool start_array(std::size_t elements) override;
+    bool end_array() override;
+    bool parse_error(std::size_t position, const std::string& last_token,
+                     const nlohmann::detail::exception& ex) override;
+
+    // Forget any partially parsed record, e.g. before parsing the next line
+    void reset();
+
+    size_t records_skipped() const { return m_skipped; }
+    const std::string& error() const { return m_error; }
+
+private:
+    void number(double val);
+
+    PropertyCallback m_on_property;
+    int m_record_depth;
+    int m_depth = 0;
+    bool m_in_location = false;
+    std::string m_key;
+
+    // Fields of the record being parsed
+    Property m_current;
+    bool m_has_id = false;
+    bool m_has_x = false;
+    bool m_has_y = false;
+
+    size_t m_skipped = 0;
+    std::string m_error;
+};
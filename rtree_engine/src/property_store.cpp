@@ -0,0 +1,88 @@
+#include "property_store.h"
+
+using namespace std;
+
+bool PropertyStore::append(int id, string_view address, double price, int bedrooms, double bathrooms,
+                           double square_footage, Point location, string_view property_type) {
+    if (!m_row_by_id.emplace(id, static_cast<Row>(m_ids.size())).second) {
+        return false;
+    }
+
+    m_ids.push_back(id);
+    m_xs.push_back(location.x);
+    m_ys.push_back(location.y);
+    m_prices.push_back(price);
+    m_bedrooms.push_back(bedrooms);
+    m_bathrooms.push_back(bathrooms);
+    m_square_footage.push_back(square_footage);
+    m_type_codes.push_back(encode_type(property_type));
+    m_address_arena.append(address);
+    m_address_offsets.push_back(m_address_arena.size());
+    return true;
+}
+
+int64_t PropertyStore::find_row(int id) const {
+    auto it = m_row_by_id.find(id);
+    return it == m_row_by_id.end() ? -1 : static_cast<int64_t>(it->second);
+}
+
+void PropertyStore::reserve(size_t rows) {
+    m_ids.reserve(rows);
+    m_xs.reserve(rows);
+    m_ys.reserve(rows);
+    m_prices.reserve(rows);
+    m_bedrooms.reserve(rows);
+    m_bathrooms.reserve(rows);
+    m_square_footage.reserve(rows);
+    m_type_codes.reserve(rows);
+    m_address_offsets.reserve(rows + 1);
+    m_row_by_id.reserve(rows);
+}
+
+void PropertyStore::clear() {
+    // Swap with empty containers so the memory is actually released
+    *this = PropertyStore();
+}
+
+string_view PropertyStore::address(Row row) const {
+    return string_view(m_address_arena).substr(
+        m_address_offsets[row], m_address_offsets[row + 1] - m_address_offsets[row]);
+}
+
+Property PropertyStore::materialize(Row row) const {
+    return Property(id(row), string(address(row)), price(row), bedrooms(row), bathrooms(row),
+                    square_footage(row), location(row), property_type(row));
+}
+
+int64_t PropertyStore::find_type_code(string_view property_type) const {
+    auto it = m_type_lookup.find(string(property_type));
+    return it == m_type_lookup.end() ? -1 : static_cast<int64_t>(it->second);
+}
+
+size_t PropertyStore::memory_usage() const {
+    size_t bytes = m_ids.capacity() * sizeof(int) + m_bedrooms.capacity() * sizeof(int) +
+                   (m_xs.capacity() + m_ys.capacity() + m_prices.capacity() +
+                    m_bathrooms.capacity() + m_square_footage.capacity()) * sizeof(double) +
+                   m_type_codes.capacity() * sizeof(TypeCode) +
+                   m_address_arena.capacity() + m_address_offsets.capacity() * sizeof(uint64_t);
+    // Rough per-node cost of the id index
+    bytes += m_row_by_id.size() * (sizeof(int) + sizeof(Row) + 2 * sizeof(void*));
+    return bytes;
+}
+
+PropertyStore::TypeCode PropertyStore::encode_type(string_view property_type) {
+    // Loads are usually sorted or clustered by type: try the previous code first
+    if (!m_type_codes.empty() && m_type_dictionary[m_type_codes.back()] == property_type) {
+        return m_type_codes.back();
+    }
+
+    string key(property_type);
+    auto it = m_type_lookup.find(key);
+    if (it != m_type_lookup.end()) {
+        return it->second;
+    }
+    TypeCode code = static_cast<TypeCode>(m_type_dictionary.size());
+    m_type_dictionary.push_back(key);
+    m_type_lookup.emplace(std::move(key), code);
+    return code;
+}
@@ -0,0 +1,80 @@
+#pragma once
+
+#include "geometry.h"
+#include "property.h"
+#include <cstdint>
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <vector>
+
+// Structure-of-arrays storage for properties. Every property occupies one
+// dense row; each attribute lives in its own contiguous column so filters
+// and aggregates scan plain arrays. property_type is dictionary-encoded and
+// addresses are packed end to end in a single arena.
+class PropertyStore {
+public:
+    using Row = uint32_t;
+    using TypeCode = uint32_t;
+
+    // Append a property; returns false (and stores nothing) if the ID exists
+    bool append(int id, std::string_view address, double price, int bedrooms, double bathrooms,
+                double square_footage, Point location, std::string_view property_type);
+
+    // Row of a property ID, or -1 if it is not stored
+    int64_t find_row(int id) const;
+
+    size_t size() const { return m_ids.size(); }
+    void reserve(size_t rows);
+    void clear();
+
+    int id(Row row) const { return m_ids[row]; }
+    Point location(Row row) const { return { m_xs[row], m_ys[row] }; }
+    double price(Row row) const { return m_prices[row]; }
+    int bedrooms(Row row) const { return m_bedrooms[row]; }
+    double bathrooms(Row row) const { return m_bathrooms[row]; }
+    double square_footage(Row row) const { return m_square_footage[row]; }
+    std::string_view address(Row row) const;
+    TypeCode type_code(Row row) const { return m_type_codes[row]; }
+    const std::string& property_type(Row row) const { return m_type_dictionary[m_type_codes[row]]; }
+
+    // Build a standalone Property from a row
+    Property materialize(Row row) const;
+
+    // Whole columns, indexed by row
+    const std::vector<int>& ids() const { return m_ids; }
+    const std::vector<double>& xs() const { return m_xs; }
+    const std::vector<double>& ys() const { return m_ys; }
+    const std::vector<double>& prices() const { return m_prices; }
+    const std::vector<int>& bedrooms() const { return m_bedrooms; }
+    const std::vector<double>& bathrooms() const { return m_bathrooms; }
+    const std::vector<double>& square_footage() const { return m_square_footage; }
+    const std::vector<TypeCode>& type_codes() const { return m_type_codes; }
+    const std::vector<std::string>& type_dictionary() const { return m_type_dictionary; }
+
+    // Code of a property_type, or -1 if no stored property has it
+    int64_t find_type_code(std::string_view property_type) const;
+
+    // Approximate heap bytes held by the columns
+    size_t memory_usage() const;
+
+private:
+    TypeCode encode_type(std::string_view property_type);
+
+    std::vector<int> m_ids;
+    std::vector<double> m_xs;
+    std::vector<double> m_ys;
+    std::vector<double> m_prices;
+    std::vector<int> m_bedrooms;
+    std::vector<double> m_bathrooms;
+    std::vector<double> m_square_footage;
+    std::vector<TypeCode> m_type_codes;
+
+    // Address of row r is m_address_arena[m_address_offsets[r], m_address_offsets[r + 1])
+    std::string m_address_arena;
+    std::vector<uint64_t> m_address_offsets = { 0 };
+
+    std::vector<std::string> m_type_dictionary;
+    std::unordered_map<std::string, TypeCode> m_type_lookup;
+    std::unordered_map<int, Row> m_row_by_id;
+};
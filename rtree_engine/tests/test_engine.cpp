@@ -0,0 +1,397 @@
+#include <gtest/gtest.h>
+#include "../src/engine.h"
+#include <algorithm>
+#include <cmath>
+#include <fstream>
+#include <map>
+
+namespace {
+    Property make_property(int id, double x, double y) {
+        return Property(id, std::to_string(id) + " Main St", 100000.0 * id, 3, 2.0, 1500.0, { x, y }, "House");
+    }
+}
+
+TEST(EngineTest, AmenitiesAreIndexedPerType) {
+    SpatialSearchEngine engine;
+    EXPECT_TRUE(engine.add_amenity(Amenity(1, "Central School", "school", { -74.00, 40.70 })));
+    EXPECT_TRUE(engine.add_amenity(Amenity(2, "City Park", "park", { -74.00, 40.70 })));
+    EXPECT_FALSE(engine.add_amenity(Amenity(1, "Duplicate", "school", { 0.0, 0.0 })));
+
+    Rectangle area = { { -74.1, 40.6 }, { -73.9, 40.8 } };
+    auto schools = engine.search_amenities("school", area);
+    ASSERT_EQ(schools.size(), 1u);
+    EXPECT_EQ(schools[0].name, "Central School");
+    EXPECT_TRUE(engine.search_amenities("hospital", area).empty());
+}
+
+TEST(EngineTest, PropertiesNearAmenitiesKeepsNearestWithinDistance) {
+    SpatialSearchEngine engine;
+    engine.add_property(make_property(1, -74.000, 40.700));
+    engine.add_property(make_property(2, -74.010, 40.700)); // ~0.84 km west
+    engine.add_property(make_property(3, -74.100, 40.700)); // ~8.4 km west
+    engine.add_amenity(Amenity(10, "Near School", "school", { -74.001, 40.700 }));
+    engine.add_amenity(Amenity(11, "Other School", "school", { -74.012, 40.700 }));
+    engine.add_amenity(Amenity(12, "Park", "park", { -74.100, 40.700 }));
+
+    auto matches = engine.properties_near_amenities("school", 1.0);
+    ASSERT_EQ(matches.size(), 2u);
+    EXPECT_EQ(matches[0].property_id, 1);
+    EXPECT_EQ(matches[0].amenity_id, 10);
+    EXPECT_EQ(matches[1].property_id, 2);
+    EXPECT_EQ(matches[1].amenity_id, 11);
+    EXPECT_LE(matches[1].distance_km, 1.0);
+    EXPECT_TRUE(engine.properties_near_amenities("hospital", 1.0).empty());
+}
+
+TEST(EngineTest, LoadColumnsReadsBuffersInPlace) {
+    std::vector<int64_t> ids = { 1, 2, 3 };
+    std::vector<double> xs = { -74.0, -74.1, -74.2 };
+    std::vector<double> ys = { 40.7, 40.8, 40.9 };
+    std::vector<int32_t> bedrooms = { 2, 3, 4 };
+    uint8_t y_validity = 0b011; // third latitude is null
+    std::vector<int32_t> offsets = { 0, 1, 3, 3 };
+    std::string addresses = "a" "bc";
+
+    PropertyColumns columns;
+    columns.length = 3;
+    columns.id = { ids.data(), NumericType::Int64 };
+    columns.x = { xs.data(), NumericType::Float64 };
+    columns.y = { ys.data(), NumericType::Float64, &y_validity };
+    columns.bedrooms = { bedrooms.data(), NumericType::Int32 };
+    columns.address.offsets = offsets.data();
+    columns.address.data = addresses.data();
+
+    SpatialSearchEngine engine;
+    EXPECT_EQ(engine.load_columns(columns), 2u);
+    EXPECT_EQ(engine.load_columns(columns), 0u); // already indexed
+
+    Property second = engine.get_property_by_id(2);
+    EXPECT_EQ(second.address, "bc");
+    EXPECT_EQ(second.bedrooms, 3);
+    EXPECT_DOUBLE_EQ(second.price, 0.0); // missing column reads as null
+    EXPECT_EQ(engine.get_property_by_id(3).id, -1);
+}
+
+namespace {
+    std::string write_temp_file(const std::string& name, const std::string& contents) {
+        std::string path = ::testing::TempDir() + name;
+        std::ofstream(path) << contents;
+        return path;
+    }
+}
+
+TEST(EngineTest, LoadDataStreamsJsonArray) {
+    std::string path = write_temp_file("properties.json", R"([
+        {"id": 1, "address": "1 Main St", "price": 500000, "bedrooms": 3, "bathrooms": 2.5,
+         "square_footage": 1500, "location": {"x": -74.0, "y": 40.7}, "property_type": "House",
+         "tags": ["garden", {"id": 99}]},
+        {"id": 2, "address": "No location"},
+        {"id": 3, "location": {"x": -122.4, "y": 37.8}}
+    ])");
+
+    SpatialSearchEngine engine;
+    ASSERT_TRUE(engine.load_data(path));
+    EXPECT_EQ(engine.property_count(), 2u);
+
+    Property first = engine.get_property_by_id(1);
+    EXPECT_EQ(first.address, "1 Main St");
+    EXPECT_DOUBLE_EQ(first.bathrooms, 2.5);
+    EXPECT_EQ(first.property_type, "House");
+    EXPECT_EQ(engine.search_properties({ { -123.0, 37.0 }, { -122.0, 38.0 } }).size(), 1u);
+
+    std::string broken = write_temp_file("broken.json", R"([{"id": 1, "location": {"x": 1, "y": 2}}, {"id": )");
+    EXPECT_FALSE(engine.load_data(broken));
+    EXPECT_EQ(engine.property_count(), 0u);
+}
+
+TEST(EngineTest, LoadNdjsonParsesLinesOnThreads) {
+    std::string contents;
+    for (int i = 0; i < 1000; ++i) {
+        contents += "{\"id\": " + std::to_string(i) + ", \"address\": \"" + std::to_string(i) +
+                    " Main St\", \"location\": {\"x\": " + std::to_string(i % 100) + ", \"y\": " +
+                    std::to_string(i / 100) + "}}\n";
+        if (i == 500) contents += "{not json\n\n{\"id\": 5000, \"location\": {\"x\": 1, \"y\": 1}} trailing\n";
+    }
+    std::string path = write_temp_file("properties.ndjson", contents);
+
+    SpatialSearchEngine engine;
+    ASSERT_TRUE(engine.load_ndjson(path, 4));
+    EXPECT_EQ(engine.property_count(), 1000u);
+    EXPECT_EQ(engine.get_property_by_id(999).address, "999 Main St");
+    EXPECT_EQ(engine.get_property_by_id(5000).id, -1); // Valid record followed by garbage
+    EXPECT_EQ(engine.search_properties({ { -1.0, -1.0 }, { 9.5, 0.5 } }).size(), 10u);
+}
+
+TEST(PropertyStoreTest, StoresColumnsByDenseRow) {
+    PropertyStore store;
+    EXPECT_TRUE(store.append(10, "1 Main St", 100000.0, 2, 1.0, 900.0, { -74.0, 40.7 }, "Condo"));
+    EXPECT_TRUE(store.append(20, "", 200000.0, 3, 2.0, 1200.0, { -74.1, 40.8 }, "House"));
+    EXPECT_TRUE(store.append(30, "3 Main St", 300000.0, 4, 3.0, 2000.0, { -74.2, 40.9 }, "Condo"));
+    EXPECT_FALSE(store.append(20, "Duplicate", 1.0, 1, 1.0, 1.0, { 0.0, 0.0 }, "House"));
+
+    ASSERT_EQ(store.size(), 3u);
+    EXPECT_EQ(store.find_row(30), 2);
+    EXPECT_EQ(store.find_row(40), -1);
+    EXPECT_EQ(store.address(0), "1 Main St");
+    EXPECT_EQ(store.address(1), "");
+    EXPECT_EQ(store.address(2), "3 Main St");
+
+    // property_type is dictionary-encoded
+    EXPECT_EQ(store.type_dictionary().size(), 2u);
+    EXPECT_EQ(store.type_code(0), store.type_code(2));
+    EXPECT_EQ(store.property_type(1), "House");
+    EXPECT_EQ(store.find_type_code("Condo"), store.type_code(0));
+    EXPECT_EQ(store.find_type_code("Castle"), -1);
+
+    Property third = store.materialize(2);
+    EXPECT_EQ(third.id, 30);
+    EXPECT_EQ(third.bedrooms, 4);
+    EXPECT_DOUBLE_EQ(third.location.y, 40.9);
+}
+
+TEST(EngineTest, SearchRowsReturnsStoreRows) {
+    SpatialSearchEngine engine;
+    engine.add_property(make_property(7, -74.0, 40.7));
+    engine.add_property(make_property(8, -122.4, 37.8));
+
+    auto rows = engine.search_rows({ { -123.0, 37.0 }, { -122.0, 38.0 } });
+    ASSERT_EQ(rows.size(), 1u);
+    EXPECT_EQ(engine.properties().id(rows[0]), 8);
+    EXPECT_EQ(engine.properties().address(rows[0]), "8 Main St");
+}
+
+TEST(EngineTest, FilteredSearchMatchesLateFiltering) {
+    SpatialSearchEngine engine;
+    const char* types[] = { "House", "Condo", "Townhouse" };
+    for (int i = 0; i < 2000; ++i) {
+        engine.add_property(Property(i, "addr", 50000.0 + (i * 7919 % 1000) * 1000.0, i % 6, 1.0, 1000.0,
+                                     { (i % 50) * 0.01, (i / 50) * 0.01 }, types[i % 3]));
+    }
+
+    Rectangle box = { { 0.1, 0.1 }, { 0.35, 0.3 } };
+    PropertyFilter filter;
+    filter.price_max = 300000.0;
+    filter.bedrooms_min = 3;
+    filter.property_types = { "Condo", "Castle" };
+
+    std::vector<PropertyStore::Row> expected;
+    const PropertyStore& store = engine.properties();
+    for (PropertyStore::Row row : engine.search_rows(box)) {
+        if (store.price(row) <= 300000.0 && store.bedrooms(row) >= 3 && store.property_type(row) == "Condo") {
+            expected.push_back(row);
+        }
+    }
+    auto filtered = engine.search_rows(box, filter);
+    std::sort(expected.begin(), expected.end());
+    std::sort(filtered.begin(), filtered.end());
+    EXPECT_FALSE(expected.empty());
+    EXPECT_EQ(filtered, expected);
+
+    filter.property_types = { "Castle" };
+    EXPECT_TRUE(engine.search_rows(box, filter).empty());
+}
+
+TEST(EngineTest, PolygonSearchAppliesFilter) {
+    SpatialSearchEngine engine;
+    engine.add_property(make_property(1, 0.5, 0.5));
+    engine.add_property(make_property(2, 1.5, 1.5)); // Bounding box only
+    engine.add_property(make_property(3, 0.5, 1.5));
+
+    std::vector<Point> ring = { { 0, 0 }, { 2, 0 }, { 2, 1 }, { 1, 1 }, { 1, 2 }, { 0, 2 } };
+    EXPECT_EQ(engine.search_polygon_rows(ring).size(), 2u);
+
+    PropertyFilter filter;
+    filter.price_min = 200000.0;
+    auto rows = engine.search_polygon_rows(ring, filter);
+    ASSERT_EQ(rows.size(), 1u);
+    EXPECT_EQ(engine.properties().id(rows[0]), 3);
+}
+
+TEST(EngineTest, TopKPagesMatchFullSort) {
+    SpatialSearchEngine engine;
+    for (int i = 0; i < 3000; ++i) {
+        // Repeated prices exercise the property ID tie-break
+        engine.add_property(Property(i, "addr", 1000.0 * (i * 7919 % 500), 2, 1.0, 500.0 + i % 7 * 100.0,
+                                     { (i % 60) * 0.01, (i / 60) * 0.01 }, "House"));
+    }
+    Rectangle box = { { 0.05, 0.05 }, { 0.4, 0.3 } };
+    const PropertyStore& store = engine.properties();
+
+    for (SortOrder order : { SortOrder::Price, SortOrder::PricePerSqft, SortOrder::Distance }) {
+        for (bool descending : { false, true }) {
+            TopKQuery query;
+            query.order = order;
+            query.descending = descending;
+            query.origin = { 0.2, 0.2 };
+            query.limit = 37;
+
+            // Reference: every hit, fully sorted
+            std::vector<std::pair<double, int>> expected;
+            for (PropertyStore::Row row : engine.search_rows(box)) {
+                double key = order == SortOrder::Price ? store.price(row)
+                           : order == SortOrder::PricePerSqft ? store.price(row) / store.square_footage(row)
+                           : haversine_km(query.origin, store.location(row));
+                expected.emplace_back(descending ? -key : key, store.id(row));
+            }
+            std::sort(expected.begin(), expected.end());
+
+            std::vector<int> paged;
+            for (;;) {
+                auto page = engine.top_k_rows(box, {}, query);
+                for (const RankedRow& ranked : page) {
+                    paged.push_back(store.id(ranked.row));
+                }
+                if (page.size() < query.limit) break;
+                query.after = KeysetCursor{ page.back().key, store.id(page.back().row) };
+            }
+
+            ASSERT_EQ(paged.size(), expected.size());
+            for (size_t i = 0; i < paged.size(); ++i) {
+                EXPECT_EQ(paged[i], expected[i].second);
+            }
+        }
+    }
+}
+
+TEST(EngineTest, ProximityPagesByDistance) {
+    SpatialSearchEngine engine;
+    for (int i = 1; i <= 5; ++i) {
+        engine.add_property(make_property(i, -74.000 - 0.001 * i, 40.700));
+    }
+    engine.add_amenity(Amenity(10, "School", "school", { -74.000, 40.700 }));
+
+    auto first = engine.properties_near_amenities("school", 5.0, {}, 2);
+    ASSERT_EQ(first.size(), 2u);
+    EXPECT_EQ(first[0].property_id, 1);
+    EXPECT_EQ(first[1].property_id, 2);
+
+    auto rest = engine.properties_near_amenities("school", 5.0, {}, 0,
+                                                 KeysetCursor{ first[1].distance_km, first[1].property_id });
+    ASSERT_EQ(rest.size(), 3u);
+    EXPECT_EQ(rest[0].property_id, 3);
+}
+
+TEST(EngineTest, ClustersMatchPerPointGrid) {
+    SpatialSearchEngine engine;
+    for (int i = 0; i < 4000; ++i) {
+        engine.add_property(Property(i, "addr", 1000.0 * (i % 97), 2, 1.0, 1000.0,
+                                     { -74.0 + (i * 37 % 400) * 0.001, 40.6 + (i * 53 % 300) * 0.001 }, "House"));
+    }
+    Rectangle box = { { -73.95, 40.65 }, { -73.7, 40.88 } };
+    const double cell = 0.05;
+
+    // Reference: bin every point in the box individually
+    std::map<std::pair<int64_t, int64_t>, std::pair<uint32_t, double>> expected;
+    const PropertyStore& store = engine.properties();
+    for (PropertyStore::Row row : engine.search_rows(box)) {
+        Point p = store.location(row);
+        auto& bin = expected[{ static_cast<int64_t>(std::floor((p.x + 180.0) / cell)),
+                               static_cast<int64_t>(std::floor((p.y + 90.0) / cell)) }];
+        bin.first += 1;
+        bin.second += store.price(row);
+    }
+
+    auto clusters = engine.clusters(box, cell);
+    ASSERT_EQ(clusters.size(), expected.size());
+    uint32_t total = 0;
+    for (const Cluster& cluster : clusters) {
+        auto& bin = expected.at({ static_cast<int64_t>(std::floor((cluster.centroid.x + 180.0) / cell)),
+                                  static_cast<int64_t>(std::floor((cluster.centroid.y + 90.0) / cell)) });
+        EXPECT_EQ(cluster.count, bin.first);
+        EXPECT_NEAR(cluster.price_mean, bin.second / bin.first, 1e-6);
+        total += cluster.count;
+    }
+    EXPECT_EQ(total, engine.search_rows(box).size());
+    EXPECT_GE(clusters.front().count, clusters.back().count);
+}
+
+TEST(EngineTest, SinglePropertyClusterKeepsId) {
+    SpatialSearchEngine engine;
+    engine.add_property(make_property(1, -74.2, 40.7));
+    engine.add_property(make_property(2, -74.2001, 40.7001));
+    engine.add_property(make_property(3, -73.2, 40.7));
+
+    auto clusters = engine.clusters({ { -75.0, 40.0 }, { -72.0, 41.0 } }, 0.5);
+    ASSERT_EQ(clusters.size(), 2u);
+    EXPECT_EQ(clusters[0].count, 2u);
+    EXPECT_EQ(clusters[0].property_id, -1);
+    EXPECT_EQ(clusters[1].property_id, 3);
+}
+
+TEST(EngineTest, BoundaryStatsMatchPointInPolygon) {
+    SpatialSearchEngine engine;
+    for (int i = 0; i < 5000; ++i) {
+        engine.add_property(Property(i, "addr", 1000.0 * (i % 89), 2, 1.0, 1000.0,
+                                     { (i * 37 % 500) * 0.01, (i * 53 % 400) * 0.01 }, "House"));
+    }
+    // District 1 is an L split into two parts; district 2 has a hole
+    std::vector<std::vector<Point>> lower = { { { 0.0, 0.0 }, { 3.0, 0.0 }, { 3.0, 1.5 }, { 0.0, 1.5 } } };
+    std::vector<std::vector<Point>> upper = { { { 0.0, 1.5 }, { 1.5, 1.5 }, { 1.5, 3.0 }, { 0.0, 3.0 } } };
+    std::vector<std::vector<Point>> ring = {
+        { { 2.0, 2.0 }, { 4.5, 2.0 }, { 4.5, 3.9 }, { 2.0, 3.9 } },
+        { { 3.0, 2.5 }, { 3.5, 2.5 }, { 3.5, 3.0 }, { 3.0, 3.0 } }
+    };
+    EXPECT_TRUE(engine.add_boundary_part(1, "L", "district", lower));
+    EXPECT_TRUE(engine.add_boundary_part(1, "L", "district", upper));
+    EXPECT_TRUE(engine.add_boundary_part(2, "Ring", "district", ring));
+    EXPECT_TRUE(engine.add_boundary_part(3, "County", "county", lower));
+    EXPECT_FALSE(engine.add_boundary_part(4, "Degenerate", "district", { { { 0.0, 0.0 }, { 1.0, 1.0 } } }));
+
+    // Reference: test every property against each district
+    std::map<int64_t, std::pair<uint32_t, double>> expected;
+    const PropertyStore& store = engine.properties();
+    for (PropertyStore::Row row = 0; row < store.size(); ++row) {
+        Point p = store.location(row);
+        int64_t district = point_in_polygon(p, lower) || point_in_polygon(p, upper) ? 1
+                         : point_in_polygon(p, ring) ? 2 : -1;
+        EXPECT_EQ(engine.boundary_at("district", p), district);
+        if (district > 0) {
+            expected[district].first += 1;
+            expected[district].second += store.price(row);
+        }
+    }
+
+    auto stats = engine.boundary_stats("district");
+    ASSERT_EQ(stats.size(), 2u);
+    for (const BoundaryStats& district : stats) {
+        EXPECT_EQ(district.count, expected[district.boundary_id].first);
+        EXPECT_NEAR(district.price_mean, expected[district.boundary_id].second / district.count, 1e-6);
+    }
+    EXPECT_EQ(stats[0].name, "L");
+    EXPECT_EQ(engine.boundary_stats("county").size(), 1u);
+    EXPECT_TRUE(engine.boundary_stats("state").empty());
+}
+
+TEST(EngineTest, BoundaryStatsCountOverlapsOnce) {
+    SpatialSearchEngine engine;
+    for (int i = 0; i < 5000; ++i) {
+        engine.add_property(Property(i, "addr", 1000.0 * (i % 89), 2, 1.0, 1000.0,
+                                     { (i * 37 % 500) * 0.01, (i * 53 % 400) * 0.01 }, "House"));
+    }
+    // District 3 overlaps district 5, and is split into parts sharing the
+    // edge x = 2, with properties on it
+    std::vector<std::vector<Point>> west = { { { 0.5, 0.5 }, { 2.0, 0.5 }, { 2.0, 3.5 }, { 0.5, 3.5 } } };
+    std::vector<std::vector<Point>> east = { { { 2.0, 0.5 }, { 3.5, 0.5 }, { 3.5, 3.5 }, { 2.0, 3.5 } } };
+    std::vector<std::vector<Point>> square = { { { 1.0, 1.0 }, { 4.5, 1.0 }, { 4.5, 3.8 }, { 1.0, 3.8 } } };
+    EXPECT_TRUE(engine.add_boundary_part(5, "Square", "district", square));
+    EXPECT_TRUE(engine.add_boundary_part(3, "Split", "district", east));
+    EXPECT_TRUE(engine.add_boundary_part(3, "Split", "district", west));
+
+    std::map<int64_t, uint32_t> expected;
+    const PropertyStore& store = engine.properties();
+    for (PropertyStore::Row row = 0; row < store.size(); ++row) {
+        int64_t district = engine.boundary_at("district", store.location(row));
+        if (district > 0) {
+            expected[district] += 1;
+        }
+    }
+    ASSERT_GT(expected[3], 0u);
+    ASSERT_GT(expected[5], 0u);
+
+    auto stats = engine.boundary_stats("district");
+    ASSERT_EQ(stats.size(), 2u);
+    EXPECT_EQ(stats[0].boundary_id, 3);
+    EXPECT_EQ(stats[0].count, expected[3]);
+    EXPECT_EQ(stats[1].boundary_id, 5);
+    EXPECT_EQ(stats[1].count, expected[5]);
+}
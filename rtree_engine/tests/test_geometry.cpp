@@ -1,5 +1,20 @@
 #include <gtest/gtest.h>
 #include "../src/geometry.h" // Go up one directory to find the src folder
+#include "../src/RTree.h"
+#include <algorithm>
+
+TEST(RTreeTest, SearchFindsEveryInsertedPoint) {
+    // Enough points to split leaves and internal nodes several times
+    RTree tree;
+    auto point = [](int i) { return Point{ (i * 37 % 100) * 0.01, (i * 53 % 100) * 0.01 }; };
+    for (int i = 0; i < 500; ++i) {
+        tree.insert(point(i), i);
+    }
+    for (int i = 0; i < 500; ++i) {
+        std::vector<int> ids = tree.search({ point(i), point(i) });
+        EXPECT_NE(std::find(ids.begin(), ids.end(), i), ids.end()) << "point " << i;
+    }
+}
 
 TEST(RectangleTest, Intersection) {
     Rectangle r1 = {{0.0, 0.0}, {2.0, 2.0}};
@@ -32,3 +47,48 @@ TEST(RectangleTest, Area) {
     Rectangle r2 = {{10.0, 10.0}, {10.0, 20.0}};
     EXPECT_DOUBLE_EQ(r2.area(), 0.0);
 }
+
+TEST(GeometryTest, HaversineDistance) {
+    // One degree of latitude is ~111.2 km everywhere
+    Point a = {-74.0, 40.0};
+    Point b = {-74.0, 41.0};
+    EXPECT_NEAR(haversine_km(a, b), 111.19, 0.01);
+    EXPECT_DOUBLE_EQ(haversine_km(a, a), 0.0);
+}
+
+TEST(GeometryTest, RadiusBoundsCoverRadius) {
+    Point center = {-74.0, 40.7};
+    Rectangle bounds = radius_bounds(center, 2.0);
+
+    // Points 2 km due east and due north lie inside the bounds
+    EXPECT_GE(haversine_km(center, {bounds.max_point.x, center.y}), 2.0);
+    EXPECT_GE(haversine_km(center, {center.x, bounds.max_point.y}), 2.0);
+}
+
+TEST(GeometryTest, PointInPolygon) {
+    // L-shaped ring: the notch at (1.5, 1.5) is outside
+    std::vector<Point> ring = {{0, 0}, {2, 0}, {2, 1}, {1, 1}, {1, 2}, {0, 2}};
+    EXPECT_TRUE(point_in_polygon({0.5, 0.5}, ring));
+    EXPECT_TRUE(point_in_polygon({0.5, 1.5}, ring));
+    EXPECT_FALSE(point_in_polygon({1.5, 1.5}, ring));
+    EXPECT_FALSE(point_in_polygon({3.0, 0.5}, ring));
+
+    Rectangle box = bounds_of(ring);
+    EXPECT_DOUBLE_EQ(box.max_point.x, 2.0);
+    EXPECT_DOUBLE_EQ(box.max_point.y, 2.0);
+}
+
+TEST(GeometryTest, RectangleInPolygonWithHole) {
+    std::vector<std::vector<Point>> rings = {
+        {{0, 0}, {10, 0}, {10, 10}, {0, 10}},
+        {{4, 4}, {6, 4}, {6, 6}, {4, 6}}  // Hole
+    };
+    EXPECT_TRUE(point_in_polygon({1, 1}, rings));
+    EXPECT_FALSE(point_in_polygon({5, 5}, rings));
+
+    EXPECT_TRUE(rectangle_in_polygon({{1, 1}, {3, 3}}, rings));
+    EXPECT_FALSE(rectangle_in_polygon({{3, 3}, {7, 7}}, rings));   // Covers the hole
+    EXPECT_FALSE(rectangle_in_polygon({{4.5, 4.5}, {5, 5}}, rings)); // Inside the hole
+    EXPECT_FALSE(rectangle_in_polygon({{8, 8}, {12, 9}}, rings));  // Crosses the outer edge
+    EXPECT_FALSE(rectangle_in_polygon({{0, 1}, {1, 2}}, rings));   // Touches the outer edge
+}
@@ -51,6 +51,8 @@ def main():
                        default='all', help='Which ETL process to run')
     parser.add_argument('--verbose', '-v', action='store_true', 
                        help='Enable verbose logging')
+    parser.add_argument('--resume', action='store_true',
+                       help='Resume a failed run from its last committed checkpoint')
     
     args = parser.parse_args()
     
@@ -61,7 +63,7 @@ def main():
     
     try:
         # Initialize ETL runner
-        runner = ETLRunner(args.config)
+        runner = ETLRunner(args.config, resume=args.resume)
         
         # Run specified process
         if args.process == 'property':
@@ -93,6 +95,7 @@ def main():
         
         if summary['failed'] > 0:
             print("\nSome processes failed. Check logs for details.")
+            print("Re-run with --resume to continue from the last committed checkpoint.")
             sys.exit(1)
         else:
             print("\nAll processes completed successfully!")
@@ -5,8 +5,9 @@ File: src/spatial_search_engine/utils/helpers.py
 
 import hashlib
 import json
-from typing import Any, Dict, List, Tuple
-import geohash
+import math
+from typing import Any, Dict, List, Optional, Tuple
+import geohash2 as geohash
 from shapely.geometry import Point, Polygon
 import logging
 
@@ -28,8 +29,54 @@ def calculate_bounding_box(points: List[Tuple[float, float]]) -> Tuple[float, fl
     
     return min(lngs), min(lats), max(lngs), max(lats)
 
-def generate_query_hash(query_params: Dict[str, Any]) -> str:
-    """Generate hash for query caching"""
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(lng, lat) size in degrees of a geohash cell of the given precision"""
+    bits = 5 * precision
+    return 360.0 / 2 ** math.ceil(bits / 2), 180.0 / 2 ** (bits // 2)
+
+def snap_bounds(bounds: Dict[str, float], grid_size: Optional[float] = None,
+                geohash_precision: Optional[int] = None) -> Dict[str, float]:
+    """Grow min/max_lng/lat bounds outward to a grid of grid_size degrees or
+    to geohash cells of geohash_precision; unchanged if neither is given"""
+    if geohash_precision:
+        lng_size, lat_size = geohash_cell_size(geohash_precision)
+    elif grid_size:
+        lng_size = lat_size = grid_size
+    else:
+        return dict(bounds)
+    
+    # Cells are counted from (-180, -90) as geohash cells are, so equal cells
+    # always give identical bounds; min/max guard against float rounding
+    # moving a bound past the value it snaps
+    def down(value, origin, size):
+        return min(value, origin + math.floor((value - origin) / size) * size)
+    
+    def up(value, origin, size):
+        return max(value, origin + math.ceil((value - origin) / size) * size)
+    
+    return {
+        **bounds,
+        'min_lng': down(bounds['min_lng'], -180.0, lng_size),
+        'min_lat': down(bounds['min_lat'], -90.0, lat_size),
+        'max_lng': up(bounds['max_lng'], -180.0, lng_size),
+        'max_lat': up(bounds['max_lat'], -90.0, lat_size),
+    }
+
+def normalize_query_params(query_params: Dict[str, Any], grid_size: Optional[float] = None,
+                           geohash_precision: Optional[int] = None) -> Dict[str, Any]:
+    """Query params with any 'bounds' snapped outward (see snap_bounds)"""
+    if not isinstance(query_params.get('bounds'), dict):
+        return query_params
+    return {**query_params, 'bounds': snap_bounds(query_params['bounds'], grid_size, geohash_precision)}
+
+def generate_query_hash(query_params: Dict[str, Any], grid_size: Optional[float] = None,
+                        geohash_precision: Optional[int] = None) -> str:
+    """Generate hash for query caching.
+    
+    With grid_size or geohash_precision, 'bounds' are snapped first so
+    queries whose boxes snap to the same cells share a hash.
+    """
+    query_params = normalize_query_params(query_params, grid_size, geohash_precision)
     query_string = json.dumps(query_params, sort_keys=True)
     return hashlib.md5(query_string.encode()).hexdigest()
 
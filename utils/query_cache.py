@@ -0,0 +1,292 @@
+"""
+Spatial query result cache
+File: utils/query_cache.py
+
+Two tiers: a small in-process LRU with a short TTL in front of a shared
+Redis. Entries are keyed by the normalised query hash and remember the
+bounds they cover, so a property change evicts only the cached queries
+whose bounds contain it. Invalidations are published on a Redis channel
+so every process sharing the Redis also drops its local copies. Redis is
+optional; when it is unavailable the cache degrades to the local tier and
+never fails a query.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from utils.helpers import generate_query_hash
+
+# (min_lng, min_lat, max_lng, max_lat); None means the whole map
+Bounds = Optional[Tuple[float, float, float, float]]
+
+# Stand-in for None bounds in the Redis index
+_WHOLE_MAP = '*'
+
+# Points per invalidation message, keeping messages well under Redis'
+# pub/sub output buffer limits
+PUBLISH_CHUNK_POINTS = 100000
+
+logger = logging.getLogger(__name__)
+
+
+def _covers(bounds: Bounds, coords: np.ndarray) -> bool:
+    """Whether bounds contain any of the (lng, lat) rows of coords"""
+    if bounds is None:
+        return True
+    min_lng, min_lat, max_lng, max_lat = bounds
+    lngs, lats = coords[:, 0], coords[:, 1]
+    return bool(np.any((lngs >= min_lng) & (lngs <= max_lng) & (lats >= min_lat) & (lats <= max_lat)))
+
+
+class LRUCache:
+    """Thread-safe LRU map whose entries expire ttl_seconds after being set"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def items(self):
+        """Snapshot of the live (key, value) pairs"""
+        now = self._clock()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.items())
+
+
+class SpatialQueryCache:
+    """Query result cache with bounds-based invalidation.
+
+    Values must be JSON serialisable. In Redis each result lives under its
+    own key with a TTL; a hash maps keys to their bounds and a sorted set
+    tracks expiry times so the index can be pruned. Invalidated points are
+    published on a channel; processes that call listen_for_invalidations
+    evict the local entries covering them.
+    """
+
+    def __init__(self, redis_client=None, local_max_entries: int = 1024,
+                 local_ttl_seconds: float = 30.0, redis_ttl_seconds: int = 300,
+                 prefix: str = 'spatial-cache', redis_retry_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.redis = redis_client
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.redis_retry_seconds = redis_retry_seconds
+        self.prefix = prefix
+        self._clock = clock
+        self._local = LRUCache(local_max_entries, local_ttl_seconds, clock)
+        self._redis_down_until = 0.0
+        self._bounds_key = f'{prefix}:bounds'
+        self._expiry_key = f'{prefix}:expiry'
+        self._channel = f'{prefix}:invalidations'
+        self._stop_listening = threading.Event()
+        self.counters = {'local_hits': 0, 'redis_hits': 0, 'misses': 0}
+
+    @classmethod
+    def from_url(cls, redis_url: Optional[str], **kwargs) -> 'SpatialQueryCache':
+        """Cache backed by the Redis at redis_url, or local-only if it is empty"""
+        client = None
+        if redis_url:
+            import redis
+            # Short timeouts: a slow Redis must not hold up queries
+            client = redis.Redis.from_url(redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return cls(client, **kwargs)
+
+    def key_for(self, kind: str, params: Dict[str, Any]) -> str:
+        """Cache key of a query of one kind (range, polygon, ...) with normalised params"""
+        return f'{self.prefix}:{kind}:{generate_query_hash({"kind": kind, **params})}'
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._local.get(key)
+        if entry is not None:
+            self.counters['local_hits'] += 1
+            return entry[0]
+
+        raw = self._redis_call(lambda r: r.pipeline().get(key).hget(self._bounds_key, key).execute())
+        if not raw or raw[0] is None:
+            self.counters['misses'] += 1
+            return None
+        self.counters['redis_hits'] += 1
+        value = orjson.loads(raw[0])
+        self._local.set(key, (value, self._decode_bounds(raw[1])))
+        return value
+
+    def set(self, key: str, value: Any, bounds: Bounds = None):
+        """Cache a result covering `bounds` (None for queries over the whole map)"""
+        self._local.set(key, (value, bounds))
+
+        payload = orjson.dumps(value)
+        expires_at = time.time() + self.redis_ttl_seconds
+
+        def store(r):
+            expired = r.zrangebyscore(self._expiry_key, '-inf', time.time())
+            pipe = r.pipeline()
+            if expired:
+                pipe.hdel(self._bounds_key, *expired)
+                pipe.zrem(self._expiry_key, *expired)
+            pipe.set(key, payload, ex=self.redis_ttl_seconds)
+            pipe.hset(self._bounds_key, key, self._encode_bounds(bounds))
+            pipe.zadd(self._expiry_key, {key: expires_at})
+            pipe.execute()
+
+        self._redis_call(store)
+
+    def invalidate_point(self, lng: float, lat: float) -> int:
+        return self.invalidate_points([(lng, lat)])
+
+    def invalidate_points(self, points: Iterable[Tuple[float, float]]) -> int:
+        """Evict every cached query whose bounds contain one of the (lng, lat)
+        points; returns the number of entries evicted"""
+        coords = np.asarray(list(points), dtype=np.float64).reshape(-1, 2)
+        if not len(coords):
+            return 0
+
+        evicted = set(self._evict_local(coords))
+
+        def evict(r):
+            stale = [
+                key.decode() for key, raw in r.hgetall(self._bounds_key).items()
+                if _covers(self._decode_bounds(raw), coords)
+            ]
+            pipe = r.pipeline()
+            if stale:
+                pipe.delete(*stale).hdel(self._bounds_key, *stale).zrem(self._expiry_key, *stale)
+            # Other processes drop the same entries from their local tiers
+            for start in range(0, len(coords), PUBLISH_CHUNK_POINTS):
+                pipe.publish(self._channel, coords[start:start + PUBLISH_CHUNK_POINTS].tobytes())
+            pipe.execute()
+            return stale
+
+        evicted.update(self._redis_call(evict) or [])
+        if evicted:
+            logger.info(f"Invalidated {len(evicted)} cached spatial queries")
+        return len(evicted)
+
+    def listen_for_invalidations(self) -> Optional[threading.Thread]:
+        """Evict local entries whenever any process sharing the Redis
+        invalidates points; returns the listener thread, or None without Redis"""
+        if self.redis is None:
+            return None
+        self._stop_listening.clear()
+        # Subscribe before returning so no invalidation published after this call is missed
+        pubsub = self._subscribe()
+        thread = threading.Thread(
+            target=self._listen, args=(pubsub,), name='query-cache-invalidations', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop_listening(self):
+        self._stop_listening.set()
+
+    def _subscribe(self):
+        try:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self._channel)
+            return pubsub
+        except Exception as e:
+            logger.warning(f"Cannot subscribe to cache invalidations: {e}")
+            return None
+
+    def _listen(self, pubsub):
+        while not self._stop_listening.is_set():
+            if pubsub is None:
+                if self._stop_listening.wait(self.redis_retry_seconds):
+                    break
+                pubsub = self._subscribe()
+                if pubsub is not None:
+                    # Invalidations published while unsubscribed were missed
+                    self._local.clear()
+                continue
+
+            try:
+                message = pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                logger.warning(f"Lost the cache invalidation channel, retrying: {e}")
+                pubsub = None
+                continue
+            if message is not None and message['type'] == 'message':
+                self._evict_local(np.frombuffer(message['data'], dtype=np.float64).reshape(-1, 2))
+
+        if pubsub is not None:
+            pubsub.close()
+
+    def _evict_local(self, coords: np.ndarray) -> List[str]:
+        """Drop local entries whose bounds contain one of the points"""
+        evicted = []
+        for key, (_, bounds) in self._local.items():
+            if _covers(bounds, coords):
+                self._local.delete(key)
+                evicted.append(key)
+        return evicted
+
+    def clear(self):
+        self._local.clear()
+
+        def drop(r):
+            keys = [key for key in r.hkeys(self._bounds_key)]
+            r.delete(*keys, self._bounds_key, self._expiry_key)
+
+        self._redis_call(drop)
+
+    def _redis_call(self, operation):
+        """Run an operation against Redis, or return None while it is unavailable"""
+        if self.redis is None or self._clock() < self._redis_down_until:
+            return None
+        try:
+            return operation(self.redis)
+        except Exception as e:
+            logger.warning(f"Redis cache unavailable, using the local cache only: {e}")
+            self._redis_down_until = self._clock() + self.redis_retry_seconds
+            return None
+
+    @staticmethod
+    def _encode_bounds(bounds: Bounds) -> str:
+        return _WHOLE_MAP if bounds is None else ','.join(repr(float(v)) for v in bounds)
+
+    @staticmethod
+    def _decode_bounds(raw) -> Bounds:
+        if raw is None:
+            return None
+        text = raw.decode() if isinstance(raw, bytes) else raw
+        if text == _WHOLE_MAP:
+            return None
+        return tuple(float(v) for v in text.split(','))
+